@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import enum
+import hashlib
+
+from generator.bip32 import Secp256k1, ExtendedKey, CURVE_N, hash160, base58_encode, base58_decode
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+BECH32_HRP = "bc"
+
+VERSION_P2PKH = 0x00
+VERSION_P2SH = 0x05
+
+GAP_LIMIT = 20  # consecutive unused addresses before a chain is considered empty
+
+
+class Script(enum.Enum):
+    # values are the bip43 purpose of the standard derivation path
+    P2PKH = 44
+    P2SH_P2WPKH = 49
+    P2WPKH = 84
+    P2TR = 86
+
+    def to_string(self) -> str:
+        return \
+            "p2pkh" if self == Script.P2PKH else \
+                "p2sh-p2wpkh" if self == Script.P2SH_P2WPKH else \
+                    "p2wpkh" if self == Script.P2WPKH else \
+                        "p2tr"
+
+    def to_path(self, account: int = 0) -> str:
+        return f"m/{self.value}'/0'/{account}'"
+
+
+SCRIPT_ALL = tuple(Script)
+
+
+def to_script(key: ExtendedKey | bytes, script: Script) -> bytes:
+    public_key = key.public_key if isinstance(key, ExtendedKey) else key
+    if script == Script.P2PKH:
+        return b"\x76\xa9\x14" + hash160(public_key) + b"\x88\xac"
+    elif script == Script.P2SH_P2WPKH:
+        return b"\xa9\x14" + hash160(b"\x00\x14" + hash160(public_key)) + b"\x87"
+    elif script == Script.P2WPKH:
+        return b"\x00\x14" + hash160(public_key)
+    else:
+        return b"\x51\x20" + __taproot_tweak(public_key)
+
+
+def to_script_type(script: bytes) -> Script:
+    if len(script) == 25 and script[:3] == b"\x76\xa9\x14":
+        return Script.P2PKH
+    elif len(script) == 23 and script[:2] == b"\xa9\x14":
+        return Script.P2SH_P2WPKH
+    elif len(script) == 22 and script[:2] == b"\x00\x14":
+        return Script.P2WPKH
+    elif len(script) == 34 and script[:2] == b"\x51\x20":
+        return Script.P2TR
+
+    raise ValueError("invalid script\n\t"
+                     f"expected: {', '.join(script.to_string() for script in SCRIPT_ALL)}\n\t"
+                     f"obtained: {script.hex()}")
+
+
+def to_address(script: bytes) -> str:
+    if len(script) == 25 and script[:3] == b"\x76\xa9\x14" and script[23:] == b"\x88\xac":
+        return base58_encode(bytes((VERSION_P2PKH,)) + script[3:23])
+    elif len(script) == 23 and script[:2] == b"\xa9\x14" and script[22:] == b"\x87":
+        return base58_encode(bytes((VERSION_P2SH,)) + script[2:22])
+    elif 4 <= len(script) <= 42 and (script[0] == 0 or 0x51 <= script[0] <= 0x60) and script[1] == len(script) - 2:
+        version = script[0] - 0x50 if script[0] else 0
+        return __bech32_encode(BECH32_HRP, version, script[2:])
+
+    raise ValueError("invalid script\n\t"
+                     "expected: p2pkh, p2sh or segwit script\n\t"
+                     f"obtained: {script.hex()}")
+
+
+def from_address(address: str) -> bytes:
+    address = address.strip()
+    if address[:len(BECH32_HRP) + 1].lower() == BECH32_HRP + "1":
+        version, program = __bech32_decode(address)
+        return bytes((version + 0x50 if version else 0, len(program))) + program
+
+    try:
+        data = base58_decode(address)
+    except ValueError as ve:
+        raise ValueError(f"invalid address\n\t{address}: {str(ve)}") from None
+
+    if len(data) == 21 and data[0] == VERSION_P2PKH:
+        return b"\x76\xa9\x14" + data[1:] + b"\x88\xac"
+    elif len(data) == 21 and data[0] == VERSION_P2SH:
+        return b"\xa9\x14" + data[1:] + b"\x87"
+
+    raise ValueError("invalid address\n\t"
+                     f"{address}: unsupported version")
+
+
+def __taproot_tweak(public_key: bytes) -> bytes:
+    # bip86: key path only output, the internal key is tweaked with its own tagged hash
+    x, y = Secp256k1.decompress(b"\x02" + public_key[1:])
+    tag = hashlib.sha256(b"TapTweak").digest()
+    tweak = int.from_bytes(hashlib.sha256(tag + tag + public_key[1:]).digest(), byteorder='big')
+    if tweak >= CURVE_N:
+        raise ValueError("invalid taproot tweak")
+
+    point = Secp256k1.to_affine(Secp256k1.add_affine(Secp256k1.multiply_g(tweak), (x, y)))
+    return point[0].to_bytes(32, byteorder='big')
+
+
+def __bech32_polymod(values: list[int]) -> int:
+    generator = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            checksum ^= generator[i] if (top >> i) & 1 else 0
+
+    return checksum
+
+
+def __bech32_hrp_expand(hrp: str) -> list[int]:
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def __convert_bits(data: bytes | list[int], from_bits: int, to_bits: int, pad: bool) -> list[int] | None:
+    accumulator = 0
+    bits = 0
+    result = []
+    mask = (1 << to_bits) - 1
+    for value in data:
+        accumulator = (accumulator << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((accumulator >> bits) & mask)
+
+    if pad and bits:
+        result.append((accumulator << (to_bits - bits)) & mask)
+    elif not pad and (bits >= from_bits or (accumulator << (to_bits - bits)) & mask):
+        return None
+
+    return result
+
+
+def __bech32_encode(hrp: str, version: int, program: bytes) -> str:
+    data = [version] + __convert_bits(program, 8, 5, True)
+    const = BECH32_CONST if version == 0 else BECH32M_CONST
+    polymod = __bech32_polymod(__bech32_hrp_expand(hrp) + data + [0] * 6) ^ const
+    data += [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join(BECH32_CHARSET[d] for d in data)
+
+
+def __bech32_decode(address: str) -> tuple[int, bytes]:
+    error = f"invalid address\n\t{address}: "
+    if address.lower() != address and address.upper() != address:
+        raise ValueError(error + "mixed case")
+
+    address = address.lower()
+    hrp, _, payload = address.rpartition("1")
+    if hrp != BECH32_HRP or len(payload) < 7 or any(c not in BECH32_CHARSET for c in payload):
+        raise ValueError(error + "invalid bech32 format")
+
+    data = [BECH32_CHARSET.index(c) for c in payload]
+    version = data[0]
+    const = BECH32_CONST if version == 0 else BECH32M_CONST
+    if __bech32_polymod(__bech32_hrp_expand(hrp) + data) != const:
+        raise ValueError(error + "invalid bech32 checksum")
+
+    program = __convert_bits(data[1:-6], 5, 8, False)
+    if program is None or version > 16 or not 2 <= len(program) <= 40 or (version == 0 and len(program) not in (20, 32)):
+        raise ValueError(error + "invalid witness program")
+
+    return version, bytes(program)
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from generator.address import Script, SCRIPT_ALL, GAP_LIMIT, to_script, to_address, from_address
+from generator.bip32 import KeyChain
+from generator.seed import Seed
+
+MAGIC = b"ADIX"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")  # magic, version, bloom hashes, entries, bloom bits
+
+FALSE_POSITIVE_RATE = 0.001
+CHUNK_SIZE = 2 ** 20  # entries hashed at once
+
+LOGGER = logging.getLogger(__name__)
+
+
+def hash_script(script: bytes) -> int:
+    return int.from_bytes(hashlib.sha256(script).digest()[:8], byteorder='little')
+
+
+def parse_entry(entry: str | bytes) -> bytes:
+    # an address, or a scriptPubKey in hex format
+    if isinstance(entry, bytes):
+        return entry
+
+    try:
+        return from_address(entry)
+    except ValueError as ve:
+        try:
+            return bytes.fromhex(entry)
+        except ValueError:
+            raise ve from None
+
+
+class AddressIndex(object):
+    __slots__ = ('__filename', '__mmap', '__hashes', '__bloom_bits', '__bloom', '__keys')
+
+    def __init__(self, filename: str):
+        self.__filename = filename
+        with open(filename, 'rb') as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, hashes, count, bloom_bits = HEADER.unpack_from(self.__mmap)
+        if magic != MAGIC or version != VERSION or len(self.__mmap) != HEADER.size + bloom_bits // 8 + 8 * count:
+            self.__mmap.close()
+            raise ValueError("invalid address index\n\t"
+                             f"'{filename}' is not a version {VERSION} address index")
+
+        self.__hashes = hashes
+        self.__bloom_bits = bloom_bits
+        # zero copy views: pages are loaded on demand, memory use does not depend on the index size
+        self.__bloom = np.frombuffer(self.__mmap, dtype=np.uint8, count=bloom_bits // 8, offset=HEADER.size)
+        self.__keys = np.frombuffer(self.__mmap, dtype='<u8', count=count, offset=HEADER.size + bloom_bits // 8)
+
+    def __enter__(self) -> 'AddressIndex':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __contains__(self, entry: str | bytes) -> bool:
+        return bool(self.contains_many([parse_entry(entry)])[0])
+
+    @classmethod
+    def build(
+            cls,
+            entries: Iterable[str | bytes],
+            filename: str,
+            false_positive_rate: float = FALSE_POSITIVE_RATE
+    ) -> 'AddressIndex':
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("invalid false positive rate\n\t"
+                             "expected: 0-1 (excluded)\n\t"
+                             f"obtained: {false_positive_rate}")
+
+        start = time.perf_counter()
+        chunks = []
+        chunk = []
+        skipped = 0
+        for entry in entries:
+            try:
+                chunk.append(hash_script(parse_entry(entry)))
+            except ValueError:
+                skipped += 1
+                continue
+
+            if len(chunk) == CHUNK_SIZE:
+                chunks.append(np.array(chunk, dtype=np.uint64))
+                chunk = []
+        chunks.append(np.array(chunk, dtype=np.uint64))
+
+        if skipped:
+            LOGGER.warning(f"skipped {skipped} invalid entries")
+
+        keys = np.unique(np.concatenate(chunks))
+        del chunks
+
+        # optimal bloom filter size for the requested false positive rate, rounded to 64 bits
+        bloom_bits = max(64, math.ceil(-len(keys) * math.log(false_positive_rate) / math.log(2) ** 2 / 64) * 64)
+        hashes = max(1, round(bloom_bits / max(len(keys), 1) * math.log(2)))
+        bloom = np.zeros(bloom_bits // 8, dtype=np.uint8)
+        for lo in range(0, len(keys), CHUNK_SIZE):
+            positions = AddressIndex.__get_positions(keys[lo:lo + CHUNK_SIZE], hashes, bloom_bits).ravel()
+            for bit in range(8):
+                # one bit value per pass, so repeated indexes are harmless
+                bloom[positions[positions & 7 == bit] >> 3] |= np.uint8(1 << bit)
+
+        with open(filename + ".tmp", 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, hashes, len(keys), bloom_bits))
+            file.write(bloom.tobytes())
+            file.write(keys.astype('<u8').tobytes())
+        os.replace(filename + ".tmp", filename)
+
+        LOGGER.info(f"indexed {len(keys)} entries in {time.perf_counter() - start:.3f}s "
+                    f"({bloom_bits // 8 + 8 * len(keys)} bytes, {hashes} bloom hashes)")
+        return AddressIndex(filename)
+
+    def contains_many(self, scripts: Iterable[bytes]) -> np.ndarray:
+        keys = np.fromiter((hash_script(script) for script in scripts), dtype=np.uint64)
+
+        # the bloom filter rejects most of the missing entries without touching the sorted index
+        positions = AddressIndex.__get_positions(keys, self.__hashes, self.__bloom_bits)
+        result = np.all(self.__bloom[positions >> 3] & (1 << (positions & 7)).astype(np.uint8), axis=1)
+
+        candidates = np.flatnonzero(result)
+        if len(candidates):
+            found = np.searchsorted(self.__keys, keys[candidates])
+            found[found == len(self.__keys)] = 0
+            result[candidates] = self.__keys[found] == keys[candidates] if len(self.__keys) else False
+
+        return result
+
+    def close(self):
+        self.__bloom = self.__keys = None
+        self.__mmap.close()
+
+    @staticmethod
+    def __get_positions(keys: np.ndarray, hashes: int, bloom_bits: int) -> np.ndarray:
+        # double hashing: the i-th bloom position is h1 + i * h2
+        h1 = keys & np.uint64(0xFFFFFFFF)
+        h2 = (keys >> np.uint64(32)) | np.uint64(1)
+        return (h1[:, None] + np.arange(hashes, dtype=np.uint64)[None, :] * h2[:, None]) % np.uint64(bloom_bits)
+
+
+def scan(
+        seed: Seed,
+        index: AddressIndex,
+        scripts: Iterable[Script] = SCRIPT_ALL,
+        accounts: int = 1,
+        gap_limit: int = GAP_LIMIT
+) -> Iterator[tuple[str, str]]:
+    chain = KeyChain.from_seed(seed)
+    derived = 0
+    start = time.perf_counter()
+    for script in scripts:
+        for account in range(accounts):
+            for change in (0, 1):
+                path = f"{script.to_path(account)}/{change}"
+                position = 0
+                last_used = -1
+                # derive a gap limit worth of addresses at a time, until a full gap is unused
+                while position <= last_used + gap_limit:
+                    children = chain.derive_range(path, position, gap_limit)
+                    outputs = [to_script(child, script) for child in children]
+                    for child, output, found in zip(children, outputs, index.contains_many(outputs)):
+                        if found:
+                            last_used = child.index
+                            yield f"{path}/{child.index}", to_address(output)
+
+                    position += gap_limit
+                    derived += gap_limit
+
+    LOGGER.info(f"checked {derived} addresses in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,537 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import collections
+import functools
+import hashlib
+import hmac
+import logging
+from collections.abc import Iterable
+
+from generator.seed import Seed
+
+# secp256k1 curve parameters
+CURVE_P = 2 ** 256 - 2 ** 32 - 977
+CURVE_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+CURVE_G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+)
+
+HARDENED = 0x80000000
+MASTER_KEY = b"Bitcoin seed"
+
+VERSION_XPRV = bytes.fromhex("0488ade4")
+VERSION_XPUB = bytes.fromhex("0488b21e")
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+WINDOW_SIZE = 4  # bits of the fixed base multiplication table
+CACHE_SIZE = 1024  # cached parent nodes
+
+RIPEMD160_R = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13
+)
+RIPEMD160_RR = (
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11
+)
+RIPEMD160_S = (
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6
+)
+RIPEMD160_SS = (
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11
+)
+RIPEMD160_K = (0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E)
+RIPEMD160_KK = (0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000)
+
+LOGGER = logging.getLogger(__name__)
+
+
+def hash160(data: bytes) -> bytes:
+    sha256 = hashlib.sha256(data).digest()
+    try:
+        return hashlib.new('ripemd160', sha256).digest()
+    except ValueError:
+        # openssl 3 may not provide ripemd160
+        return __ripemd160(sha256)
+
+
+def base58_encode(data: bytes, check: bool = True) -> str:
+    if check:
+        data += hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+
+    value = int.from_bytes(data, byteorder='big')
+    result = ""
+    while value:
+        value, remainder = divmod(value, 58)
+        result = BASE58_ALPHABET[remainder] + result
+
+    return BASE58_ALPHABET[0] * (len(data) - len(data.lstrip(b"\x00"))) + result
+
+
+def base58_decode(data: str, check: bool = True) -> bytes:
+    value = 0
+    for char in data:
+        try:
+            value = value * 58 + BASE58_ALPHABET.index(char)
+        except ValueError:
+            raise ValueError("invalid base58 value\n\t"
+                             f"'{char}' is not a base58 character") from None
+
+    result = value.to_bytes((value.bit_length() + 7) // 8, byteorder='big')
+    result = b"\x00" * (len(data) - len(data.lstrip(BASE58_ALPHABET[0]))) + result
+
+    if check:
+        result, checksum = result[:-4], result[-4:]
+        if hashlib.sha256(hashlib.sha256(result).digest()).digest()[:4] != checksum:
+            raise ValueError("invalid base58 checksum")
+
+    return result
+
+
+def parse_path(path: str | Iterable[int]) -> tuple[int]:
+    if not isinstance(path, str):
+        return tuple(path)
+
+    levels = path.strip().split("/")
+    if levels[0] != "m":
+        raise ValueError("invalid path\n\t"
+                         "expected: m/<index>[']/...\n\t"
+                         f"obtained: {path}")
+
+    result = []
+    for level in levels[1:]:
+        hardened = level[-1:] in ("'", "h", "H")
+        index = level[:-1] if hardened else level
+        if not index.isdigit() or int(index) >= HARDENED:
+            raise ValueError("invalid path index\n\t"
+                             f"expected: 0-{HARDENED - 1}, optionally followed by '\n\t"
+                             f"obtained: {level}")
+
+        result.append(int(index) + (HARDENED if hardened else 0))
+
+    return tuple(result)
+
+
+class Secp256k1(object):
+    @staticmethod
+    @functools.cache
+    def __get_g_table() -> tuple[tuple[tuple[int, int]]]:
+        # table[i][j] = j * 2^(WINDOW_SIZE * i) * G, in affine coordinates
+        windows = (256 + WINDOW_SIZE - 1) // WINDOW_SIZE
+        base = (CURVE_G[0], CURVE_G[1], 1)
+
+        rows = []
+        for _ in range(windows):
+            row = [None, base]
+            for j in range(2, 2 ** WINDOW_SIZE):
+                row.append(Secp256k1.__add(row[-1], base))
+            rows.append(row)
+            base = Secp256k1.__add(row[-1], base)
+
+        points = Secp256k1.to_affine_batch([point for row in rows for point in row[1:]])
+        size = 2 ** WINDOW_SIZE - 1
+        return tuple((None,) + tuple(points[i * size:(i + 1) * size]) for i in range(windows))
+
+    @staticmethod
+    def multiply_g(scalar: int) -> tuple[int, int, int]:
+        table = Secp256k1.__get_g_table()
+        mask = 2 ** WINDOW_SIZE - 1
+
+        result = (0, 1, 0)
+        for row in table:
+            if scalar & mask:
+                result = Secp256k1.add_affine(result, row[scalar & mask])
+            scalar >>= WINDOW_SIZE
+
+        return result
+
+    @staticmethod
+    def __double(point: tuple[int, int, int]) -> tuple[int, int, int]:
+        x, y, z = point
+        if y == 0 or z == 0:
+            return 0, 1, 0
+
+        yy = y * y % CURVE_P
+        s = 4 * x * yy % CURVE_P
+        m = 3 * x * x % CURVE_P
+        x3 = (m * m - 2 * s) % CURVE_P
+        return x3, (m * (s - x3) - 8 * yy * yy) % CURVE_P, 2 * y * z % CURVE_P
+
+    @staticmethod
+    def add_affine(point: tuple[int, int, int], affine: tuple[int, int] | None) -> tuple[int, int, int]:
+        if affine is None:
+            return point
+
+        x1, y1, z1 = point
+        x2, y2 = affine
+        if z1 == 0:
+            return x2, y2, 1
+
+        z1z1 = z1 * z1 % CURVE_P
+        h = (x2 * z1z1 - x1) % CURVE_P
+        r = (y2 * z1 * z1z1 - y1) % CURVE_P
+        if h == 0:
+            return Secp256k1.__double(point) if r == 0 else (0, 1, 0)
+
+        hh = h * h % CURVE_P
+        hhh = h * hh % CURVE_P
+        v = x1 * hh % CURVE_P
+        x3 = (r * r - hhh - 2 * v) % CURVE_P
+        return x3, (r * (v - x3) - y1 * hhh) % CURVE_P, z1 * h % CURVE_P
+
+    @staticmethod
+    def __add(point_1: tuple[int, int, int], point_2: tuple[int, int, int]) -> tuple[int, int, int]:
+        return Secp256k1.add_affine(point_1, Secp256k1.to_affine(point_2))
+
+    @staticmethod
+    def to_affine(point: tuple[int, int, int]) -> tuple[int, int] | None:
+        return Secp256k1.to_affine_batch([point])[0]
+
+    @staticmethod
+    def to_affine_batch(points: list[tuple[int, int, int]]) -> list[tuple[int, int] | None]:
+        # montgomery's trick: a single modular inversion for the whole batch
+        prefix = []
+        accumulator = 1
+        for x, y, z in points:
+            prefix.append(accumulator)
+            if z:
+                accumulator = accumulator * z % CURVE_P
+
+        inverse = pow(accumulator, -1, CURVE_P)
+        result = [None] * len(points)
+        for i in range(len(points) - 1, -1, -1):
+            x, y, z = points[i]
+            if z:
+                z_inverse = inverse * prefix[i] % CURVE_P
+                inverse = inverse * z % CURVE_P
+                zz = z_inverse * z_inverse % CURVE_P
+                result[i] = (x * zz % CURVE_P, y * zz * z_inverse % CURVE_P)
+
+        return result
+
+    @staticmethod
+    def compress(x: int, y: int) -> bytes:
+        return bytes((2 + (y & 1),)) + x.to_bytes(32, byteorder='big')
+
+    @staticmethod
+    def decompress(public: bytes) -> tuple[int, int]:
+        if len(public) != 33 or public[0] not in (2, 3):
+            raise ValueError("invalid public key\n\t"
+                             "expected: 33 bytes compressed public key")
+
+        x = int.from_bytes(public[1:], byteorder='big')
+        y = pow((pow(x, 3, CURVE_P) + 7) % CURVE_P, (CURVE_P + 1) // 4, CURVE_P)
+        if x >= CURVE_P or (y * y - pow(x, 3, CURVE_P) - 7) % CURVE_P:
+            raise ValueError("invalid public key\n\t"
+                             "point is not on secp256k1")
+
+        return (x, y) if y & 1 == public[0] & 1 else (x, CURVE_P - y)
+
+
+class ExtendedKey(object):
+    __slots__ = ('__depth', '__parent_fingerprint', '__index', '__chain_code', '__private', '__public')
+
+    def __init__(
+            self,
+            depth: int,
+            parent_fingerprint: bytes,
+            index: int,
+            chain_code: bytes,
+            private: int | None = None,
+            public: bytes | None = None
+    ):
+        if private is None and public is None:
+            raise ValueError("invalid extended key\n\t"
+                             "a private or public key is needed")
+
+        self.__depth = depth
+        self.__parent_fingerprint = parent_fingerprint
+        self.__index = index
+        self.__chain_code = chain_code
+        self.__private = private
+        self.__public = public
+
+    def __eq__(self, other):
+        result = False
+        if isinstance(other, ExtendedKey):
+            result = self.serialize(self.__private is not None) == other.serialize(other.__private is not None)
+
+        return result
+
+    @classmethod
+    def from_rootseed(cls, rootseed: bytes) -> 'ExtendedKey':
+        digest = hmac.new(MASTER_KEY, rootseed, hashlib.sha512).digest()
+        private = int.from_bytes(digest[:32], byteorder='big')
+        if not 0 < private < CURVE_N:
+            raise ValueError("invalid rootseed\n\t"
+                             "master private key out of range")
+
+        return ExtendedKey(0, bytes(4), 0, digest[32:], private)
+
+    @classmethod
+    def from_seed(cls, seed: Seed) -> 'ExtendedKey':
+        return ExtendedKey.from_rootseed(seed.rootseed)
+
+    @classmethod
+    def from_string(cls, xkey: str) -> 'ExtendedKey':
+        data = base58_decode(xkey)
+        if len(data) != 78 or data[:4] not in (VERSION_XPRV, VERSION_XPUB):
+            raise ValueError("invalid extended key\n\t"
+                             "expected: xprv or xpub\n\t"
+                             f"obtained: {xkey[:4]}")
+
+        depth, parent_fingerprint, index, chain_code, key = \
+            data[4], data[5:9], int.from_bytes(data[9:13], byteorder='big'), data[13:45], data[45:]
+
+        if data[:4] == VERSION_XPRV:
+            private = int.from_bytes(key[1:], byteorder='big')
+            if key[0] != 0 or not 0 < private < CURVE_N:
+                raise ValueError("invalid extended key\n\t"
+                                 "private key out of range")
+
+            return ExtendedKey(depth, parent_fingerprint, index, chain_code, private)
+
+        Secp256k1.decompress(key)  # validates the public key
+        return ExtendedKey(depth, parent_fingerprint, index, chain_code, public=key)
+
+    @property
+    def depth(self) -> int:
+        return self.__depth
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def chain_code(self) -> bytes:
+        return self.__chain_code
+
+    @property
+    def parent_fingerprint(self) -> bytes:
+        return self.__parent_fingerprint
+
+    @property
+    def private_key(self) -> bytes | None:
+        return None if self.__private is None else self.__private.to_bytes(32, byteorder='big')
+
+    @property
+    def public_key(self) -> bytes:
+        if self.__public is None:
+            self.__public = Secp256k1.compress(*Secp256k1.to_affine(Secp256k1.multiply_g(self.__private)))
+
+        return self.__public
+
+    @property
+    def fingerprint(self) -> bytes:
+        return hash160(self.public_key)[:4]
+
+    @property
+    def xprv(self) -> str:
+        return base58_encode(self.serialize(True))
+
+    @property
+    def xpub(self) -> str:
+        return base58_encode(self.serialize(False))
+
+    def serialize(self, private: bool) -> bytes:
+        if private and self.__private is None:
+            raise ValueError("invalid extended key\n\t"
+                             "a public key cannot be serialized as private")
+
+        return (VERSION_XPRV if private else VERSION_XPUB) + \
+            bytes((self.__depth,)) + self.__parent_fingerprint + self.__index.to_bytes(4, byteorder='big') + \
+            self.__chain_code + \
+            (b"\x00" + self.private_key if private else self.public_key)
+
+    def neuter(self) -> 'ExtendedKey':
+        return ExtendedKey(
+            self.__depth, self.__parent_fingerprint, self.__index, self.__chain_code, public=self.public_key
+        )
+
+    def child(self, index: int) -> 'ExtendedKey':
+        return self.children(index, 1, False)[0]
+
+    def children(self, start: int, count: int, public: bool = True) -> list['ExtendedKey']:
+        if start < 0 or count < 1 or start + count > 2 ** 32:
+            raise ValueError("invalid child index\n\t"
+                             f"expected: 0-{2 ** 32 - 1}\n\t"
+                             f"obtained: {start}-{start + count - 1}")
+
+        if start + count > HARDENED and self.__private is None:
+            raise ValueError("invalid child index\n\t"
+                             "hardened children cannot be derived from a public key")
+
+        fingerprint = self.fingerprint
+        chain_codes = []
+        tweaks = []
+        for index in range(start, start + count):
+            data = b"\x00" + self.private_key if index >= HARDENED else self.public_key
+            digest = hmac.new(self.__chain_code, data + index.to_bytes(4, byteorder='big'), hashlib.sha512).digest()
+
+            tweak = int.from_bytes(digest[:32], byteorder='big')
+            if tweak >= CURVE_N:
+                raise ValueError("invalid child index\n\t"
+                                 f"index {index} derives an invalid key, skip to the next one")
+
+            tweaks.append(tweak)
+            chain_codes.append(digest[32:])
+
+        if self.__private is not None and not public:
+            # public keys are computed on demand: hardened children only cost an hmac each
+            privates = [(tweak + self.__private) % CURVE_N for tweak in tweaks]
+            if 0 in privates:
+                raise ValueError("invalid child index\n\t"
+                                 f"index {start + privates.index(0)} derives an invalid key, skip to the next one")
+
+            return [
+                ExtendedKey(self.__depth + 1, fingerprint, start + i, chain_code, private)
+                for i, (chain_code, private) in enumerate(zip(chain_codes, privates))
+            ]
+
+        # one modular inversion for all the children public keys
+        if self.__private is not None:
+            privates = [(tweak + self.__private) % CURVE_N for tweak in tweaks]
+            points = [Secp256k1.multiply_g(private) for private in privates]
+        else:
+            privates = [None] * count
+            parent = Secp256k1.decompress(self.__public)
+            points = [Secp256k1.add_affine(Secp256k1.multiply_g(tweak), parent) for tweak in tweaks]
+
+        children = []
+        for i, (chain_code, private, point) in enumerate(zip(chain_codes, privates, Secp256k1.to_affine_batch(points))):
+            if point is None or private == 0:
+                raise ValueError("invalid child index\n\t"
+                                 f"index {start + i} derives an invalid key, skip to the next one")
+
+            children.append(ExtendedKey(
+                self.__depth + 1, fingerprint, start + i, chain_code, private, Secp256k1.compress(*point)
+            ))
+
+        return children
+
+    def derive(self, path: str | Iterable[int]) -> 'ExtendedKey':
+        result = self
+        for index in parse_path(path):
+            result = result.child(index)
+
+        return result
+
+
+class KeyChain(object):
+    __slots__ = ('__master', '__cache', '__cache_size')
+
+    def __init__(self, master: ExtendedKey, cache_size: int = CACHE_SIZE):
+        self.__master = master
+        self.__cache = collections.OrderedDict()
+        self.__cache_size = cache_size
+
+    @classmethod
+    def from_seed(cls, seed: Seed, cache_size: int = CACHE_SIZE) -> 'KeyChain':
+        return KeyChain(ExtendedKey.from_seed(seed), cache_size)
+
+    @property
+    def master(self) -> ExtendedKey:
+        return self.__master
+
+    def derive(self, path: str | Iterable[int]) -> ExtendedKey:
+        path = parse_path(path)
+        if not path:
+            return self.__master
+
+        return self.__get_parent(path[:-1]).child(path[-1])
+
+    def derive_range(self, path: str | Iterable[int], start: int, count: int, public: bool = True) -> list[ExtendedKey]:
+        return self.__get_parent(parse_path(path)).children(start, count, public)
+
+    def wipe(self):
+        self.__cache.clear()
+
+    def __get_parent(self, path: tuple[int]) -> ExtendedKey:
+        # start from the longest cached prefix of the path
+        depth = len(path)
+        while depth and path[:depth] not in self.__cache:
+            depth -= 1
+
+        node = self.__cache[path[:depth]] if depth else self.__master
+        if depth:
+            self.__cache.move_to_end(path[:depth])
+
+        for i in range(depth, len(path)):
+            node = node.child(path[i])
+            self.__cache[path[:i + 1]] = node
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+
+        return node
+
+
+def __ripemd160(data: bytes) -> bytes:
+    # pure python fallback, only used when hashlib does not provide ripemd160
+    def rotate(x, n):
+        return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
+
+    def f(j, x, y, z):
+        if j < 16:
+            return x ^ y ^ z
+        if j < 32:
+            return (x & y) | (~x & z)
+        if j < 48:
+            return (x | ~y) ^ z
+        if j < 64:
+            return (x & z) | (y & ~z)
+        return x ^ (y | ~z)
+
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + (8 * len(data)).to_bytes(8, byteorder='little')
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    for offset in range(0, len(message), 64):
+        x = [int.from_bytes(message[offset + 4 * i:offset + 4 * i + 4], byteorder='little') for i in range(16)]
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(80):
+            t = rotate((al + f(j, bl, cl, dl) + x[RIPEMD160_R[j]] + RIPEMD160_K[j // 16]) & 0xFFFFFFFF, RIPEMD160_S[j])
+            al, bl, cl, dl, el = el, (t + el) & 0xFFFFFFFF, bl, rotate(cl, 10), dl
+            t = rotate((ar + f(79 - j, br, cr, dr) + x[RIPEMD160_RR[j]] + RIPEMD160_KK[j // 16]) & 0xFFFFFFFF,
+                       RIPEMD160_SS[j])
+            ar, br, cr, dr, er = er, (t + er) & 0xFFFFFFFF, br, rotate(cr, 10), dr
+        h = [
+            (h[1] + cl + dr) & 0xFFFFFFFF,
+            (h[2] + dl + er) & 0xFFFFFFFF,
+            (h[3] + el + ar) & 0xFFFFFFFF,
+            (h[4] + al + br) & 0xFFFFFFFF,
+            (h[0] + bl + cr) & 0xFFFFFFFF
+        ]
+
+    return b"".join(value.to_bytes(4, byteorder='little') for value in h)
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import hashlib
+import hmac
+import logging
+import time
+from collections.abc import Iterable, Iterator
+
+from generator.bip32 import ExtendedKey, KeyChain, HARDENED
+from generator.seed import Seed
+from generator.wordlist import LANGUAGE_DEFAULT
+
+PURPOSE = 83696968
+APPLICATION_BIP39 = 39
+ENTROPY_KEY = b"bip-entropy-from-k"
+
+WORD_COUNT_ALL = (12, 18, 24)
+# language codes of the bip85 spec, portuguese has none
+LANGUAGE_CODES = {
+    "english": 0, "japanese": 1, "korean": 2, "spanish": 3, "chinese_simplified": 4, "chinese_traditional": 5,
+    "french": 6, "italian": 7, "czech": 8
+}
+BATCH_SIZE = 256  # children derived at once
+
+LOGGER = logging.getLogger(__name__)
+
+
+def derive_entropy(master: Seed | KeyChain, path: str | Iterable[int]) -> bytes:
+    chain = master if isinstance(master, KeyChain) else KeyChain.from_seed(master)
+    return __get_entropy(chain.derive(path))
+
+
+def derive_mnemonic(
+        master: Seed | KeyChain,
+        index: int,
+        word_count: int = 12,
+        language: str = LANGUAGE_DEFAULT
+) -> Seed:
+    return next(derive_mnemonics(master, index, 1, word_count, language))
+
+
+def derive_mnemonics(
+        master: Seed | KeyChain,
+        start: int = 0,
+        count: int = 1,
+        word_count: int = 12,
+        language: str = LANGUAGE_DEFAULT
+) -> Iterator[Seed]:
+    if word_count not in WORD_COUNT_ALL:
+        raise ValueError("invalid word count\n\t"
+                         f"expected: {', '.join(str(v) for v in WORD_COUNT_ALL)} words\n\t"
+                         f"obtained: {word_count} words")
+
+    if language not in LANGUAGE_CODES:
+        raise ValueError("invalid language\n\t"
+                         f"expected: {', '.join(LANGUAGE_CODES)}\n\t"
+                         f"obtained: {language}")
+
+    if start < 0 or count < 0 or start + count > HARDENED:
+        raise ValueError("invalid child index\n\t"
+                         f"expected: 0-{HARDENED - 1}\n\t"
+                         f"obtained: {start}-{start + count - 1}")
+
+    # the chain caches the master and the m/83696968'/39'/<language>'/<words>' nodes,
+    # every child then costs a single hardened derivation
+    chain = master if isinstance(master, KeyChain) else KeyChain.from_seed(master)
+    path = f"m/{PURPOSE}'/{APPLICATION_BIP39}'/{LANGUAGE_CODES[language]}'/{word_count}'"
+
+    # arguments are validated on call, the children are derived on iteration
+    return __derive_mnemonics(chain, path, start, count, word_count * 4 // 3, language)
+
+
+def __derive_mnemonics(
+        chain: KeyChain, path: str, start: int, count: int, entropy_size: int, language: str
+) -> Iterator[Seed]:
+    begin = time.perf_counter()
+    for lo in range(start, start + count, BATCH_SIZE):
+        children = chain.derive_range(path, HARDENED + lo, min(BATCH_SIZE, start + count - lo), public=False)
+        for child in children:
+            yield Seed.from_entropy(__get_entropy(child)[:entropy_size], language)
+
+    elapsed = time.perf_counter() - begin
+    LOGGER.debug(f"derived {count} child mnemonics ({count / elapsed if elapsed else 0:.1f} mnemonics/s)")
+
+
+def __get_entropy(key: ExtendedKey) -> bytes:
+    return hmac.new(ENTROPY_KEY, key.private_key, hashlib.sha512).digest()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import functools
+import hashlib
+import logging
+from collections.abc import Iterable, Iterator
+
+from generator.seed import WORD_COUNT_ALL, WORD_SIZE, ENTROPY_SIZE_DIV
+from generator.wordindex import get_wordindex, detect_language
+
+LOGGER = logging.getLogger(__name__)
+
+
+@functools.cache
+def __get_layout(word_count: int) -> tuple[int, int, tuple[int]]:
+    seed_size = word_count * WORD_SIZE
+    entropy_size = seed_size // ENTROPY_SIZE_DIV * ENTROPY_SIZE_DIV
+    checksum_size = seed_size - entropy_size
+    free_size = WORD_SIZE - checksum_size
+
+    # last word id, without checksum, for every value of the free entropy bits
+    bases = tuple(free << checksum_size for free in range(2 ** free_size))
+
+    return entropy_size, checksum_size, bases
+
+
+def last_words(mnemonic: Iterable[str] | str, language: str | None = None) -> tuple[str]:
+    mnemonic = mnemonic.split() if isinstance(mnemonic, str) else tuple(mnemonic)
+
+    # a complete mnemonic is accepted as well, its last word is ignored
+    word_count = len(mnemonic)
+    if word_count in WORD_COUNT_ALL:
+        mnemonic = mnemonic[:-1]
+    elif word_count + 1 not in WORD_COUNT_ALL:
+        raise ValueError("invalid mnemonic size\n\t"
+                         f"expected: {', '.join(str(v - 1) for v in WORD_COUNT_ALL)} words\n\t"
+                         f"obtained: {word_count} words")
+
+    # the language of the words, detected if not given
+    wordindex = get_wordindex(language or detect_language(mnemonic))
+    prefix = 0
+    for word in mnemonic:
+        try:
+            prefix = (prefix << WORD_SIZE) | wordindex.resolve(word)
+        except ValueError as ve:
+            raise ValueError(f"invalid mnemonic word\n\t{str(ve)}")
+
+    entropy_size, checksum_size, bases = __get_layout(len(mnemonic) + 1)
+    free_size = WORD_SIZE - checksum_size
+    prefix <<= free_size
+
+    words = []
+    for free, base in enumerate(bases):
+        entropy = (prefix | free).to_bytes(entropy_size // 8, byteorder='big')
+        words.append(wordindex[base | hashlib.sha256(entropy).digest()[0] >> (8 - checksum_size)])
+
+    LOGGER.debug(f"found {len(words)} valid last words")
+    return tuple(words)
+
+
+def last_words_batch(
+        mnemonics: Iterable[Iterable[str] | str], language: str | None = None
+) -> Iterator[tuple[str]]:
+    for mnemonic in mnemonics:
+        yield last_words(mnemonic, language)
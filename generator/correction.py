@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import functools
+import hashlib
+import itertools
+import logging
+import unicodedata
+from collections.abc import Iterable, Iterator
+
+from generator.seed import Seed, WORD_COUNT_ALL, WORD_SIZE, ENTROPY_SIZE_DIV
+from generator.wordindex import get_wordindex
+from generator.wordlist import LANGUAGE_ALL, LANGUAGE_DEFAULT
+
+DISTANCE_MAX = 2  # edit operations per word
+
+LOGGER = logging.getLogger(__name__)
+
+
+def levenshtein(word_1: str, word_2: str) -> int:
+    if len(word_1) < len(word_2):
+        word_1, word_2 = word_2, word_1
+
+    row = list(range(len(word_2) + 1))
+    for i, letter_1 in enumerate(word_1, 1):
+        prev, row[0] = row[0], i
+        for j, letter_2 in enumerate(word_2, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (letter_1 != letter_2))
+
+    return row[-1]
+
+
+class DeletionIndex(object):
+    def __init__(self, words: Iterable[str], distance: int):
+        self.__distance = distance
+        self.__deletions = {}
+        for word in words:
+            for deletion in DeletionIndex.__get_deletions(word, distance):
+                self.__deletions.setdefault(deletion, set()).add(word)
+
+    def search(self, word: str, distance: int) -> tuple[tuple[int, str]]:
+        if distance > self.__distance:
+            raise ValueError("invalid distance\n\t"
+                             f"expected: 0-{self.__distance}\n\t"
+                             f"obtained: {distance}")
+
+        # two words within distance k share a string obtained by at most k deletions from each
+        matches = set()
+        for deletion in DeletionIndex.__get_deletions(word, distance):
+            matches.update(self.__deletions.get(deletion, ()))
+
+        return tuple(sorted(
+            (match_distance, match)
+            for match_distance, match in ((levenshtein(word, match), match) for match in matches)
+            if match_distance <= distance
+        ))
+
+    @staticmethod
+    def __get_deletions(word: str, distance: int) -> set[str]:
+        deletions = {word}
+        layer = {word}
+        for _ in range(distance):
+            layer = {w[:i] + w[i + 1:] for w in layer for i in range(len(w))}
+            deletions |= layer
+
+        return deletions
+
+
+@functools.cache
+def __get_index(language: str) -> DeletionIndex:
+    return DeletionIndex(get_wordindex(language).words, DISTANCE_MAX)
+
+
+@functools.lru_cache(maxsize=4096)
+def candidates(word: str, distance: int = 1, language: str = LANGUAGE_DEFAULT) -> tuple[tuple[int, str]]:
+    # wordlists are NFKD normalized
+    return __get_index(language).search(unicodedata.normalize('NFKD', word), distance)
+
+
+def correct(
+        mnemonic: Iterable[str] | str,
+        distance: int = 1,
+        limit: int | None = None,
+        language: str | None = None
+) -> Iterator[Seed]:
+    if isinstance(mnemonic, str):
+        mnemonic = mnemonic.split()
+    elif not isinstance(mnemonic, Iterable):
+        raise TypeError("invalid mnemonic type\n\t"
+                        "mnemonic must be of type string or iterable of strings")
+    else:
+        mnemonic = tuple(mnemonic)
+
+    word_count = len(mnemonic)
+    if word_count not in WORD_COUNT_ALL:
+        raise ValueError("invalid mnemonic size\n\t"
+                         f"expected: {', '.join(str(v) for v in WORD_COUNT_ALL)} words\n\t"
+                         f"obtained: {word_count} words")
+
+    seed_size = word_count * WORD_SIZE
+    entropy_size = seed_size // ENTROPY_SIZE_DIV * ENTROPY_SIZE_DIV
+    checksum_size = seed_size - entropy_size
+
+    # mistyped words can't be detected: the language is the one resolving most words, english first
+    language = language or max(LANGUAGE_ALL, key=lambda lang: (
+        sum(get_wordindex(lang).matches((word,)) for word in mnemonic), lang == LANGUAGE_DEFAULT
+    ))
+    wordindex = get_wordindex(language)
+
+    # resolve known words, collecting the unknown ones as suspects
+    wids = []
+    suspects = []
+    for i, word in enumerate(mnemonic):
+        try:
+            wids.append(wordindex.resolve(word))
+        except ValueError:
+            wids.append(0)
+            suspects.append(i)
+
+    # a valid mnemonic needs no correction
+    if not suspects and __is_valid(__to_seed(wids), entropy_size, checksum_size):
+        yield Seed.from_entropy(__to_entropy(__to_seed(wids), entropy_size, checksum_size), language)
+        return
+
+    for i in suspects:
+        if not candidates(mnemonic[i], distance, language):
+            raise ValueError("invalid mnemonic word\n\t"
+                             f"no candidates for '{mnemonic[i]}' within distance {distance}")
+
+    # correct the unknown words first, then assume that one more typo produced another bip39 word
+    results = __search(mnemonic, language, wids, suspects, distance, entropy_size, checksum_size) if suspects else []
+    if not results:
+        for i in range(word_count):
+            if i not in suspects:
+                results += __search(
+                    mnemonic, language, wids, sorted(suspects + [i]), distance, entropy_size, checksum_size
+                )
+
+    LOGGER.debug(f"found {len(results)} candidate mnemonics")
+
+    results.sort()
+    for cost, seed in results[:limit]:
+        yield Seed.from_entropy(__to_entropy(seed, entropy_size, checksum_size), language)
+
+
+def __search(
+        mnemonic: tuple[str],
+        language: str,
+        wids: list[int],
+        plan: list[int],
+        distance: int,
+        entropy_size: int,
+        checksum_size: int
+) -> list[tuple[int, int]]:
+    word_count = len(mnemonic)
+    wordindex = get_wordindex(language)
+
+    options = []
+    for i in plan:
+        word_options = tuple(
+            (word_distance, wordindex.index(word))
+            for word_distance, word in candidates(mnemonic[i], distance, language)
+            if word_distance > 0
+        )
+        LOGGER.debug(f"word {i + 1:2}: {mnemonic[i]} -> {', '.join(wordindex[wid] for _, wid in word_options)}")
+        options.append(word_options)
+
+    base = __to_seed(wid if i not in plan else 0 for i, wid in enumerate(wids))
+    shifts = tuple((word_count - i - 1) * WORD_SIZE for i in plan)
+
+    results = []
+    for combination in itertools.product(*options):
+        seed = base
+        cost = 0
+        for shift, (word_distance, wid) in zip(shifts, combination):
+            seed |= wid << shift
+            cost += word_distance
+
+        if __is_valid(seed, entropy_size, checksum_size):
+            results.append((cost, seed))
+
+    return results
+
+
+def __to_seed(wids: Iterable[int]) -> int:
+    seed = 0
+    for wid in wids:
+        seed = (seed << WORD_SIZE) | wid
+
+    return seed
+
+
+def __to_entropy(seed: int, entropy_size: int, checksum_size: int) -> bytes:
+    return (seed >> checksum_size).to_bytes(entropy_size // 8, byteorder='big')
+
+
+def __is_valid(seed: int, entropy_size: int, checksum_size: int) -> bool:
+    entropy_hash = hashlib.sha256(__to_entropy(seed, entropy_size, checksum_size)).digest()
+    return entropy_hash[0] >> (8 - checksum_size) == seed & (2 ** checksum_size - 1)
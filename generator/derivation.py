@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import concurrent.futures
+import hashlib
+import logging
+import os
+import time
+from collections.abc import Iterable
+
+from generator.seed import Seed, PBKDF2_ROUNDS, encode_mnemonic, encode_passphrase
+from generator.seedarray import SeedArray
+
+BACKEND_ALL = ('thread', 'process')
+
+CHUNK_SIZE = 64  # rootseeds per process pool task
+
+LOGGER = logging.getLogger(__name__)
+
+
+def derive_rootseeds(
+        seeds: Iterable[Seed] | SeedArray,
+        passphrases: Iterable[str] | str | None = None,
+        workers: int | None = None,
+        backend: str = 'thread'
+) -> list[bytes]:
+    if backend not in BACKEND_ALL:
+        raise ValueError("invalid backend\n\t"
+                         f"expected: {', '.join(BACKEND_ALL)}\n\t"
+                         f"obtained: {backend}")
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("invalid workers\n\t"
+                         "expected: 1 or more\n\t"
+                         f"obtained: {workers}")
+
+    if isinstance(seeds, SeedArray):
+        mnemonics = seeds.mnemonics()
+        default_passphrases = [""] * len(mnemonics)
+    else:
+        seeds = tuple(seeds)
+        mnemonics = [seed.mnemonic for seed in seeds]
+        default_passphrases = [seed.passphrase for seed in seeds]
+
+    if passphrases is None:
+        passphrases = default_passphrases
+    elif isinstance(passphrases, str):
+        passphrases = [passphrases] * len(mnemonics)
+    else:
+        passphrases = [str(passphrase) for passphrase in passphrases]
+        if len(passphrases) != len(mnemonics):
+            raise ValueError("invalid passphrases count\n\t"
+                             f"expected: {len(mnemonics)}\n\t"
+                             f"obtained: {len(passphrases)}")
+
+    passwords = [encode_mnemonic(mnemonic) for mnemonic in mnemonics]
+    salts = [encode_passphrase(passphrase) for passphrase in passphrases]
+
+    start = time.perf_counter()
+    if workers == 1 or len(passwords) <= 1:
+        # not worth a pool
+        rootseeds = list(map(__derive, passwords, salts))
+    elif backend == 'thread':
+        # hashlib releases the GIL while running pbkdf2
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            rootseeds = list(executor.map(__derive, passwords, salts))
+    else:
+        chunk_size = max(1, min(CHUNK_SIZE, len(passwords) // workers))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            rootseeds = list(executor.map(__derive, passwords, salts, chunksize=chunk_size))
+    elapsed = time.perf_counter() - start
+
+    LOGGER.info(f"derived {len(rootseeds)} rootseeds in {elapsed:.3f}s with {workers} {backend} workers "
+                f"({len(rootseeds) / elapsed if elapsed else 0:.1f} rootseeds/s)")
+
+    return rootseeds
+
+
+def __derive(password: bytes, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac('sha512', password, salt, PBKDF2_ROUNDS)
@@ -17,16 +17,155 @@
 #   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 #   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import collections
+import functools
 import hashlib
+import logging
+import os
 import secrets
+import threading
+import time
+import weakref
 
 SHA256_ROUNDS = 2048  # sha256 rounds (number)
 
 PASS_SIZE = 32  # bytes
 SALT_SIZE = 16  # bytes
+BLOCK_SIZE = 32  # bytes, one pbkdf2-sha256 output
+
+POOL_HIGH_WATER = 256  # blocks
+POOL_LOW_WATER = 64  # blocks, refill starts below this depth
+POOL_WORKERS = 1
 
 CSPRNG = secrets.SystemRandom()
 
+LOGGER = logging.getLogger(__name__)
+
+
+def conditioned_block() -> bytes:
+    return hashlib.pbkdf2_hmac(
+        'sha256',
+        CSPRNG.randbytes(PASS_SIZE),
+        CSPRNG.randbytes(SALT_SIZE),
+        SHA256_ROUNDS
+    )
+
+
+class EntropyPool(object):
+    __slots__ = (
+        '__workers', '__high_water', '__low_water', '__blocks', '__condition', '__threads', '__pid', '__stopped',
+        '__pending', '__produced', '__served', '__missed', '__busy', '__weakref__'
+    )
+
+    __pools = weakref.WeakSet()  # live pools of the process
+
+    def __init__(self, workers: int = POOL_WORKERS, high_water: int = POOL_HIGH_WATER, low_water: int = POOL_LOW_WATER):
+        if workers < 1 or not 0 <= low_water < high_water:
+            raise ValueError("invalid entropy pool\n\t"
+                             "expected: 1 or more workers, 0 <= low water < high water\n\t"
+                             f"obtained: {workers} workers, low water {low_water}, high water {high_water}")
+
+        self.__workers = workers
+        self.__high_water = high_water
+        self.__low_water = low_water
+        self.__reset()
+        EntropyPool.__pools.add(self)
+
+    @property
+    def depth(self) -> int:
+        return len(self.__blocks)
+
+    @property
+    def stats(self) -> dict:
+        with self.__condition:
+            return {
+                'depth': len(self.__blocks),
+                'high_water': self.__high_water,
+                'workers': len(self.__threads),
+                'produced': self.__produced,
+                'served': self.__served,
+                'missed': self.__missed,
+                'refill_rate': self.__produced / self.__busy if self.__busy else 0.0  # blocks/s per worker
+            }
+
+    def start(self):
+        with self.__condition:
+            if self.__pid != os.getpid():
+                self.__reset()
+
+            self.__stopped = False
+            self.__threads = [t for t in self.__threads if t.is_alive()]
+            while len(self.__threads) < self.__workers:
+                thread = threading.Thread(target=self.__fill, name="entropy-pool", daemon=True)
+                thread.start()
+                self.__threads.append(thread)
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+
+    def draw(self, count: int) -> list[bytes]:
+        if self.__pid != os.getpid():
+            self.__reset()
+
+        with self.__condition:
+            blocks = [self.__blocks.popleft() for _ in range(min(count, len(self.__blocks)))]
+            self.__served += len(blocks)
+            self.__missed += count - len(blocks)
+            if len(self.__blocks) < self.__low_water:
+                self.__condition.notify_all()
+
+        # never wait for the workers: an empty pool costs the same as no pool
+        return blocks + [conditioned_block() for _ in range(count - len(blocks))]
+
+    def __fill(self):
+        while True:
+            with self.__condition:
+                # blocks being computed by other workers count too: the depth never exceeds the high water
+                if len(self.__blocks) + self.__pending >= self.__high_water:
+                    while not self.__stopped and len(self.__blocks) + self.__pending >= self.__low_water:
+                        self.__condition.wait()
+
+                if self.__stopped:
+                    return
+
+                self.__pending += 1
+
+            start = time.perf_counter()
+            block = conditioned_block()  # hashlib releases the GIL while running pbkdf2
+            with self.__condition:
+                self.__blocks.append(block)
+                self.__pending -= 1
+                self.__produced += 1
+                self.__busy += time.perf_counter() - start
+
+    def __reset(self):
+        self.__blocks = collections.deque()
+        self.__condition = threading.Condition()
+        self.__threads = []
+        self.__pid = os.getpid()
+        self.__stopped = True
+        self.__pending = self.__produced = self.__served = self.__missed = 0
+        self.__busy = 0.0
+
+    @staticmethod
+    def __reset_pools():
+        for pool in list(EntropyPool.__pools):
+            pool.__reset()
+
+    # a forked child must never serve the blocks of its parent: a single hook for all the pools, which stay collectable
+    os.register_at_fork(after_in_child=__reset_pools)
+
+
+@functools.cache
+def get_pool() -> EntropyPool:
+    return EntropyPool()
+
 
 class Entropy:
     @classmethod
@@ -37,9 +176,17 @@ class Entropy:
 class BetterEntropy(Entropy):
     @classmethod
     def generate(cls, size=None) -> bytes:
-        return hashlib.pbkdf2_hmac(
-            'sha256',
-            CSPRNG.randbytes(PASS_SIZE),
-            CSPRNG.randbytes(SALT_SIZE),
-            SHA256_ROUNDS
-        )
+        return cls.generate_many(1, size)[0]
+
+    @classmethod
+    def generate_many(cls, count: int, size=None) -> list[bytes]:
+        size = size or BLOCK_SIZE * 8
+        if size % 8 or not 0 < size <= BLOCK_SIZE * 8:
+            raise ValueError("invalid entropy size\n\t"
+                             f"expected: 8-{BLOCK_SIZE * 8} bits, multiple of 8\n\t"
+                             f"obtained: {size} bits")
+
+        # conditioned blocks are precomputed in background, the first draw starts the pool
+        pool = get_pool()
+        pool.start()
+        return [block[:size // 8] for block in pool.draw(count)]
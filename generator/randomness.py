@@ -0,0 +1,368 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import concurrent.futures
+import logging
+import math
+import os
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from generator.entropy import Entropy, BetterEntropy, BLOCK_SIZE
+
+# a subset of NIST SP 800-22, every test keeps bounded state and sees the sequence in chunks
+TESTS = (
+    "frequency", "block_frequency", "runs", "longest_run", "serial_1", "serial_2", "approximate_entropy",
+    "cumulative_sums_forward", "cumulative_sums_reverse"
+)
+
+ALPHA = 0.01  # significance level
+UNIFORMITY_ALPHA = 0.0001  # significance level of the p-values distribution
+UNIFORMITY_BINS = 10
+UNIFORMITY_MIN = 55  # sequences needed to evaluate the p-values distribution
+
+BLOCK_FREQUENCY_SIZE = 128  # bits
+LONGEST_RUN_SIZE = 10000  # bits
+LONGEST_RUN_CLASSES = (10, 16)  # runs up to 10 and from 16 bits are grouped
+LONGEST_RUN_PROBABILITIES = (0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727)
+SERIAL_SIZE = 16  # bits
+APPROXIMATE_ENTROPY_SIZE = 10  # bits
+
+SEQUENCE_SIZE_MIN = 750000  # bits, needed by the longest run test
+SEQUENCE_SIZE_DEFAULT = 2 ** 20  # bits
+CHUNK_SIZE = 250000  # bytes, a multiple of the block sizes
+
+GAMMA_EPSILON = 1e-15
+GAMMA_ITERATIONS = 100000
+
+LOGGER = logging.getLogger(__name__)
+
+
+def igamc(a: float, x: float) -> float:
+    # regularized upper incomplete gamma function
+    if x <= 0:
+        return 1.0
+
+    scale = math.exp(a * math.log(x) - x - math.lgamma(a))
+    if x < a + 1:
+        term = total = 1 / a
+        for n in range(1, GAMMA_ITERATIONS):
+            term *= x / (a + n)
+            total += term
+            if abs(term) < abs(total) * GAMMA_EPSILON:
+                break
+        return max(0.0, 1 - total * scale)
+
+    # modified Lentz continued fraction
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    result = d
+    for n in range(1, GAMMA_ITERATIONS):
+        an = -n * (n - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        result *= d * c
+        if abs(d * c - 1) < GAMMA_EPSILON:
+            break
+    return result * scale
+
+
+def normal_cdf(x: float) -> float:
+    return (1 + math.erf(x / math.sqrt(2))) / 2
+
+
+class SequenceTest(object):
+    __slots__ = (
+        '__buffer', '__head', '__tail', '__bits', '__ones', '__last', '__transitions', '__sum', '__max', '__min',
+        '__block_chi', '__blocks', '__run_classes', '__windows', '__finished'
+    )
+
+    def __init__(self):
+        self.__buffer = bytearray()
+        self.__head = self.__tail = None
+        self.__bits = self.__ones = self.__transitions = 0
+        self.__last = None
+        self.__sum = self.__max = self.__min = 0
+        self.__block_chi = 0.0
+        self.__blocks = 0
+        self.__run_classes = np.zeros(len(LONGEST_RUN_PROBABILITIES), dtype=np.int64)
+        self.__windows = np.zeros(2 ** SERIAL_SIZE, dtype=np.int64)
+        self.__finished = False
+
+    @property
+    def size(self) -> int:
+        return self.__bits + len(self.__buffer) * 8
+
+    def update(self, data: bytes):
+        if self.__finished:
+            raise ValueError("invalid sequence test\n\t"
+                             "the sequence is already evaluated")
+
+        self.__buffer += data
+        processed = len(self.__buffer) - len(self.__buffer) % CHUNK_SIZE
+        for offset in range(0, processed, CHUNK_SIZE):
+            self.__update(np.frombuffer(self.__buffer, dtype=np.uint8, count=CHUNK_SIZE, offset=offset))
+        del self.__buffer[:processed]
+
+    def p_values(self) -> dict[str, float]:
+        if not self.__finished:
+            if self.size < SEQUENCE_SIZE_MIN:
+                raise ValueError("invalid sequence size\n\t"
+                                 f"expected: {SEQUENCE_SIZE_MIN} bits or more\n\t"
+                                 f"obtained: {self.size} bits")
+
+            if self.__buffer:
+                self.__update(np.frombuffer(self.__buffer, dtype=np.uint8))
+                self.__buffer = bytearray()
+
+            # the pattern tests are cyclic: the last windows wrap around the first bits
+            self.__count_windows(np.concatenate((self.__tail, self.__head)))
+            self.__finished = True
+
+        n = self.__bits
+        result = {"frequency": math.erfc(abs(2 * self.__ones - n) / math.sqrt(2 * n))}
+        result["block_frequency"] = igamc(self.__blocks / 2, 2 * BLOCK_FREQUENCY_SIZE * self.__block_chi)
+
+        pi = self.__ones / n
+        if abs(pi - 0.5) >= 2 / math.sqrt(n):
+            result["runs"] = 0.0  # the frequency prerequisite fails
+        else:
+            runs = self.__transitions + 1
+            result["runs"] = math.erfc(abs(runs - 2 * n * pi * (1 - pi)) / (2 * math.sqrt(2 * n) * pi * (1 - pi)))
+
+        blocks = self.__run_classes.sum()
+        expected = blocks * np.array(LONGEST_RUN_PROBABILITIES)
+        chi = float(((self.__run_classes - expected) ** 2 / expected).sum())
+        result["longest_run"] = igamc((len(LONGEST_RUN_PROBABILITIES) - 1) / 2, chi / 2)
+
+        psi = {m: SequenceTest.__psi(self.__pattern_counts(m), n) for m in range(SERIAL_SIZE - 2, SERIAL_SIZE + 1)}
+        delta1 = psi[SERIAL_SIZE] - psi[SERIAL_SIZE - 1]
+        delta2 = psi[SERIAL_SIZE] - 2 * psi[SERIAL_SIZE - 1] + psi[SERIAL_SIZE - 2]
+        result["serial_1"] = igamc(2 ** (SERIAL_SIZE - 2), delta1 / 2)
+        result["serial_2"] = igamc(2 ** (SERIAL_SIZE - 3), delta2 / 2)
+
+        phi = [SequenceTest.__phi(self.__pattern_counts(m), n)
+               for m in (APPROXIMATE_ENTROPY_SIZE, APPROXIMATE_ENTROPY_SIZE + 1)]
+        chi = 2 * n * (math.log(2) - (phi[0] - phi[1]))
+        result["approximate_entropy"] = igamc(2 ** (APPROXIMATE_ENTROPY_SIZE - 1), chi / 2)
+
+        # the reverse partial sums are S(n) - S(k), for every k
+        result["cumulative_sums_forward"] = SequenceTest.__cusum(max(self.__max, -self.__min), n)
+        result["cumulative_sums_reverse"] = SequenceTest.__cusum(
+            max(self.__max - self.__sum, self.__sum - self.__min), n
+        )
+        return result
+
+    def __update(self, data: np.ndarray):
+        bits = np.unpackbits(data)
+        self.__bits += len(bits)
+        self.__ones += int(np.count_nonzero(bits))
+
+        self.__transitions += int(np.count_nonzero(bits[1:] != bits[:-1]))
+        if self.__last is not None:
+            self.__transitions += int(self.__last != bits[0])
+        self.__last = bits[-1]
+
+        sums = np.cumsum(bits.astype(np.int64) * 2 - 1) + self.__sum
+        self.__sum = int(sums[-1])
+        self.__max = max(self.__max, int(sums.max()))
+        self.__min = min(self.__min, int(sums.min()))
+
+        # chunks are aligned to the blocks, a partial block at the end of the sequence is discarded
+        count = len(bits) // BLOCK_FREQUENCY_SIZE
+        ones = bits[:count * BLOCK_FREQUENCY_SIZE].reshape(count, -1).sum(axis=1, dtype=np.int64)
+        self.__block_chi += float(((ones / BLOCK_FREQUENCY_SIZE - 0.5) ** 2).sum())
+        self.__blocks += count
+
+        count = len(bits) // LONGEST_RUN_SIZE
+        if count:
+            padded = np.zeros((count, LONGEST_RUN_SIZE + 2), dtype=np.int8)
+            padded[:, 1:-1] = bits[:count * LONGEST_RUN_SIZE].reshape(count, -1)
+            steps = np.diff(padded.ravel())
+            starts = np.flatnonzero(steps == 1)
+            lengths = np.flatnonzero(steps == -1) - starts
+            longest = np.zeros(count, dtype=np.int64)
+            np.maximum.at(longest, starts // (LONGEST_RUN_SIZE + 2), lengths)
+            classes = np.clip(longest, *LONGEST_RUN_CLASSES) - LONGEST_RUN_CLASSES[0]
+            self.__run_classes += np.bincount(classes, minlength=len(LONGEST_RUN_PROBABILITIES))
+
+        if self.__head is None:
+            self.__head = data[:2].copy()
+        else:
+            data = np.concatenate((self.__tail, data))
+        self.__count_windows(data)
+        self.__tail = data[-2:].copy()
+
+    def __count_windows(self, data: np.ndarray):
+        # every serial window starts in one byte and spans the next two, one window per bit offset
+        if len(data) < 3:
+            return
+
+        words = data[:-2].astype(np.uint32) << 16 | data[1:-1].astype(np.uint32) << 8 | data[2:]
+        for shift in range(8, 0, -1):
+            self.__windows += np.bincount((words >> shift) & 0xffff, minlength=2 ** SERIAL_SIZE)
+
+    def __pattern_counts(self, size: int) -> np.ndarray:
+        # shorter patterns are the prefixes of the serial windows
+        return self.__windows.reshape(2 ** size, -1).sum(axis=1)
+
+    @staticmethod
+    def __psi(counts: np.ndarray, n: int) -> float:
+        return float((counts.astype(np.float64) ** 2).sum()) * len(counts) / n - n
+
+    @staticmethod
+    def __phi(counts: np.ndarray, n: int) -> float:
+        frequencies = counts[counts > 0] / n
+        return float((frequencies * np.log(frequencies)).sum())
+
+    @staticmethod
+    def __cusum(z: int, n: int) -> float:
+        result = 1.0
+        sqrt_n = math.sqrt(n)
+        # same summation bounds as the NIST reference implementation
+        for k in range(int((-n / z + 1) / 4), math.floor((n / z - 1) / 4) + 1):
+            result -= normal_cdf((4 * k + 1) * z / sqrt_n) - normal_cdf((4 * k - 1) * z / sqrt_n)
+        for k in range(int((-n / z - 3) / 4), math.floor((n / z - 1) / 4) + 1):
+            result += normal_cdf((4 * k + 3) * z / sqrt_n) - normal_cdf((4 * k + 1) * z / sqrt_n)
+        return result
+
+
+def sample(generator: type[Entropy], size: int) -> Iterator[bytes]:
+    # streams size bits of generator output, one chunk at a time
+    if size % 8 or size <= 0:
+        raise ValueError("invalid sequence size\n\t"
+                         "expected: a positive multiple of 8 bits\n\t"
+                         f"obtained: {size} bits")
+
+    remaining = size // 8
+    while remaining:
+        count = min(remaining, CHUNK_SIZE)
+        if issubclass(generator, BetterEntropy):
+            blocks = generator.generate_many(-(-count // BLOCK_SIZE))
+            yield b"".join(blocks)[:count]
+        else:
+            yield generator.generate(count * 8).to_bytes(count, byteorder='big')
+        remaining -= count
+
+
+def evaluate(chunks: Iterable[bytes]) -> dict[str, float]:
+    test = SequenceTest()
+    for chunk in chunks:
+        test.update(chunk)
+    return test.p_values()
+
+
+def __evaluate_sample(generator: type[Entropy], size: int) -> dict[str, float]:
+    return evaluate(sample(generator, size))
+
+
+class Report(object):
+    __slots__ = ('__generator', '__size', '__p_values')
+
+    def __init__(self, generator: str, size: int, p_values: Iterable[dict[str, float]]):
+        self.__generator = generator
+        self.__size = size
+        self.__p_values = np.array([[result[name] for name in TESTS] for result in p_values], dtype=np.float64)
+
+    @property
+    def sequences(self) -> int:
+        return len(self.__p_values)
+
+    @property
+    def p_values(self) -> dict[str, np.ndarray]:
+        return {name: self.__p_values[:, i] for i, name in enumerate(TESTS)}
+
+    @property
+    def proportions(self) -> dict[str, float]:
+        return {name: float(np.mean(values >= ALPHA)) for name, values in self.p_values.items()}
+
+    @property
+    def proportion_min(self) -> float:
+        # 3 sigma confidence interval of the expected proportion
+        return 1 - ALPHA - 3 * math.sqrt(ALPHA * (1 - ALPHA) / self.sequences)
+
+    @property
+    def uniformity(self) -> dict[str, float | None]:
+        if self.sequences < UNIFORMITY_MIN:
+            return {name: None for name in TESTS}
+
+        expected = self.sequences / UNIFORMITY_BINS
+        result = {}
+        for name, values in self.p_values.items():
+            bins = np.minimum((values * UNIFORMITY_BINS).astype(np.int64), UNIFORMITY_BINS - 1)
+            chi = float(((np.bincount(bins, minlength=UNIFORMITY_BINS) - expected) ** 2).sum() / expected)
+            result[name] = igamc((UNIFORMITY_BINS - 1) / 2, chi / 2)
+        return result
+
+    @property
+    def passed(self) -> dict[str, bool]:
+        uniformity = self.uniformity
+        return {
+            name: proportion >= self.proportion_min and (uniformity[name] is None or
+                                                         uniformity[name] >= UNIFORMITY_ALPHA)
+            for name, proportion in self.proportions.items()
+        }
+
+    def to_string(self) -> str:
+        uniformity = self.uniformity
+        lines = [
+            f"generator: {self.__generator}",
+            f"sequences: {self.sequences} x {self.__size} bits",
+            f"minimum pass proportion: {self.proportion_min:.4f} (alpha = {ALPHA})",
+            "",
+            f"{'test':<26}{'proportion':>12}{'uniformity':>12}  result"
+        ]
+        for name, passed in self.passed.items():
+            value = "n/a" if uniformity[name] is None else f"{uniformity[name]:.6f}"
+            lines.append(f"{name:<26}{self.proportions[name]:>12.4f}{value:>12}  {'PASSED' if passed else 'FAILED'}")
+
+        lines.append("")
+        lines.append(f"result: {'PASSED' if all(self.passed.values()) else 'FAILED'}")
+        return "\n".join(lines)
+
+
+def run(generator: type[Entropy], sequences: int, size: int = SEQUENCE_SIZE_DEFAULT,
+        workers: int | None = None) -> Report:
+    if sequences < 1:
+        raise ValueError("invalid number of sequences\n\t"
+                         "expected: 1 or more\n\t"
+                         f"obtained: {sequences}")
+
+    if size < SEQUENCE_SIZE_MIN:
+        raise ValueError("invalid sequence size\n\t"
+                         f"expected: {SEQUENCE_SIZE_MIN} bits or more\n\t"
+                         f"obtained: {size} bits")
+
+    # each sequence is generated and evaluated by a single worker, memory is bounded by the chunk size
+    workers = min(workers or os.cpu_count() or 1, sequences)
+    if workers == 1:
+        p_values = [__evaluate_sample(generator, size) for _ in range(sequences)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            p_values = list(executor.map(__evaluate_sample, [generator] * sequences, [size] * sequences))
+
+    LOGGER.info(f"evaluated {sequences} sequences of {size} bits from {generator.__name__}")
+    return Report(generator.__name__, size, p_values)
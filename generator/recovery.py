@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+
+from generator.address import GAP_LIMIT, to_script, to_script_type, from_address
+from generator.bip32 import KeyChain
+from generator.seed import Seed, WORD_COUNT_ALL, WORD_SIZE, ENTROPY_SIZE_DIV, PBKDF2_ROUNDS, encode_passphrase
+from generator.wordindex import wordindex
+
+UNKNOWN_WORD = "?"
+UNKNOWN_MAX = 3  # words
+
+SHARD_SIZE = 2 ** 16  # candidates per process pool task
+CHECKPOINT_INTERVAL = 30  # seconds
+
+LOGGER = logging.getLogger(__name__)
+
+
+def recover(
+        mnemonic: Iterable[str] | str,
+        word_count: int | None = None,
+        swap: bool = False,
+        rootseed: bytes | str | None = None,
+        passphrase: str = "",
+        workers: int | None = None,
+        checkpoint: str | None = None,
+        address: str | None = None
+) -> list[Seed]:
+    mnemonic = mnemonic.split() if isinstance(mnemonic, str) else tuple(mnemonic)
+    word_count = word_count or len(mnemonic)
+
+    if word_count not in WORD_COUNT_ALL or len(mnemonic) > word_count:
+        raise ValueError("invalid mnemonic size\n\t"
+                         f"expected: {', '.join(str(v) for v in WORD_COUNT_ALL)} words\n\t"
+                         f"obtained: {len(mnemonic)} of {word_count} words")
+
+    unknown_count = word_count - len(mnemonic) + mnemonic.count(UNKNOWN_WORD)
+    if unknown_count > UNKNOWN_MAX:
+        raise ValueError("invalid unknown words count\n\t"
+                         f"expected: 0-{UNKNOWN_MAX} words\n\t"
+                         f"obtained: {unknown_count} words")
+
+    if isinstance(rootseed, str):
+        try:
+            rootseed = bytes.fromhex(rootseed)
+        except ValueError as ve:
+            raise ValueError(f"invalid rootseed value\n\t{ve}") from None
+
+    # a known address confirms the candidates when the rootseed is unknown
+    script = from_address(address) if address else None
+    if script:
+        to_script_type(script)
+
+    wids = []
+    for word in mnemonic:
+        try:
+            wids.append(-1 if word == UNKNOWN_WORD else wordindex.resolve(word))
+        except ValueError as ve:
+            raise ValueError(f"invalid mnemonic word\n\t{str(ve)}")
+
+    templates = __get_templates(wids, word_count, swap)
+    shards = tuple(
+        (template, lo, min(lo + SHARD_SIZE, size))
+        for template in templates
+        for size in (__get_space_size(template),)
+        for lo in range(0, size, SHARD_SIZE)
+    )
+    LOGGER.info(f"searching {sum(hi - lo for _, lo, hi in shards)} candidates "
+                f"in {len(templates)} layouts and {len(shards)} shards")
+
+    # checkpoints hold no mnemonics, and are no cheaper to guess than the rootseed
+    nonce = os.urandom(16).hex()
+    done, hits = set(), set()
+    if checkpoint and os.path.isfile(checkpoint):
+        nonce, done, hits = __load_checkpoint(checkpoint, templates, rootseed, passphrase, address)
+        LOGGER.info(f"resuming search after {len(done)} of {len(shards)} shards, rescanning {len(hits)} of them")
+    search_id = __get_search_id(templates, rootseed, passphrase, address, nonce)
+
+    # the shards holding mnemonics are scanned again
+    done -= hits
+    hits = set()
+    found = set()
+    pending = (
+        (sid, (template, lo, hi, rootseed, passphrase, script))
+        for sid, (template, lo, hi) in enumerate(shards) if sid not in done
+    )
+
+    start = last_checkpoint = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for sid, args in pending:
+            result = __scan(*args)
+            found.update(result)
+            done.add(sid)
+            if result:
+                hits.add(sid)
+            if checkpoint and time.perf_counter() - last_checkpoint > CHECKPOINT_INTERVAL:
+                __save_checkpoint(checkpoint, search_id, nonce, done, hits)
+                last_checkpoint = time.perf_counter()
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # keep a bounded number of shards in flight
+            futures = {executor.submit(__scan, *args): sid for sid, args in itertools.islice(pending, 2 * workers)}
+            while futures:
+                completed, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    sid = futures.pop(future)
+                    result = future.result()
+                    found.update(result)
+                    done.add(sid)
+                    if result:
+                        hits.add(sid)
+
+                for sid, args in itertools.islice(pending, len(completed)):
+                    futures[executor.submit(__scan, *args)] = sid
+
+                if checkpoint and time.perf_counter() - last_checkpoint > CHECKPOINT_INTERVAL:
+                    __save_checkpoint(checkpoint, search_id, nonce, done, hits)
+                    last_checkpoint = time.perf_counter()
+                    LOGGER.info(f"searched {len(done)} of {len(shards)} shards, found {len(found)} mnemonics")
+
+    if checkpoint:
+        __save_checkpoint(checkpoint, search_id, nonce, done, hits)
+
+    LOGGER.info(f"found {len(found)} mnemonics in {time.perf_counter() - start:.3f}s")
+
+    seeds = [Seed.from_entropy(entropy) for entropy in sorted(found)]
+    for seed in seeds:
+        seed.passphrase = passphrase
+
+    return seeds
+
+
+def __get_templates(wids: list[int], word_count: int, swap: bool) -> list[tuple[int]]:
+    missing_count = word_count - len(wids)
+
+    templates = []
+    for positions in itertools.combinations(range(word_count), missing_count):
+        known = iter(wids)
+        template = [-1 if i in positions else next(known) for i in range(word_count)]
+        templates.append(tuple(template))
+
+        if swap:
+            for i in range(word_count - 1):
+                swapped = list(template)
+                swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+                templates.append(tuple(swapped))
+
+    # different layouts may produce the same template, e.g. swapping two unknown words
+    return list(dict.fromkeys(templates))
+
+
+def __get_space_size(template: tuple[int]) -> int:
+    # when the last word is unknown, its valid values are computed from the checksum
+    unknown_count = template.count(-1) - (template[-1] == -1)
+    return 2 ** (WORD_SIZE * unknown_count)
+
+
+def __scan(
+        template: tuple[int], lo: int, hi: int, rootseed: bytes | None, passphrase: str, script: bytes | None
+) -> set[bytes]:
+    word_count = len(template)
+    seed_size = word_count * WORD_SIZE
+    entropy_size = seed_size // ENTROPY_SIZE_DIV * ENTROPY_SIZE_DIV
+    entropy_bytes = entropy_size // 8
+    checksum_size = seed_size - entropy_size
+    checksum_mask = 2 ** checksum_size - 1
+    checksum_shift = 8 - checksum_size
+
+    base = 0
+    for wid in template:
+        base = (base << WORD_SIZE) | max(wid, 0)
+
+    last_unknown = template[-1] == -1
+    shifts = tuple(
+        (word_count - i - 1) * WORD_SIZE
+        for i, wid in enumerate(template) if wid == -1 and not (last_unknown and i == word_count - 1)
+    )
+    digit_mask = 2 ** WORD_SIZE - 1
+    free_range = range(2 ** (WORD_SIZE - checksum_size)) if last_unknown else range(1)
+
+    found = set()
+    for index in range(lo, hi):
+        seed = base
+        for shift in shifts:
+            seed |= (index & digit_mask) << shift
+            index >>= WORD_SIZE
+
+        entropy_base = seed >> checksum_size
+        for free in free_range:
+            entropy = (entropy_base | free).to_bytes(entropy_bytes, byteorder='big')
+            checksum = hashlib.sha256(entropy).digest()[0] >> checksum_shift
+            if last_unknown or checksum == seed & checksum_mask:
+                found.add(entropy)
+
+    if rootseed or script:
+        found = set(entropy for entropy in found if __confirm(entropy, rootseed, passphrase, script))
+
+    return found
+
+
+def __confirm(entropy: bytes, rootseed: bytes | None, passphrase: str, script: bytes | None) -> bool:
+    seed = Seed.from_entropy(entropy)
+    seed.passphrase = passphrase
+    if rootseed and not seed.rootseed.startswith(rootseed):
+        return False
+
+    if script:
+        # the address must be among the first receive addresses of the first account
+        script_type = to_script_type(script)
+        children = KeyChain.from_seed(seed).derive_range(f"{script_type.to_path()}/0", 0, GAP_LIMIT)
+        return any(to_script(child, script_type) == script for child in children)
+
+    return True
+
+
+def __get_search_id(
+        templates: list[tuple[int]], rootseed: bytes | None, passphrase: str, address: str | None, nonce: str
+) -> str:
+    # a resumed search must confirm the candidates the same way: the rootseed and passphrase enter through pbkdf2,
+    # so the checkpoint is no cheaper to guess than the rootseed itself
+    tag = hashlib.pbkdf2_hmac(
+        'sha256', encode_passphrase(passphrase), b'checkpoint' + bytes.fromhex(nonce) + (rootseed or b""),
+        PBKDF2_ROUNDS
+    )
+    return hashlib.sha256(json.dumps([templates, address, nonce, tag.hex()]).encode('utf-8')).hexdigest()
+
+
+def __load_checkpoint(
+        checkpoint: str, templates: list[tuple[int]], rootseed: bytes | None, passphrase: str, address: str | None
+) -> tuple[str, set[int], set[int]]:
+    with open(checkpoint, 'r') as file:
+        data = json.load(file)
+
+    if 'nonce' not in data or \
+            data.get('search') != __get_search_id(templates, rootseed, passphrase, address, data['nonce']):
+        raise ValueError("invalid checkpoint\n\t"
+                         f"'{checkpoint}' belongs to a different search, rootseed, address or passphrase")
+
+    return data['nonce'], set(data['done']), set(data['hits'])
+
+
+def __save_checkpoint(checkpoint: str, search_id: str, nonce: str, done: set[int], hits: set[int]):
+    # only shard ids: the shards holding mnemonics are scanned again on resume
+    with open(checkpoint + ".tmp", 'w') as file:
+        json.dump({'search': search_id, 'nonce': nonce, 'done': sorted(done), 'hits': sorted(hits)}, file)
+
+    os.replace(checkpoint + ".tmp", checkpoint)
@@ -23,10 +23,12 @@
 import hashlib
 import logging
 import math
+import unicodedata
 
 from collections.abc import Iterable
 
-from generator.wordlist import wordlist
+from generator.wordindex import get_wordindex, detect_language
+from generator.wordlist import LANGUAGE_DEFAULT
 
 ENTROPY_SIZE_MIN = 128
 ENTROPY_SIZE_MAX = 256
@@ -42,28 +44,51 @@ WORD_COUNT_ALL = sorted(tuple(
     set(math.ceil(wc / WORD_SIZE) for wc in ENTROPY_SIZE_ALL)
 ))
 
+PBKDF2_ROUNDS = 2048  # rootseed derivation rounds (number)
+
 LOGGER = logging.getLogger(__name__)
 
 
+def encode_mnemonic(mnemonic: Iterable[str]) -> bytes:
+    return bytes(unicodedata.normalize('NFKD', " ".join(mnemonic)), 'utf-8')
+
+
+def encode_passphrase(passphrase: str) -> bytes:
+    return bytes(unicodedata.normalize('NFKD', 'mnemonic' + passphrase), 'utf-8')
+
+
 class Seed(object):
+    __slots__ = ('__entropy', '__language', '__passphrase', '__checksum', '__mnemonic', '__rootseed')
+
     __create_key = object()
 
-    def __init__(self, create_key, entropy: bytes):
+    def __init__(self, create_key, entropy: bytes, language: str = LANGUAGE_DEFAULT):
         assert create_key == Seed.__create_key, \
             "seed objects must be created from_entropy or from_mnemonic."
 
         self.__entropy = entropy
+        self.__language = language
         self.__passphrase = ""
 
+        # lazily computed, see wipe()
+        self.__checksum = None
+        self.__mnemonic = None
+        self.__rootseed = None
+
     def __eq__(self, other):
         result = False
         if isinstance(other, Seed):
-            result = self.__entropy == other.__entropy and self.__passphrase == other.__passphrase
+            result = self.__entropy == other.__entropy and self.__passphrase == other.__passphrase and \
+                     self.__language == other.__language
 
         return result
 
+    def __reduce__(self):
+        # only the raw entropy is pickled, e.g. to process pools: cached values are recomputed on demand
+        return Seed.from_entropy, (self.__entropy, self.__language), (None, {'passphrase': self.__passphrase})
+
     @classmethod
-    def from_entropy(cls, entropy: bytes | int | str) -> 'Seed':
+    def from_entropy(cls, entropy: bytes | int | str, language: str = LANGUAGE_DEFAULT) -> 'Seed':
         if isinstance(entropy, bytes):
             entropy_size = len(entropy) * 8
         elif isinstance(entropy, int):
@@ -86,10 +111,17 @@ class Seed(object):
                              f"expected: {', '.join(str(v) for v in ENTROPY_SIZE_ALL)} bits\n\t"
                              f"obtained: {entropy_size} bits")
 
-        return Seed(cls.__create_key, entropy)
+        get_wordindex(language)  # validates the language
+
+        return Seed(cls.__create_key, entropy, language)
 
     @classmethod
-    def from_mnemonic(cls, mnemonic: Iterable[str] | str, correct_last_word: bool = False) -> 'Seed':
+    def from_mnemonic(
+            cls,
+            mnemonic: Iterable[str] | str,
+            correct_last_word: bool = False,
+            language: str | None = None
+    ) -> 'Seed':
         if isinstance(mnemonic, str):
             mnemonic = mnemonic.split()
         elif not isinstance(mnemonic, Iterable):
@@ -106,11 +138,15 @@ class Seed(object):
                              f"expected: {', '.join(str(v) for v in WORD_COUNT_ALL)} words\n\t"
                              f"obtained: {word_count} words")
 
+        language = language or detect_language(mnemonic)
+        LOGGER.debug(f"language: {language}")
+
+        wordindex = get_wordindex(language)
         seed = 0
         word = ""
         for i, word in enumerate(mnemonic):
             try:
-                wid = wordlist.index(word)
+                wid = wordindex.resolve(word)
             except ValueError as ve:
                 raise ValueError(f"invalid mnemonic word\n\t{str(ve)}")
 
@@ -127,7 +163,7 @@ class Seed(object):
         LOGGER.debug(f"entropy: {entropy.hex()}")
         LOGGER.debug(f"checksum: {bin(checksum)[2:].zfill(checksum_size)}")
 
-        result = Seed(cls.__create_key, entropy)
+        result = Seed(cls.__create_key, entropy, language)
         if result.checksum != checksum:
             if correct_last_word:
                 LOGGER.info(f"last word modified from '{word}' to '{list(result.mnemonic)[-1]}' to match checksum")
@@ -140,6 +176,9 @@ class Seed(object):
 
     @property
     def checksum(self) -> int:
+        if self.__checksum is not None:
+            return self.__checksum
+
         entropy_size = len(self.__entropy) * 8
         checksum_size = math.ceil(entropy_size / WORD_SIZE) * WORD_SIZE - entropy_size
 
@@ -149,6 +188,7 @@ class Seed(object):
         checksum = entropy_hash[0] >> (8 - checksum_size)
         LOGGER.debug(f"checksum: {bin(checksum)[2:].zfill(checksum_size)}")
 
+        self.__checksum = checksum
         return checksum
 
     @property
@@ -157,22 +197,40 @@ class Seed(object):
 
     @property
     def mnemonic(self) -> tuple[str]:
+        if self.__mnemonic is not None:
+            return self.__mnemonic
+
         entropy_size = len(self.__entropy) * 8
         checksum_size = math.ceil(entropy_size / WORD_SIZE) * WORD_SIZE - entropy_size
 
         seed = (int.from_bytes(self.__entropy, byteorder='big') << checksum_size) | self.checksum
         LOGGER.debug(f"seed: {hex(seed)[2:]}")
 
+        wordindex = get_wordindex(self.__language)
         word_count = (entropy_size + checksum_size) // WORD_SIZE
         mnemonic = []
         for i in range(word_count):
             wid = seed >> ((word_count - i - 1) * WORD_SIZE) & (2 ** WORD_SIZE - 1)
-            word = str(wordlist[wid])
+            word = wordindex[wid]
 
             LOGGER.debug(f"word {i + 1:2}: {wid:4} - {word}")
             mnemonic.append(word)
 
-        return tuple(mnemonic)
+        self.__mnemonic = tuple(mnemonic)
+        return self.__mnemonic
+
+    @property
+    def language(self) -> str:
+        return self.__language
+
+    @language.setter
+    def language(self, language: str):
+        get_wordindex(language)  # validates the language
+        if language != self.__language:
+            self.__mnemonic = None
+            self.__wipe_rootseed()
+
+        self.__language = language
 
     @property
     def passphrase(self):
@@ -180,10 +238,38 @@ class Seed(object):
 
     @passphrase.setter
     def passphrase(self, passphrase: str):
-        self.__passphrase = str(passphrase)
+        passphrase = str(passphrase)
+        if passphrase != self.__passphrase:
+            self.__wipe_rootseed()
+
+        self.__passphrase = passphrase
 
     @property
     def rootseed(self) -> bytes:
-        return hashlib.pbkdf2_hmac('sha512',
-                                   bytes(" ".join(self.mnemonic), 'utf-8'),
-                                   bytes('mnemonic' + self.__passphrase, 'utf-8'), 2048)
+        if self.__rootseed is None:
+            self.__rootseed = bytearray(
+                hashlib.pbkdf2_hmac('sha512',
+                                    encode_mnemonic(self.mnemonic),
+                                    encode_passphrase(self.__passphrase), PBKDF2_ROUNDS)
+            )
+
+        return bytes(self.__rootseed)
+
+    def wipe(self):
+        self.__checksum = None
+        self.__mnemonic = None
+        self.__wipe_rootseed()
+
+    def __wipe_rootseed(self):
+        if self.__rootseed is not None:
+            self.__rootseed[:] = bytes(len(self.__rootseed))
+            self.__rootseed = None
+
+
+def __getattr__(name: str):
+    # SeedArray needs numpy: import it only when used
+    if name == "SeedArray":
+        from generator.seedarray import SeedArray
+        return SeedArray
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import hashlib
+import logging
+import math
+from collections.abc import Iterable
+
+import numpy as np
+
+from generator.seed import Seed, ENTROPY_SIZE_ALL, ENTROPY_SIZE_DIV, ENTROPY_SIZE_MIN, WORD_COUNT_ALL, WORD_SIZE
+from generator.wordindex import get_wordindex, detect_language
+from generator.wordlist import LANGUAGE_DEFAULT
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SeedArray(object):
+    __slots__ = ('__entropies', '__language', '__checksums')
+
+    __words = {}  # wordlists as arrays, for bulk gathering
+
+    def __init__(self, entropies: np.ndarray, language: str = LANGUAGE_DEFAULT):
+        if entropies.ndim != 2 or entropies.dtype != np.uint8:
+            raise TypeError("invalid entropies type\n\t"
+                            "entropies must be a 2-dimensional array of uint8")
+
+        entropy_size = entropies.shape[1] * 8
+        if entropy_size not in ENTROPY_SIZE_ALL:
+            raise ValueError("invalid entropy size\n\t"
+                             f"expected: {', '.join(str(v) for v in ENTROPY_SIZE_ALL)} bits\n\t"
+                             f"obtained: {entropy_size} bits")
+
+        get_wordindex(language)  # validates the language
+
+        self.__entropies = entropies
+        self.__language = language
+        self.__checksums = None
+
+    def __len__(self) -> int:
+        return self.__entropies.shape[0]
+
+    def __getitem__(self, index: int | slice) -> 'Seed | SeedArray':
+        if isinstance(index, slice):
+            return SeedArray(self.__entropies[index], self.__language)
+
+        return Seed.from_entropy(self.__entropies[index].tobytes(), self.__language)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reduce__(self):
+        return SeedArray, (np.ascontiguousarray(self.__entropies), self.__language)
+
+    @classmethod
+    def from_entropies(
+            cls,
+            entropies: Iterable[bytes | int | str] | np.ndarray,
+            language: str = LANGUAGE_DEFAULT
+    ) -> 'SeedArray':
+        if isinstance(entropies, np.ndarray):
+            # other dtypes would be silently cast and truncated
+            if entropies.dtype != np.uint8:
+                raise TypeError("invalid entropies type\n\t"
+                                "expected: an array of uint8\n\t"
+                                f"obtained: an array of {entropies.dtype}")
+            return SeedArray(np.ascontiguousarray(entropies), language)
+        elif not isinstance(entropies, Iterable):
+            raise TypeError("invalid entropies type\n\t"
+                            "entropies must be an array or an iterable of entropies")
+
+        entropies = tuple(e if isinstance(e, bytes) else Seed.from_entropy(e).entropy for e in entropies)
+        entropy_sizes = set(len(e) for e in entropies)
+        if len(entropy_sizes) > 1:
+            raise ValueError("invalid entropy size\n\t"
+                             "expected: entropies of the same size\n\t"
+                             f"obtained: {', '.join(str(v * 8) for v in sorted(entropy_sizes))} bits")
+
+        entropy_size = entropy_sizes.pop() if entropy_sizes else ENTROPY_SIZE_MIN // 8
+        return SeedArray(
+            np.frombuffer(b"".join(entropies), dtype=np.uint8).reshape(-1, entropy_size).copy(), language
+        )
+
+    @classmethod
+    def from_mnemonics(
+            cls,
+            mnemonics: Iterable[Iterable[str] | str],
+            correct_last_word: bool = False,
+            language: str | None = None
+    ) -> 'SeedArray':
+        wids = []
+        wordindex = get_wordindex(language) if language else None
+        for mnemonic in mnemonics:
+            mnemonic = mnemonic.split() if isinstance(mnemonic, str) else tuple(mnemonic)
+
+            # all the mnemonics share the language of the first one
+            if wordindex is None:
+                language = detect_language(mnemonic)
+                wordindex = get_wordindex(language)
+
+            try:
+                wids.append(tuple(wordindex.resolve(word) for word in mnemonic))
+            except ValueError as ve:
+                raise ValueError(f"invalid mnemonic word\n\t{str(ve)}")
+
+        word_counts = set(len(w) for w in wids)
+        if len(word_counts) > 1 or not word_counts <= set(WORD_COUNT_ALL):
+            raise ValueError("invalid mnemonic size\n\t"
+                             f"expected: {', '.join(str(v) for v in WORD_COUNT_ALL)} words, "
+                             "the same for all the mnemonics\n\t"
+                             f"obtained: {', '.join(str(v) for v in sorted(word_counts))} words")
+
+        word_count = word_counts.pop() if word_counts else WORD_COUNT_ALL[0]
+        seed_size = word_count * WORD_SIZE
+        entropy_size = seed_size // ENTROPY_SIZE_DIV * ENTROPY_SIZE_DIV
+
+        # explode every word id into its 11 bits, then split entropy and checksum bits
+        wids = np.array(wids, dtype=np.uint16).reshape(-1, word_count)
+        bits = ((wids[:, :, np.newaxis] >> np.arange(WORD_SIZE - 1, -1, -1, dtype=np.uint16)) & 1).astype(np.uint8)
+        bits = bits.reshape(-1, seed_size)
+
+        result = SeedArray(np.packbits(bits[:, :entropy_size], axis=1), language or LANGUAGE_DEFAULT)
+        checksums = SeedArray.__to_int(bits[:, entropy_size:])
+
+        invalid = np.flatnonzero(checksums != result.checksums)
+        if invalid.size and not correct_last_word:
+            raise ValueError("invalid checksum\n\t"
+                             f"mnemonics: {', '.join(str(v) for v in invalid[:10])}"
+                             f"{', ...' if invalid.size > 10 else ''}")
+        elif invalid.size:
+            LOGGER.info(f"last word modified in {invalid.size} mnemonics to match checksum")
+
+        return result
+
+    @property
+    def checksums(self) -> np.ndarray:
+        if self.__checksums is None:
+            entropy_size = self.__entropies.shape[1] * 8
+            checksum_size = math.ceil(entropy_size / WORD_SIZE) * WORD_SIZE - entropy_size
+
+            digests = b"".join(hashlib.sha256(entropy).digest()[:1] for entropy in self.__entropies)
+            self.__checksums = np.frombuffer(digests, dtype=np.uint8) >> (8 - checksum_size)
+
+        return self.__checksums
+
+    @property
+    def language(self) -> str:
+        return self.__language
+
+    @property
+    def wids(self) -> np.ndarray:
+        entropy_size = self.__entropies.shape[1] * 8
+        checksum_size = math.ceil(entropy_size / WORD_SIZE) * WORD_SIZE - entropy_size
+        word_count = (entropy_size + checksum_size) // WORD_SIZE
+
+        # append the checksum bits to the entropy bits, then slice 11 bits per word
+        bits = np.concatenate((
+            np.unpackbits(self.__entropies, axis=1),
+            np.unpackbits(self.checksums[:, np.newaxis], axis=1)[:, 8 - checksum_size:]
+        ), axis=1)
+
+        return SeedArray.__to_int(bits.reshape(-1, word_count, WORD_SIZE))
+
+    def entropies(self) -> list[bytes]:
+        return [entropy.tobytes() for entropy in self.__entropies]
+
+    def mnemonics(self) -> list[tuple[str]]:
+        return [tuple(mnemonic) for mnemonic in SeedArray.__get_words(self.__language)[self.wids].tolist()]
+
+    @staticmethod
+    def __to_int(bits: np.ndarray) -> np.ndarray:
+        weights = 1 << np.arange(bits.shape[-1] - 1, -1, -1, dtype=np.uint16)
+        return (bits.astype(np.uint16) * weights).sum(axis=-1, dtype=np.uint16)
+
+    @staticmethod
+    def __get_words(language: str) -> np.ndarray:
+        if language not in SeedArray.__words:
+            SeedArray.__words[language] = np.array(get_wordindex(language).words, dtype=object)
+
+        return SeedArray.__words[language]
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+
+from generator.bip32 import ExtendedKey
+from generator.seed import Seed, PBKDF2_ROUNDS, encode_mnemonic, encode_passphrase
+
+BATCH_SIZE = 256  # candidates per worker between two checkpoints
+ROOTSEED_SIZE = 64  # bytes
+FINGERPRINT_SIZE = 4  # bytes
+
+LOGGER = logging.getLogger(__name__)
+
+
+def sweep(
+        seed: Seed,
+        candidates: Iterable[str],
+        target: bytes | str,
+        workers: int | None = None,
+        checkpoint: str | None = None,
+        fingerprint: bool = False
+) -> str | None:
+    if isinstance(target, str):
+        try:
+            target = bytes.fromhex(target)
+        except ValueError as ve:
+            raise ValueError(f"invalid target value\n\t{ve}") from None
+
+    if fingerprint and len(target) != FINGERPRINT_SIZE:
+        raise ValueError("invalid target size\n\t"
+                         f"expected: {FINGERPRINT_SIZE} bytes of master key fingerprint\n\t"
+                         f"obtained: {len(target)} bytes")
+
+    if not 0 < len(target) <= ROOTSEED_SIZE:
+        raise ValueError("invalid target size\n\t"
+                         f"expected: 1-{ROOTSEED_SIZE} bytes of rootseed\n\t"
+                         f"obtained: {len(target)} bytes")
+
+    workers = workers or os.cpu_count() or 1
+
+    # the pbkdf2 password is the same for every candidate: prepare it once, only the salt changes
+    password = encode_mnemonic(seed.mnemonic)
+    # checkpoints must not make the mnemonic cheaper to guess than the target itself,
+    # and belong to a single mode and target size: a fingerprint can't resume a 4 bytes rootseed prefix
+    salt = b'checkpoint' + (b'fingerprint' if fingerprint else b'rootseed') + bytes([len(target)]) + target
+    sweep_id = hashlib.pbkdf2_hmac('sha256', password, salt, PBKDF2_ROUNDS).hex()
+
+    def test(passphrase: str) -> bool:
+        salt = encode_passphrase(passphrase)
+        rootseed = hashlib.pbkdf2_hmac('sha512', password, salt, PBKDF2_ROUNDS)
+        if fingerprint:
+            return ExtendedKey.from_rootseed(rootseed).fingerprint == target
+
+        return rootseed.startswith(target)
+
+    position = __load_checkpoint(checkpoint, sweep_id) if checkpoint else 0
+    candidates = iter(candidates)
+    if position:
+        LOGGER.info(f"resuming sweep after {position} candidates")
+        for _ in itertools.islice(candidates, position):
+            pass
+
+    start = time.perf_counter()
+    tested = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while batch := tuple(itertools.islice(candidates, workers * BATCH_SIZE)):
+            # hashlib releases the GIL while running pbkdf2
+            for count, found in enumerate(executor.map(test, batch)):
+                if found:
+                    LOGGER.info(f"passphrase found after {position + count + 1} candidates")
+                    return batch[count]
+
+            position += len(batch)
+            tested += len(batch)
+            if checkpoint:
+                __save_checkpoint(checkpoint, sweep_id, position)
+
+            elapsed = time.perf_counter() - start
+            LOGGER.info(f"tested {position} candidates ({tested / elapsed if elapsed else 0:.1f} candidates/s)")
+
+    LOGGER.info(f"passphrase not found in {position} candidates")
+    return None
+
+
+def __load_checkpoint(checkpoint: str, sweep_id: str) -> int:
+    if not os.path.isfile(checkpoint):
+        return 0
+
+    with open(checkpoint, 'r') as file:
+        data = json.load(file)
+
+    if data.get('sweep') != sweep_id:
+        raise ValueError("invalid checkpoint\n\t"
+                         f"'{checkpoint}' belongs to a different mnemonic, target or mode")
+
+    return int(data['position'])
+
+
+def __save_checkpoint(checkpoint: str, sweep_id: str, position: int):
+    with open(checkpoint + ".tmp", 'w') as file:
+        json.dump({'sweep': sweep_id, 'position': position}, file)
+
+    os.replace(checkpoint + ".tmp", checkpoint)
@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Iterable
+
+import numpy as np
+
+from generator.seed import Seed, ENTROPY_SIZE_ALL, ENTROPY_SIZE_MAX
+from generator.seedarray import SeedArray
+from generator.wordlist import LANGUAGE_DEFAULT, LANGUAGE_ALL
+
+MAGIC = b"SVLT"
+VERSION = 1
+# magic, version, language, entropy bytes, metadata bytes, records
+HEADER = struct.Struct("<4sHBBHxxQ8x")
+
+METADATA_SIZE_MAX = 2 ** 16 - 1  # bytes per record
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SeedVault(object):
+    __slots__ = ('__filename', '__file', '__mmap', '__language', '__entropy_bytes', '__metadata_bytes', '__count')
+
+    def __init__(self, filename: str, writable: bool = False):
+        self.__filename = filename
+        self.__file = open(filename, 'r+b' if writable else 'rb')
+        self.__mmap = None
+
+        header = self.__file.read(HEADER.size)
+        try:
+            magic, version, language, entropy_bytes, metadata_bytes, count = HEADER.unpack(header)
+        except struct.error:
+            magic = version = None
+
+        if magic != MAGIC or version != VERSION or language >= len(LANGUAGE_ALL) or \
+                entropy_bytes * 8 not in ENTROPY_SIZE_ALL:
+            self.__file.close()
+            raise ValueError("invalid seed vault\n\t"
+                             f"'{filename}' is not a version {VERSION} seed vault")
+
+        self.__language = LANGUAGE_ALL[language]
+        self.__entropy_bytes = entropy_bytes
+        self.__metadata_bytes = metadata_bytes
+        # records beyond the header count belong to an interrupted append, and are ignored
+        self.__count = min(count, (os.fstat(self.__file.fileno()).st_size - HEADER.size) // self.record_size)
+        if self.__count != count:
+            LOGGER.warning(f"'{filename}' is truncated: {count - self.__count} records are missing")
+
+    def __enter__(self) -> 'SeedVault':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __getitem__(self, index: int | slice) -> 'Seed | SeedArray':
+        if isinstance(index, slice):
+            # the covered records are read at once, then stepped in either direction
+            indexes = range(*index.indices(self.__count))
+            if not indexes:
+                return SeedArray(self.entropies(0, 0), self.__language)
+            lo, hi = min(indexes[0], indexes[-1]), max(indexes[0], indexes[-1]) + 1
+            return SeedArray(self.entropies(lo, hi)[indexes.start - lo::indexes.step], self.__language)
+
+        if not -self.__count <= index < self.__count:
+            raise IndexError("seed vault index out of range")
+
+        offset = HEADER.size + (index % self.__count) * self.record_size
+        return Seed.from_entropy(self.__get_mmap()[offset:offset + self.__entropy_bytes], self.__language)
+
+    def __iter__(self):
+        for i in range(self.__count):
+            yield self[i]
+
+    @classmethod
+    def create(
+            cls,
+            filename: str,
+            entropy_size: int = ENTROPY_SIZE_MAX,
+            metadata_size: int = 0,
+            language: str = LANGUAGE_DEFAULT
+    ) -> 'SeedVault':
+        if entropy_size not in ENTROPY_SIZE_ALL:
+            raise ValueError("invalid entropy size\n\t"
+                             f"expected: {', '.join(str(v) for v in ENTROPY_SIZE_ALL)} bits\n\t"
+                             f"obtained: {entropy_size} bits")
+
+        if not 0 <= metadata_size <= METADATA_SIZE_MAX:
+            raise ValueError("invalid metadata size\n\t"
+                             f"expected: 0-{METADATA_SIZE_MAX} bytes\n\t"
+                             f"obtained: {metadata_size} bytes")
+
+        if language not in LANGUAGE_ALL:
+            raise ValueError("invalid language\n\t"
+                             f"expected: {', '.join(LANGUAGE_ALL)}\n\t"
+                             f"obtained: {language}")
+
+        with open(filename, 'xb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, LANGUAGE_ALL.index(language), entropy_size // 8, metadata_size, 0))
+
+        return SeedVault(filename, True)
+
+    @property
+    def language(self) -> str:
+        return self.__language
+
+    @property
+    def entropy_size(self) -> int:
+        return self.__entropy_bytes * 8
+
+    @property
+    def metadata_size(self) -> int:
+        return self.__metadata_bytes
+
+    @property
+    def record_size(self) -> int:
+        return self.__entropy_bytes + self.__metadata_bytes
+
+    def entropies(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        # zero copy view of the entropy columns of the mapped records
+        return self.__get_records(start, stop)[:, :self.__entropy_bytes]
+
+    def metadata(self, index: int) -> bytes:
+        if not -self.__count <= index < self.__count:
+            raise IndexError("seed vault index out of range")
+
+        offset = HEADER.size + (index % self.__count) * self.record_size + self.__entropy_bytes
+        return self.__get_mmap()[offset:offset + self.__metadata_bytes]
+
+    def metadatas(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        return self.__get_records(start, stop)[:, self.__entropy_bytes:]
+
+    def append(self, seeds: Seed | SeedArray | Iterable[Seed], metadata: bytes | Iterable[bytes] | None = None):
+        if isinstance(seeds, Seed):
+            seeds = (seeds,)
+            metadata = None if metadata is None else (metadata,)
+
+        if isinstance(seeds, SeedArray):
+            languages = {seeds.language}
+            entropies = np.frombuffer(b"".join(seeds.entropies()), dtype=np.uint8)
+        else:
+            seeds = tuple(seeds)
+            languages = set(seed.language for seed in seeds)
+            entropies = np.frombuffer(b"".join(seed.entropy for seed in seeds), dtype=np.uint8)
+
+        if languages - {self.__language}:
+            raise ValueError("invalid language\n\t"
+                             f"expected: {self.__language}\n\t"
+                             f"obtained: {', '.join(sorted(languages))}")
+
+        if entropies.size % self.__entropy_bytes or entropies.size // self.__entropy_bytes != len(seeds):
+            raise ValueError("invalid entropy size\n\t"
+                             f"expected: {self.entropy_size} bits\n\t"
+                             f"obtained: {', '.join(sorted(set(str(len(s.entropy) * 8) for s in seeds)))} bits")
+
+        records = np.zeros((len(seeds), self.record_size), dtype=np.uint8)
+        records[:, :self.__entropy_bytes] = entropies.reshape(-1, self.__entropy_bytes)
+        if metadata is not None:
+            metadata = tuple(metadata)
+            if len(metadata) != len(seeds) or any(len(m) > self.__metadata_bytes for m in metadata):
+                raise ValueError("invalid metadata\n\t"
+                                 f"expected: one value per seed, up to {self.__metadata_bytes} bytes")
+
+            for record, value in zip(records, metadata):
+                record[self.__entropy_bytes:self.__entropy_bytes + len(value)] = np.frombuffer(value, dtype=np.uint8)
+
+        # records first, then the header count: an interrupted append leaves the vault consistent
+        self.__file.seek(HEADER.size + self.__count * self.record_size)
+        self.__file.write(records.tobytes())
+        self.__file.flush()
+        self.__count += len(seeds)
+        self.__file.seek(0)
+        self.__file.write(HEADER.pack(
+            MAGIC, VERSION, LANGUAGE_ALL.index(self.__language), self.__entropy_bytes, self.__metadata_bytes,
+            self.__count
+        ))
+        self.__file.flush()
+
+        # the mapping is refreshed on the next read, views of the previous one stay valid
+        self.__mmap = None
+
+    def close(self):
+        self.__mmap = None
+        self.__file.close()
+
+    def __get_mmap(self) -> mmap.mmap:
+        if self.__mmap is None:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self.__mmap
+
+    def __get_records(self, start: int, stop: int | None) -> np.ndarray:
+        stop = self.__count if stop is None else min(stop, self.__count)
+        if not 0 <= start <= stop:
+            raise IndexError("seed vault index out of range")
+
+        return np.frombuffer(
+            self.__get_mmap(), dtype=np.uint8, count=(stop - start) * self.record_size,
+            offset=HEADER.size + start * self.record_size
+        ).reshape(-1, self.record_size)
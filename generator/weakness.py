@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import enum
+import functools
+import hashlib
+import itertools
+import logging
+import math
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from generator.seed import Seed, WORD_SIZE
+from generator.seedarray import SeedArray
+
+MAGIC = b"KSIX"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxQ")  # magic, version, entries
+
+KNOWN_PATH = os.path.join(os.path.dirname(__file__), "weakseeds")
+KNOWN_INDEX = os.path.join(KNOWN_PATH, "known.idx")
+
+HAMMING_SIGMA = 6  # standard deviations from the expected hamming weight
+WORD_REPEAT_MAX = 3  # occurrences of the same word
+BATCH_SIZE = 4096  # seeds checked at once in streaming mode
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Weakness(enum.IntFlag):
+    NONE = 0
+    KNOWN = 1
+    HAMMING_WEIGHT = 2
+    REPEATED_WORDS = 4
+    SHORT_PERIOD = 8
+    BYTE_DIVERSITY = 16
+
+    def to_string(self) -> str:
+        names = [w.name.lower() for w in Weakness if w and w in self]
+        return ", ".join(names) if names else "none"
+
+
+def hash_entropy(entropy: bytes) -> int:
+    return int.from_bytes(hashlib.sha256(entropy).digest()[:8], byteorder='little')
+
+
+class KnownSeedIndex(object):
+    __slots__ = ('__mmap', '__keys')
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self.__mmap)
+        if magic != MAGIC or version != VERSION or len(self.__mmap) != HEADER.size + 8 * count:
+            self.__mmap.close()
+            raise ValueError("invalid known seed index\n\t"
+                             f"'{filename}' is not a version {VERSION} known seed index")
+
+        self.__keys = np.frombuffer(self.__mmap, dtype='<u8', count=count, offset=HEADER.size)
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __contains__(self, entropy: bytes) -> bool:
+        key = hash_entropy(entropy)
+        found = int(self.__keys.searchsorted(np.uint64(key)))
+        return found < len(self.__keys) and int(self.__keys[found]) == key
+
+    @classmethod
+    def build(cls, entries: Iterable[str | bytes], filename: str) -> 'KnownSeedIndex':
+        # entries are raw entropies, hex entropies or mnemonics, comments start with '#'
+        keys = set()
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = entry.split("#")[0].strip()
+                if not entry:
+                    continue
+
+                try:
+                    entry = Seed.from_entropy(entry).entropy
+                except ValueError:
+                    entry = Seed.from_mnemonic(entry).entropy
+
+            keys.add(hash_entropy(entry))
+
+        with open(filename + ".tmp", 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            file.write(np.array(sorted(keys), dtype='<u8').tobytes())
+        os.replace(filename + ".tmp", filename)
+
+        LOGGER.info(f"indexed {len(keys)} known seeds")
+        return KnownSeedIndex(filename)
+
+    def contains_many(self, entropies: np.ndarray) -> np.ndarray:
+        keys = np.fromiter((hash_entropy(entropy.tobytes()) for entropy in entropies), dtype=np.uint64)
+        if not len(self.__keys):
+            return np.zeros(len(keys), dtype=bool)
+
+        found = np.searchsorted(self.__keys, keys)
+        found[found == len(self.__keys)] = 0
+        return self.__keys[found] == keys
+
+
+@functools.cache
+def get_known_index() -> KnownSeedIndex:
+    return KnownSeedIndex(KNOWN_INDEX)
+
+
+def check(seed: Seed | bytes | str | Iterable[str], index: KnownSeedIndex | None = None) -> Weakness:
+    seed = __to_seed(seed)
+    entropy = seed.entropy
+    index = index if index is not None else get_known_index()
+
+    result = Weakness.NONE
+    if entropy in index:
+        result |= Weakness.KNOWN
+
+    # plain python: a single seed is faster to check without numpy
+    bits = len(entropy) * 8
+    if abs(int.from_bytes(entropy, byteorder='big').bit_count() - bits / 2) > HAMMING_SIGMA * math.sqrt(bits) / 2:
+        result |= Weakness.HAMMING_WEIGHT
+
+    wids = __get_wids(seed)
+    ordered = sorted(wids)
+    if any(ordered[i] == ordered[i + WORD_REPEAT_MAX] for i in range(len(ordered) - WORD_REPEAT_MAX)):
+        result |= Weakness.REPEATED_WORDS
+
+    steps = {(entropy[i + 1] - entropy[i]) % 256 for i in range(len(entropy) - 1)}
+    if len(steps) == 1 or \
+            any(entropy[p:] == entropy[:-p] for p in range(1, len(entropy) // 2 + 1)) or \
+            any(wids[p:] == wids[:-p] for p in range(1, len(wids) // 2 + 1)):
+        result |= Weakness.SHORT_PERIOD
+
+    if len(set(entropy)) < len(entropy) // 2:
+        result |= Weakness.BYTE_DIVERSITY
+
+    return result
+
+
+def check_batch(seeds: SeedArray | Iterable[Seed | bytes | str], index: KnownSeedIndex | None = None) -> np.ndarray:
+    if not isinstance(seeds, SeedArray):
+        entropies = [__to_seed(seed).entropy for seed in seeds]
+        result = np.zeros(len(entropies), dtype=np.uint8)
+
+        # seeds of different sizes are checked in separate arrays, results keep the input order
+        for size in set(len(entropy) for entropy in entropies):
+            positions = [i for i, entropy in enumerate(entropies) if len(entropy) == size]
+            result[positions] = check_batch(SeedArray.from_entropies([entropies[i] for i in positions]), index)
+
+        return result
+
+    result = np.zeros(len(seeds), dtype=np.uint8)
+    if not len(seeds):
+        return result
+
+    entropies = np.frombuffer(b"".join(seeds.entropies()), dtype=np.uint8).reshape(len(seeds), -1)
+    index = index if index is not None else get_known_index()
+
+    result[index.contains_many(entropies)] |= Weakness.KNOWN
+
+    bits = entropies.shape[1] * 8
+    weights = POPCOUNT[entropies].sum(axis=1)
+    result[np.abs(weights - bits / 2) > HAMMING_SIGMA * math.sqrt(bits) / 2] |= Weakness.HAMMING_WEIGHT
+
+    # a word repeated more than WORD_REPEAT_MAX times spans WORD_REPEAT_MAX + 1 equal sorted ids
+    wids = seeds.wids
+    ordered = np.sort(wids, axis=1)
+    result[np.any(ordered[:, WORD_REPEAT_MAX:] == ordered[:, :-WORD_REPEAT_MAX], axis=1)] |= Weakness.REPEATED_WORDS
+
+    steps = np.diff(entropies.astype(np.int16), axis=1) % 256
+    periodic = np.all(steps == steps[:, :1], axis=1)
+    for p in range(1, entropies.shape[1] // 2 + 1):
+        periodic |= np.all(entropies[:, p:] == entropies[:, :-p], axis=1)
+    for p in range(1, wids.shape[1] // 2 + 1):
+        periodic |= np.all(wids[:, p:] == wids[:, :-p], axis=1)
+    result[periodic] |= Weakness.SHORT_PERIOD
+
+    ordered = np.sort(entropies, axis=1)
+    distinct = np.count_nonzero(np.diff(ordered, axis=1), axis=1) + 1
+    result[distinct < entropies.shape[1] // 2] |= Weakness.BYTE_DIVERSITY
+
+    return result
+
+
+def check_stream(
+        seeds: Iterable[Seed | bytes | str],
+        index: KnownSeedIndex | None = None,
+        batch_size: int = BATCH_SIZE
+) -> Iterator[tuple[Seed, Weakness]]:
+    seeds = iter(seeds)
+    while batch := tuple(__to_seed(seed) for seed in itertools.islice(seeds, batch_size)):
+        for seed, flags in zip(batch, check_batch(batch, index)):
+            yield seed, Weakness(int(flags))
+
+
+def __to_seed(seed: Seed | bytes | str | Iterable[str]) -> Seed:
+    if isinstance(seed, Seed):
+        return seed
+    elif isinstance(seed, bytes):
+        return Seed.from_entropy(seed)
+    elif isinstance(seed, str | Iterable):
+        return Seed.from_mnemonic(seed)
+
+    raise TypeError("invalid seed type\n\t"
+                    "seed must be of type Seed, bytes (entropy), string or iterable of strings (mnemonic)")
+
+
+def __get_wids(seed: Seed) -> list[int]:
+    entropy_size = len(seed.entropy) * 8
+    checksum_size = math.ceil(entropy_size / WORD_SIZE) * WORD_SIZE - entropy_size
+    value = (int.from_bytes(seed.entropy, byteorder='big') << checksum_size) | seed.checksum
+    word_count = (entropy_size + checksum_size) // WORD_SIZE
+    return [value >> ((word_count - i - 1) * WORD_SIZE) & (2 ** WORD_SIZE - 1) for i in range(word_count)]
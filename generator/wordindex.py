@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import functools
+import unicodedata
+from collections.abc import Iterable
+
+from generator.wordlist import get_wordlist, LANGUAGE_ALL, LANGUAGE_DEFAULT
+
+PREFIX_SIZE = 4  # letters uniquely identifying a bip39 word
+
+
+class WordIndex(object):
+    __leaf = ""
+
+    def __init__(self, words: Iterable[str]):
+        self.__words = tuple(WordIndex.__normalize(word) for word in words)
+        self.__ids = {word: wid for wid, word in enumerate(self.__words)}
+
+        if len(self.__ids) != len(self.__words):
+            raise ValueError("invalid wordlist\n\t"
+                             "wordlist contains duplicated words")
+
+        self.__trie = {}
+        for wid, word in enumerate(self.__words):
+            node = self.__trie
+            for letter in word:
+                node = node.setdefault(letter, {})
+            node[WordIndex.__leaf] = wid
+
+    def __contains__(self, word: str) -> bool:
+        return WordIndex.__normalize(word) in self.__ids
+
+    def __getitem__(self, wid: int) -> str:
+        return self.__words[wid]
+
+    def __len__(self) -> int:
+        return len(self.__words)
+
+    @property
+    def words(self) -> tuple[str]:
+        return self.__words
+
+    def index(self, word: str) -> int:
+        try:
+            return self.__ids[WordIndex.__normalize(word)]
+        except KeyError:
+            raise ValueError(f"'{word}' is not in wordlist") from None
+
+    def complete(self, prefix: str) -> tuple[str]:
+        prefix = WordIndex.__normalize(prefix)
+
+        node = self.__trie
+        for letter in prefix:
+            node = node.get(letter)
+            if node is None:
+                return tuple()
+
+        wids = []
+        nodes = [node]
+        while nodes:
+            node = nodes.pop()
+            for letter, child in node.items():
+                if letter == WordIndex.__leaf:
+                    wids.append(child)
+                else:
+                    nodes.append(child)
+
+        return tuple(self.__words[wid] for wid in sorted(wids))
+
+    def resolve(self, word: str) -> int:
+        word = WordIndex.__normalize(word)
+
+        wid = self.__ids.get(word)
+        if wid is not None:
+            return wid
+
+        completions = self.complete(word) if word else tuple()
+        if len(completions) == 1 and len(word) >= PREFIX_SIZE:
+            return self.__ids[completions[0]]
+        elif completions:
+            raise ValueError(f"'{word}' is ambiguous\n\t"
+                             f"candidates: {', '.join(completions)}")
+
+        raise ValueError(f"'{word}' is not in wordlist")
+
+    def matches(self, words: Iterable[str]) -> bool:
+        for word in words:
+            try:
+                self.resolve(word)
+            except ValueError:
+                return False
+
+        return True
+
+    @staticmethod
+    def __normalize(word: str) -> str:
+        # wordlists are NFKD normalized, as the bip39 mnemonic sentence
+        return word if word.isascii() else unicodedata.normalize('NFKD', word)
+
+
+@functools.cache
+def get_wordindex(language: str = LANGUAGE_DEFAULT) -> WordIndex:
+    return WordIndex(get_wordlist(language))
+
+
+def detect_language(words: Iterable[str]) -> str:
+    words = tuple(words)
+
+    # english first, the only language supported by older releases
+    if get_wordindex(LANGUAGE_DEFAULT).matches(words):
+        return LANGUAGE_DEFAULT
+
+    languages = tuple(language for language in LANGUAGE_ALL if get_wordindex(language).matches(words))
+    if len(languages) > 1:
+        raise ValueError("ambiguous mnemonic language\n\t"
+                         f"candidates: {', '.join(languages)}")
+
+    # an unknown language is reported by the default wordlist as an invalid word
+    return languages[0] if languages else LANGUAGE_DEFAULT
+
+
+def __getattr__(name: str):
+    # backward compatible english wordindex
+    if name == "wordindex":
+        return get_wordindex(LANGUAGE_DEFAULT)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import getpass
+import logging
+import sys
+
+from generator.address import GAP_LIMIT
+from generator.addressindex import AddressIndex, scan
+from generator.seed import Seed
+
+
+def __print_header():
+    print(
+        "********************\n"
+        "** mnemonic_audit **\n"
+        "********************\n"
+        "Check whether the addresses of a bip39 mnemonic appear in a list of known addresses.\n"
+    )
+
+
+def __read_entries(file):
+    for line in file:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def __mnemonic_audit(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Check whether the addresses of a bip39 mnemonic appear in a list of known addresses."
+    )
+    parser.add_argument(
+        "-x", "--index", action="store", required=True,
+        help="address index file"
+    )
+    parser.add_argument(
+        "-b", "--build", action="store", default=None,
+        help="build the address index from a file of addresses or hex scriptPubKeys, one per line"
+    )
+    parser.add_argument(
+        "-g", "--gap-limit", action="store", default=str(GAP_LIMIT),
+        help=f"number of consecutive unused addresses ending a chain (DEFAULT = {GAP_LIMIT})"
+    )
+    parser.add_argument(
+        "-a", "--accounts", action="store", default="1",
+        help="number of accounts checked for each address type (DEFAULT = 1)"
+    )
+    parser.add_argument(
+        "-p", "--passphrase", action="store_true", default=False,
+        help="ask for the mnemonic passphrase (default = False)"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        if options.build:
+            with open(options.build, 'r', encoding='utf-8') as file:
+                with AddressIndex.build(__read_entries(file), options.index) as index:
+                    print(f"indexed {len(index)} entries in {options.index}")
+            return
+
+        for name in ("gap_limit", "accounts"):
+            if not (getattr(options, name).isnumeric() and int(getattr(options, name)) > 0):
+                raise ValueError(f"invalid {name.replace('_', ' ')}\n\t"
+                                 "expected: 1 or more\n\t"
+                                 f"obtained: {getattr(options, name)}")
+
+        with AddressIndex(options.index) as index:
+            print("insert your bip39 mnemonic:")
+            seed = Seed.from_mnemonic(input("mnemonic > ").strip())
+            if options.passphrase:
+                print("\ninsert the passphrase:")
+                seed.passphrase = getpass.getpass(prompt='passphrase > ')
+
+            print()
+            found = 0
+            for path, address in scan(seed, index, accounts=int(options.accounts), gap_limit=int(options.gap_limit)):
+                print(f"{path}: {address}")
+                found += 1
+
+            print(f"\nfound {found} known addresses")
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    __mnemonic_audit()
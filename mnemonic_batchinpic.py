@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import getpass
+import json
+import time
+
+from utils import batch, encryption
+
+
+def __print_header():
+    print(
+        "*************************\n"
+        "** mnemonic_batchinpic **\n"
+        "*************************\n"
+        "Hide or show messages in a batch of images with steganography.\n"
+    )
+
+
+def __mnemonic_batchinpic(args=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Hide or show messages in a batch of images with steganography."
+    )
+    parser.add_argument(
+        "-m", "--manifest", action="store", required=True,
+        help="a csv file with a header row, or a jsonl file, with an image per record\n"
+             f"fields: {', '.join(batch.FIELD_ALL)}\n"
+             "algorithm and direction are names or numbers, as in mnemonic_hideinpic"
+    )
+    parser.add_argument(
+        "-s", "--show", action="store_true", default=False,
+        help="show the hidden messages, written to the output files if any (default = False)\n"
+             "with a message or message_file, the hidden message is compared to it"
+    )
+    parser.add_argument(
+        "-v", "--verify", action="store_true", default=False,
+        help="read every output image again and compare its hidden message (default = False)"
+    )
+    parser.add_argument(
+        "-k", "--kdf", action="store", default="1",
+        help="derive the PASSWORD and AEAD key with different functions\n"
+             "supported functions are:\n"
+             "1) SCRYPT (DEFAULT)\n"
+             "2) PBKDF2")
+    parser.add_argument(
+        "-w", "--workers", action="store", default=None,
+        help="number of parallel processes (DEFAULT = number of cpus)"
+    )
+    parser.add_argument(
+        "-o", "--output-file", action="store", default=None,
+        help="write the results to a jsonl file, a record per image"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        if not (options.kdf.isnumeric() and int(options.kdf) in range(1, len(encryption.Kdf))):
+            raise ValueError(f"invalid kdf\n\t"
+                             f"expected: 1-{len(encryption.Kdf) - 1}\n\t"
+                             f"obtained: {options.kdf}")
+
+        if options.workers is not None and not options.workers.isnumeric():
+            raise ValueError("invalid workers\n\t"
+                             "expected: 1 or more\n\t"
+                             f"obtained: {options.workers}")
+
+        tasks = batch.read_manifest(options.manifest)
+        operation = batch.Operation.SHOW if options.show else batch.Operation.HIDE
+
+        # a single password for the whole batch
+        password = None
+        if any(task.needs_password for task in tasks):
+            print("insert a password:")
+            password = getpass.getpass(prompt='password > ')
+            if operation == batch.Operation.HIDE:
+                print("insert again.....:")
+                if password != getpass.getpass(prompt='password > '):
+                    raise ValueError("password did not match!")
+            print()
+
+        start = time.perf_counter()
+        results = []
+        for result in batch.run(
+                tasks, operation, password, int(options.workers) if options.workers else None, options.verify,
+                encryption.Kdf(int(options.kdf))
+        ):
+            results.append(result)
+            target = f" -> {result['output']}" if result['output'] else ""
+            detail = result['error'] or f"{result['bytes']} bytes, {result['seconds']:.3f}s"
+            print(f"{result['status']:8} {result['input']}{target}: {detail}")
+        elapsed = time.perf_counter() - start
+
+        results.sort(key=lambda r: r['index'])
+        failed = sum(1 for result in results if result['status'] != "ok")
+        pixels = sum(result.get('pixels', 0) for result in results)
+        print(f"\n{len(results)} images, {failed} failed, in {elapsed:.3f}s: "
+              f"{len(results) / elapsed:.2f} images/s, {pixels / elapsed / 10 ** 6:.2f} megapixels/s")
+
+        if options.output_file:
+            with open(options.output_file, 'w', encoding='utf-8') as file:
+                file.writelines(json.dumps(result) + "\n" for result in results)
+            print(f"results written to {options.output_file}")
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    __mnemonic_batchinpic()
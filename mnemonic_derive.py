@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import getpass
+import sys
+
+from generator import bip85
+from generator.seed import Seed
+from generator.wordlist import LANGUAGE_DEFAULT
+
+
+def __print_header():
+    print(
+        "*********************\n"
+        "** mnemonic_derive **\n"
+        "*********************\n"
+        "Derive child bip39 mnemonics from a master mnemonic, according to bip85.\n"
+    )
+
+
+def __mnemonic_derive(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Derive child bip39 mnemonics from a master mnemonic, according to bip85."
+    )
+    parser.add_argument(
+        "-n", "--word-count", action="store", default="12",
+        help=f"number of words of the child mnemonics: {', '.join(str(v) for v in bip85.WORD_COUNT_ALL)} "
+             "(DEFAULT = 12)"
+    )
+    parser.add_argument(
+        "-s", "--start", action="store", default="0",
+        help="index of the first child mnemonic (DEFAULT = 0)"
+    )
+    parser.add_argument(
+        "-c", "--count", action="store", default="1",
+        help="number of child mnemonics (DEFAULT = 1)"
+    )
+    parser.add_argument(
+        "-l", "--language", action="store", default=LANGUAGE_DEFAULT,
+        help=f"language of the child mnemonics (DEFAULT = {LANGUAGE_DEFAULT})\n"
+             f"supported languages are {', '.join(list(bip85.LANGUAGE_CODES)[:5])},\n"
+             f"{', '.join(list(bip85.LANGUAGE_CODES)[5:])}"
+    )
+    parser.add_argument(
+        "-p", "--passphrase", action="store_true", default=False,
+        help="ask for the master mnemonic passphrase (default = False)"
+    )
+    parser.add_argument(
+        "-o", "--output-file", action="store", default=None,
+        help="write the child mnemonics to a file, one per line, instead of the standard output\n"
+             "N.B.: the output file contains secrets!"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        for name in ("word_count", "start", "count"):
+            if not getattr(options, name).isnumeric():
+                raise ValueError(f"invalid {name.replace('_', ' ')}\n\t"
+                                 "expected: 0 or more\n\t"
+                                 f"obtained: {getattr(options, name)}")
+
+        print("insert your master bip39 mnemonic:")
+        master = Seed.from_mnemonic(input("mnemonic > ").strip())
+        if options.passphrase:
+            print("\ninsert the passphrase:")
+            master.passphrase = getpass.getpass(prompt='passphrase > ')
+
+        children = bip85.derive_mnemonics(
+            master, int(options.start), int(options.count), int(options.word_count), options.language
+        )
+
+        if options.output_file:
+            with open(options.output_file, 'w', encoding='utf-8') as file:
+                for child in children:
+                    file.write(' '.join(child.mnemonic) + "\n")
+            print(f"\nchild mnemonics written to {options.output_file}")
+        else:
+            print()
+            for index, child in enumerate(children, int(options.start)):
+                print(f"{index}: {' '.join(child.mnemonic)}")
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+
+if __name__ == "__main__":
+    __mnemonic_derive()
@@ -17,6 +17,10 @@
 #   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 #   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import sys
+
+from generator import completion, correction
 from generator.seed import Seed
 
 
@@ -27,20 +31,87 @@ def __print_header():
         "*********************\n"
         "Insert a 'candidate' mnemonic, e.g. generated by dices.\n"
         "The tool will modify the last word, matching a valid bip39 checksum.\n"
+        "Words can be abbreviated to their first 4 letters.\n"
     )
 
 
-def __mnemonic_fixsum():
+def __mnemonic_fixsum(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Modifies the last word of a 'candidate' mnemonic, matching a valid bip39 checksum."
+    )
+    parser.add_argument(
+        "-c", "--correct", action="store_true", default=False,
+        help="correct mistyped words instead of modifying the last word (default = False)\n"
+             "all the mnemonics matching a valid bip39 checksum are listed"
+    )
+    parser.add_argument(
+        "-d", "--distance", action="store", default="1",
+        help="maximum number of typos per word, used with --correct\n"
+             f"supported distances are 1-{correction.DISTANCE_MAX} (DEFAULT = 1)"
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", default=False,
+        help="list all the valid last words instead of modifying the last word (default = False)\n"
+             "the candidate mnemonic can be complete or miss the last word"
+    )
+    parser.add_argument(
+        "-i", "--input-file", action="store", default=None,
+        help="read candidate mnemonics from a file, one per line, and list their valid last words"
+    )
+    options = parser.parse_args(args)
+
     __print_header()
 
     try:
+        if not (options.distance.isnumeric() and int(options.distance) in range(1, correction.DISTANCE_MAX + 1)):
+            raise ValueError("invalid distance\n\t"
+                             f"expected: 1-{correction.DISTANCE_MAX}\n\t"
+                             f"obtained: {options.distance}")
+
+        if options.input_file:
+            with open(options.input_file, 'r') as file:
+                mnemonics = tuple(line.strip() for line in file if line.strip())
+
+            # an invalid line is reported, the others are completed anyway
+            failed = 0
+            for mnemonic in mnemonics:
+                try:
+                    print(f"{mnemonic}: {' '.join(completion.last_words(mnemonic))}")
+                except ValueError as ve:
+                    error = " | ".join(str(ve).split("\n\t"))
+                    print(f"{mnemonic}: {error}")
+                    failed += 1
+            if failed:
+                exit(1)
+            return
+
         print("insert a candidate bip39 mnemonic:")
-        mnemonic = Seed.from_mnemonic(input("mnemonic > ").strip(), True).mnemonic
-        print(f"\na valid bip39 mnemonic is:\n{' '.join(mnemonic)}")
+        mnemonic = input("mnemonic > ").strip()
+        if options.list:
+            words = completion.last_words(mnemonic)
+            print(f"\nfound {len(words)} valid last words:\n{' '.join(words)}")
+        elif options.correct:
+            seeds = tuple(correction.correct(mnemonic, int(options.distance)))
+            if not seeds:
+                raise ValueError("no valid bip39 mnemonic found\n\t"
+                                 "try with a greater distance")
+
+            print(f"\nfound {len(seeds)} valid bip39 mnemonics, sorted by number of typos:")
+            for seed in seeds:
+                print(' '.join(seed.mnemonic))
+        else:
+            mnemonic = Seed.from_mnemonic(mnemonic, True).mnemonic
+            print(f"\na valid bip39 mnemonic is:\n{' '.join(mnemonic)}")
     except Exception as e:
         print(e)
+        print()
+        parser.print_usage()
         exit(-1)
 
 
 if __name__ == "__main__":
-    __mnemonic_fixsum()
\ No newline at end of file
+    __mnemonic_fixsum()
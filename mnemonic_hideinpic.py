@@ -53,7 +53,8 @@ def __mnemonic_hideinpic(args=None):
              "0) NONE (DEFAULT): no encryption applied\n"
              "1) NEGATIVE: invert all bits\n"
              "2) REVERSAL: swap all bits\n"
-             "3) PASSWORD: protect with a password")
+             "3) PASSWORD: protect with a password\n"
+             "4) AEAD: protect with a password, compact format")
     parser.add_argument(
         "-d", "--direction", action="store", default="0",
         help="traverse the image in different directions\n"
@@ -61,7 +62,27 @@ def __mnemonic_hideinpic(args=None):
              "0) HORIZONTAL (DEFAULT)\n"
              "1) VERTICAL\n"
              "2) REVERSE_HORIZONTAL\n"
-             "3) REVERSE_VERTICAL")
+             "3) REVERSE_VERTICAL\n"
+             "4) KEYED: pseudo-random, from a password")
+    parser.add_argument(
+        "-k", "--kdf", action="store", default="1",
+        help="derive the PASSWORD and AEAD key with different functions\n"
+             "supported functions are:\n"
+             "1) SCRYPT (DEFAULT)\n"
+             "2) PBKDF2")
+    parser.add_argument(
+        "-l", "--legacy", action="store_true", default=False,
+        help="hide the mnemonic in the legacy layout, readable by older versions (default = False)"
+    )
+    parser.add_argument(
+        "-c", "--channels", action="store", default=None,
+        help="image channels carrying the mnemonic, e.g. RGBA (DEFAULT = the color channels: RGB, L or P)"
+    )
+    parser.add_argument(
+        "-b", "--bits", action="store", default="1",
+        help=f"bits per channel carrying the mnemonic: 1-{steganography.DEPTH_MAX} (DEFAULT = 1)\n"
+             "more bits fit the mnemonic into fewer pixels, but are less hidden"
+    )
     parser.add_argument(
         "-i", "--input-file", action="store", required=True,
         help="input image file"
@@ -88,6 +109,16 @@ def __mnemonic_hideinpic(args=None):
                              f"expected: 0-{len(encryption.Direction)}\n\t"
                              f"obtained: {options.direction}")
 
+        if not (options.kdf.isnumeric() and int(options.kdf) in range(1, len(encryption.Kdf))):
+            raise ValueError(f"invalid kdf\n\t"
+                             f"expected: 1-{len(encryption.Kdf) - 1}\n\t"
+                             f"obtained: {options.kdf}")
+
+        if not options.bits.isnumeric():
+            raise ValueError(f"invalid bits\n\t"
+                             f"expected: 1-{steganography.DEPTH_MAX}\n\t"
+                             f"obtained: {options.bits}")
+
         if options.generate:
             mnemonic = ' '.join(Seed.from_entropy(BetterEntropy.generate()).mnemonic)
             print("generating a new 24 words mnemonic:")
@@ -99,7 +130,7 @@ def __mnemonic_hideinpic(args=None):
         algorithm = encryption.Algorithm(int(options.encryption))
         direction = encryption.Direction(int(options.direction))
         password = None
-        if algorithm == encryption.Algorithm.PASSWORD:
+        if algorithm in encryption.PASSWORD_ALL or direction == encryption.Direction.KEYED:
             print("\ninsert a password:")
             password = getpass.getpass(prompt='password > ')
             print("insert again.....:")
@@ -107,12 +138,20 @@ def __mnemonic_hideinpic(args=None):
                 raise ValueError("password did not match!")
 
         with Image.open(options.input_file, mode='r') as input_image:
+            plan = steganography.ChannelPlan(
+                options.channels or steganography.ChannelPlan.for_mode(input_image.mode).channels, int(options.bits)
+            )
             input_image_name = options.input_file.split('/')[-1].split('.')[0]
 
             output_file = options.output_path + "/" + input_image_name + "_" + \
                           options.encryption + options.direction + ".png"
 
-            output_image = steganography.encode(mnemonic, input_image, algorithm, direction, password)
+            output_image = steganography.encode(
+                mnemonic, input_image, algorithm, direction, password,
+                encryption.KeyDerivation(encryption.Kdf(int(options.kdf))),
+                steganography.Layout.LEGACY if options.legacy else steganography.Layout.FRAMED,
+                plan
+            )
             output_image.save(output_file)
 
     except Exception as e:
@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import sys
+
+from generator import randomness
+from generator.entropy import Entropy, BetterEntropy
+
+GENERATORS = {"entropy": Entropy, "betterentropy": BetterEntropy}
+
+
+def __print_header():
+    print(
+        "*************************\n"
+        "** mnemonic_randomness **\n"
+        "*************************\n"
+        "Run statistical randomness tests (a NIST SP 800-22 subset) against the entropy generators.\n"
+    )
+
+
+def __mnemonic_randomness(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Run statistical randomness tests (a NIST SP 800-22 subset) against the entropy generators."
+    )
+    parser.add_argument(
+        "-g", "--generator", action="store", default="betterentropy",
+        help=f"entropy generator to test: {', '.join(GENERATORS)} (DEFAULT = betterentropy)"
+    )
+    parser.add_argument(
+        "-n", "--sequences", action="store", default="100",
+        help="number of sequences (DEFAULT = 100)\n"
+             f"the distribution of the p-values is evaluated from {randomness.UNIFORMITY_MIN} sequences"
+    )
+    parser.add_argument(
+        "-s", "--sequence-size", action="store", default=str(randomness.SEQUENCE_SIZE_DEFAULT),
+        help=f"bits per sequence, a multiple of 8 (DEFAULT = {randomness.SEQUENCE_SIZE_DEFAULT})\n"
+             f"at least {randomness.SEQUENCE_SIZE_MIN} bits"
+    )
+    parser.add_argument(
+        "-w", "--workers", action="store", default=None,
+        help="number of parallel processes (DEFAULT = number of cpus)"
+    )
+    parser.add_argument(
+        "-o", "--output-file", action="store", default=None,
+        help="write the report to a file, besides the standard output"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        if options.generator not in GENERATORS:
+            raise ValueError("invalid generator\n\t"
+                             f"expected: {', '.join(GENERATORS)}\n\t"
+                             f"obtained: {options.generator}")
+
+        for name in ("sequences", "sequence_size", "workers"):
+            value = getattr(options, name)
+            if value is not None and not value.isnumeric():
+                raise ValueError(f"invalid {name.replace('_', ' ')}\n\t"
+                                 "expected: 1 or more\n\t"
+                                 f"obtained: {value}")
+
+        report = randomness.run(
+            GENERATORS[options.generator], int(options.sequences), int(options.sequence_size),
+            int(options.workers) if options.workers else None
+        )
+        print(report.to_string())
+
+        if options.output_file:
+            with open(options.output_file, 'w', encoding='utf-8') as file:
+                file.write(report.to_string() + "\n")
+            print(f"\nreport written to {options.output_file}")
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+    if not all(report.passed.values()):
+        exit(1)
+
+
+if __name__ == "__main__":
+    __mnemonic_randomness()
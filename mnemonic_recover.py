@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import getpass
+import logging
+import sys
+
+from generator.recovery import recover, UNKNOWN_WORD
+
+
+def __print_header():
+    print(
+        "**********************\n"
+        "** mnemonic_recover **\n"
+        "**********************\n"
+        "Recover a bip39 mnemonic with missing, illegible or swapped words.\n"
+        f"Mark the illegible words with '{UNKNOWN_WORD}', and omit the missing words if their position is unknown.\n"
+    )
+
+
+def __mnemonic_recover(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Recover a bip39 mnemonic with missing, illegible or swapped words."
+    )
+    parser.add_argument(
+        "-n", "--word-count", action="store", default="0",
+        help="number of words of the original mnemonic, when some words are missing at unknown positions\n"
+             "(DEFAULT = 0, the number of inserted words)"
+    )
+    parser.add_argument(
+        "-s", "--swap", action="store_true", default=False,
+        help="try also swapping two adjacent words (default = False)"
+    )
+    parser.add_argument(
+        "-r", "--rootseed", action="store", default=None,
+        help="known rootseed, or its first bytes, in hex format, used to confirm the recovered mnemonics"
+    )
+    parser.add_argument(
+        "-a", "--address", action="store", default=None,
+        help="known address, among the first 20 receive addresses of the first account, used to confirm the\n"
+             "recovered mnemonics"
+    )
+    parser.add_argument(
+        "-p", "--passphrase", action="store_true", default=False,
+        help="ask for the passphrase of the known rootseed or address (default = False)"
+    )
+    parser.add_argument(
+        "-w", "--workers", action="store", default="0",
+        help="number of parallel workers (DEFAULT = 0, one per cpu)"
+    )
+    parser.add_argument(
+        "-c", "--checkpoint", action="store", default=None,
+        help="checkpoint file, used to resume an interrupted search"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        for name in ("word_count", "workers"):
+            if not getattr(options, name).isnumeric():
+                raise ValueError(f"invalid {name.replace('_', ' ')}\n\t"
+                                 "expected: 0 or more\n\t"
+                                 f"obtained: {getattr(options, name)}")
+
+        print("insert the known words of your bip39 mnemonic:")
+        mnemonic = input("mnemonic > ").strip()
+
+        passphrase = ""
+        if options.passphrase:
+            print("\ninsert the passphrase:")
+            passphrase = getpass.getpass(prompt='passphrase > ')
+
+        seeds = recover(
+            mnemonic, int(options.word_count) or None, options.swap, options.rootseed, passphrase,
+            int(options.workers) or None, options.checkpoint, options.address
+        )
+
+        print(f"\nfound {len(seeds)} valid bip39 mnemonics:")
+        for seed in seeds:
+            print(' '.join(seed.mnemonic))
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    __mnemonic_recover()
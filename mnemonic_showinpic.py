@@ -46,7 +46,8 @@ def __mnemonic_showinpic(args=None):
              "0) NONE (DEFAULT): no decryption applied\n"
              "1) NEGATIVE: invert all bits\n"
              "2) REVERSAL: swap all bits\n"
-             "3) PASSWORD: decrypt with a password")
+             "3) PASSWORD: decrypt with a password\n"
+             "4) AEAD: decrypt with a password, compact format")
     parser.add_argument(
         "-d", "--direction", action="store", default="0",
         help="traverse the image in different directions\n"
@@ -54,7 +55,12 @@ def __mnemonic_showinpic(args=None):
              "0) HORIZONTAL (DEFAULT)\n"
              "1) VERTICAL\n"
              "2) REVERSE_HORIZONTAL\n"
-             "3) REVERSE_VERTICAL")
+             "3) REVERSE_VERTICAL\n"
+             "4) KEYED: pseudo-random, from a password")
+    parser.add_argument(
+        "-l", "--legacy", action="store_true", default=False,
+        help="read a mnemonic hidden in the legacy layout, by older versions (default = False)"
+    )
     parser.add_argument(
         "-i", "--input-file", action="store", required=True,
         help="input image file"
@@ -77,7 +83,7 @@ def __mnemonic_showinpic(args=None):
         algorithm = encryption.Algorithm(int(options.encryption))
         direction = encryption.Direction(int(options.direction))
         password = None
-        if algorithm == encryption.Algorithm.PASSWORD:
+        if algorithm in encryption.PASSWORD_ALL or direction == encryption.Direction.KEYED:
             print("\ninsert a password:")
             password = getpass.getpass(prompt='password > ')
             print("insert again.....:")
@@ -87,7 +93,11 @@ def __mnemonic_showinpic(args=None):
         with Image.open(options.input_file, mode='r') as image:
             input_image_name = options.input_file.split('/')[-1].split('.')[0]
 
-            mnemonic = steganography.decode(image, algorithm, direction, password)
+            # framed images are checked from their header: a wrong direction or algorithm is reported at once
+            mnemonic = steganography.decode(
+                image, algorithm, direction, password,
+                steganography.Layout.LEGACY if options.legacy else steganography.Layout.FRAMED
+            )
             print("\nfound message in picture:")
             print(mnemonic.decode('utf-8'))
 
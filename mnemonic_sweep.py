@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import logging
+import sys
+
+from generator.seed import Seed
+from generator.sweep import sweep
+
+
+def __print_header():
+    print(
+        "********************\n"
+        "** mnemonic_sweep **\n"
+        "********************\n"
+        "Recover a forgotten bip39 passphrase, testing a list of candidates against a known rootseed or master key\n"
+        "fingerprint.\n"
+    )
+
+
+def __read_candidates(file):
+    for line in file:
+        yield line.rstrip("\r\n")
+
+
+def __mnemonic_sweep(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Recover a forgotten bip39 passphrase, testing a list of candidates against a known rootseed or\n"
+                    "master key fingerprint."
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "-r", "--rootseed", action="store",
+        help="known rootseed, or its first bytes, in hex format"
+    )
+    target.add_argument(
+        "-f", "--fingerprint", action="store",
+        help="known bip32 master key fingerprint, in hex format (e.g. 73c5da0a)"
+    )
+    parser.add_argument(
+        "-i", "--input-file", action="store", required=True,
+        help="candidate passphrases file, one per line"
+    )
+    parser.add_argument(
+        "-w", "--workers", action="store", default="0",
+        help="number of parallel workers (DEFAULT = 0, one per cpu)"
+    )
+    parser.add_argument(
+        "-c", "--checkpoint", action="store", default=None,
+        help="checkpoint file, used to resume an interrupted sweep"
+    )
+    options = parser.parse_args(args)
+
+    __print_header()
+
+    try:
+        if not options.workers.isnumeric():
+            raise ValueError("invalid workers\n\t"
+                             "expected: 0 or more\n\t"
+                             f"obtained: {options.workers}")
+
+        print("insert your bip39 mnemonic:")
+        seed = Seed.from_mnemonic(input("mnemonic > ").strip())
+
+        with open(options.input_file, 'r', encoding='utf-8') as file:
+            passphrase = sweep(
+                seed, __read_candidates(file), options.rootseed or options.fingerprint,
+                int(options.workers) or None, options.checkpoint, options.fingerprint is not None
+            )
+
+        if passphrase is None:
+            print("\nno matching passphrase found")
+        else:
+            print(f"\nfound matching passphrase:\n{passphrase}")
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    __mnemonic_sweep()
@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import argparse
+import datetime
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from generator import derivation
+from generator.seed import Seed, SeedArray, ENTROPY_SIZE_ALL
+from utils import mnemonic
+
+NUMBER = 1000  # scalar operations per benchmark
+BULK_SIZE = 1000  # seeds per bulk operation
+REPEAT = 5  # bulk operations per benchmark
+ALLOCATION_NUMBER = 20  # operations traced by tracemalloc
+THRESHOLD = 10  # percent
+
+RANDOM_SEED = 0  # the same inputs on every run
+
+# slow paths run fewer times
+WEIGHTS = {
+    'rootseed': 100
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_benchmarks(entropy_size: int, count: int) -> dict:
+    generator = random.Random(RANDOM_SEED + entropy_size)
+    entropies = [generator.getrandbits(entropy_size).to_bytes(entropy_size // 8, byteorder='big') for _ in range(count)]
+    mnemonics = [Seed.from_entropy(entropy).mnemonic for entropy in entropies]
+
+    # each benchmark is a setup returning fresh inputs, plus a scalar and a bulk operation on them
+    benchmarks = {
+        'from_entropy': (
+            lambda: entropies,
+            lambda entropy: Seed.from_entropy(entropy),
+            lambda inputs: SeedArray.from_entropies(inputs)
+        ),
+        'from_mnemonic': (
+            lambda: mnemonics,
+            lambda words: Seed.from_mnemonic(words),
+            lambda inputs: SeedArray.from_mnemonics(inputs)
+        ),
+        'mnemonic': (
+            lambda: [Seed.from_entropy(entropy) for entropy in entropies],
+            lambda seed: seed.mnemonic,
+            lambda inputs: SeedArray.from_entropies([seed.entropy for seed in inputs]).mnemonics()
+        ),
+        'checksum': (
+            lambda: [Seed.from_entropy(entropy) for entropy in entropies],
+            lambda seed: seed.checksum,
+            lambda inputs: SeedArray.from_entropies([seed.entropy for seed in inputs]).checksums
+        ),
+        'rootseed': (
+            lambda: [Seed.from_entropy(entropy) for entropy in entropies],
+            lambda seed: seed.rootseed,
+            lambda inputs: derivation.derive_rootseeds(inputs)
+        )
+    }
+
+    if entropy_size == 256:
+        benchmarks['split'] = (
+            lambda: mnemonics,
+            lambda words: tuple(mnemonic.split(words)),
+            lambda inputs: [tuple(mnemonic.split(words)) for words in inputs]
+        )
+        benchmarks['join'] = (
+            lambda: [tuple(mnemonic.split(words)) for words in mnemonics],
+            lambda pair: mnemonic.join(*pair),
+            lambda inputs: [mnemonic.join(*pair) for pair in inputs]
+        )
+
+    return benchmarks
+
+
+def run(number: int = NUMBER, bulk_size: int = BULK_SIZE, name_filter: str = "") -> dict:
+    results = {}
+    for entropy_size in ENTROPY_SIZE_ALL:
+        for name, (setup, scalar, bulk) in get_benchmarks(entropy_size, max(number, bulk_size)).items():
+            weight = WEIGHTS.get(name, 1)
+
+            key = f"{name}/{entropy_size}/scalar"
+            if name_filter in key:
+                inputs = setup()[:max(1, number // weight)]
+                scalar(setup()[-1])  # warm up caches, e.g. wordlists
+                samples = []
+                for value in inputs:
+                    start = time.perf_counter_ns()
+                    scalar(value)
+                    samples.append(time.perf_counter_ns() - start)
+
+                results[key] = __get_stats(samples, 1, __get_peak(scalar, [(v,) for v in setup()[:ALLOCATION_NUMBER]]))
+                __print_result(key, results[key])
+
+            key = f"{name}/{entropy_size}/bulk"
+            if name_filter in key:
+                size = max(1, bulk_size // weight)
+                samples = []
+                for _ in range(REPEAT):
+                    inputs = setup()[:size]
+                    start = time.perf_counter_ns()
+                    bulk(inputs)
+                    samples.append(time.perf_counter_ns() - start)
+
+                results[key] = __get_stats(samples, size, __get_peak(bulk, [(setup()[:size],)]) // size)
+                __print_result(key, results[key])
+
+    return results
+
+
+def compare(baseline: dict, results: dict, threshold: float = THRESHOLD) -> list[str]:
+    # medians are compared, they are less sensitive than means to a noisy machine
+    print(f"\n{'benchmark':32} {'baseline':>14} {'current':>14} {'change':>9}")
+
+    regressions = []
+    for key in sorted(set(baseline) | set(results)):
+        if key not in results or key not in baseline:
+            print(f"{key:32} {'missing' if key not in baseline else '':>14} {'missing' if key not in results else '':>14}")
+            continue
+
+        before, after = 1e6 / baseline[key]['p50_us'], 1e6 / results[key]['p50_us']
+        change = (after - before) / before * 100
+        regression = change < -threshold
+        print(f"{key:32} {before:>12.1f}/s {after:>12.1f}/s {change:>+8.1f}%{' REGRESSION' if regression else ''}")
+        if regression:
+            regressions.append(key)
+
+    return regressions
+
+
+def __get_stats(samples: list[int], size: int, peak: int) -> dict:
+    per_op = sorted(sample / size / 1000 for sample in samples)  # microseconds
+    quantiles = statistics.quantiles(per_op, n=100, method='inclusive') if len(per_op) > 1 else per_op * 99
+    return {
+        'ops': size * len(samples) / (sum(samples) / 1e9),
+        'p50_us': quantiles[49],
+        'p90_us': quantiles[89],
+        'p99_us': quantiles[98],
+        'peak_bytes': peak
+    }
+
+
+def __get_peak(operation, arguments: list[tuple]) -> int:
+    # median peak allocation of a single operation
+    peaks = []
+    tracemalloc.start()
+    try:
+        for args in arguments:
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            operation(*args)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return int(statistics.median(peaks))
+
+
+def __print_result(key: str, result: dict):
+    print(f"{key:32} {result['ops']:>12.1f}/s  p50 {result['p50_us']:>10.2f}us  p90 {result['p90_us']:>10.2f}us  "
+          f"p99 {result['p99_us']:>10.2f}us  peak {result['peak_bytes']:>9} bytes")
+
+
+def __benchmark_generator(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Benchmark the seed and mnemonic hot paths, in scalar and bulk mode, for every entropy size."
+    )
+    parser.add_argument(
+        "-n", "--number", action="store", default=str(NUMBER),
+        help=f"scalar operations per benchmark (DEFAULT = {NUMBER})"
+    )
+    parser.add_argument(
+        "-b", "--bulk-size", action="store", default=str(BULK_SIZE),
+        help=f"seeds per bulk operation (DEFAULT = {BULK_SIZE})"
+    )
+    parser.add_argument(
+        "-f", "--filter", action="store", default="",
+        help="run only the benchmarks containing this text, e.g. 'rootseed' or '/256/'"
+    )
+    parser.add_argument(
+        "-s", "--save", action="store", default=None,
+        help="save the results as a json baseline"
+    )
+    parser.add_argument(
+        "-c", "--compare", action="store", default=None,
+        help="compare the results with a json baseline, exit with an error on regressions"
+    )
+    parser.add_argument(
+        "-t", "--threshold", action="store", default=str(THRESHOLD),
+        help=f"slowdown percentage reported as a regression (DEFAULT = {THRESHOLD})"
+    )
+    options = parser.parse_args(args)
+
+    try:
+        for name in ("number", "bulk_size", "threshold"):
+            if not getattr(options, name).isnumeric():
+                raise ValueError(f"invalid {name.replace('_', ' ')}\n\t"
+                                 "expected: 0 or more\n\t"
+                                 f"obtained: {getattr(options, name)}")
+
+        baseline = None
+        if options.compare:
+            with open(options.compare, 'r') as file:
+                baseline = json.load(file)['results']
+
+        results = run(int(options.number), int(options.bulk_size), options.filter)
+
+        if options.save:
+            with open(options.save, 'w') as file:
+                json.dump({
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'results': results
+                }, file, indent=2)
+    except Exception as e:
+        print(e)
+        print()
+        parser.print_usage()
+        exit(-1)
+
+    if baseline is not None:
+        if options.filter:
+            baseline = {key: value for key, value in baseline.items() if options.filter in key}
+
+        regressions = compare(baseline, results, int(options.threshold))
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {options.threshold}%")
+            exit(1)
+
+
+if __name__ == '__main__':
+    # log records would be measured too
+    logging.basicConfig(level=logging.ERROR)
+    __benchmark_generator()
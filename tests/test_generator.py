@@ -21,11 +21,14 @@ import copy
 import json
 import logging
 import math
+import unicodedata
 from collections.abc import Iterable
 
+import numpy as np
+
 from generator.entropy import Entropy
-from generator.seed import Seed, ENTROPY_SIZE_ALL, WORD_SIZE, ENTROPY_SIZE_MIN
-from generator.wordlist import wordlist
+from generator.seed import Seed, SeedArray, ENTROPY_SIZE_ALL, WORD_SIZE, ENTROPY_SIZE_MIN
+from generator.wordindex import wordindex
 
 LOGGER = logging.getLogger(__name__)
 
@@ -36,12 +39,12 @@ def __invalidate_mnemonic(mnemonic: Iterable[str] | str) -> Iterable[str]:
     result = copy.deepcopy(mnemonic)
     result = result.split() if isinstance(result, str) else result
 
-    last_wid = wordlist.index(result[-1])
+    last_wid = wordindex.index(result[-1])
     last_wid = \
         last_wid & (2 ** WORD_SIZE - 2 ** CHECKSUM_SIZE_MIN) | \
         (2 ** CHECKSUM_SIZE_MIN - 1 - (last_wid & (2 ** CHECKSUM_SIZE_MIN - 1)))
 
-    result[-1] = wordlist[last_wid]
+    result[-1] = wordindex[last_wid]
 
     return result
 
@@ -80,6 +83,15 @@ def test_mnemonic():
                                                  f"expected: {rootseed}{sep}" \
                                                  f"obtained: {rootseed_obt}"
 
+                # cached rootseed must follow passphrase changes and wiping
+                seed.passphrase = ""
+                seed.wipe()
+                seed.passphrase = "TREZOR"
+                rootseed_obt = seed.rootseed.hex()
+                assert rootseed_obt == rootseed, f"invalid cached rootseed{sep}" \
+                                                 f"expected: {rootseed}{sep}" \
+                                                 f"obtained: {rootseed_obt}"
+
             except Exception as e:
                 LOGGER.error(" | ".join(str(e).split(sep)))
                 failed.append(f"{group}.{count}.{subcount}")
@@ -143,6 +155,86 @@ def test_mnemonic():
         LOGGER.info(f"TESTS FAILED: {', '.join(failed)}")
 
 
+def test_seedarray():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    LOGGER.info("START SEEDARRAY TESTS\n")
+    for count, size in enumerate(ENTROPY_SIZE_ALL):
+        LOGGER.info(f"START TEST {count}")
+
+        entropies = [
+            Seed.from_entropy(case['entropy']).entropy for case in data['vector']
+            if len(Seed.from_entropy(case['entropy']).entropy) * 8 == size
+        ] + [Seed.from_entropy(Entropy.generate(size)).entropy for _ in range(100)]
+
+        seeds = SeedArray.from_entropies(entropies)
+        mnemonics_exp = [Seed.from_entropy(entropy).mnemonic for entropy in entropies]
+        mnemonics_obt = seeds.mnemonics()
+        assert mnemonics_obt == mnemonics_exp, f"invalid mnemonics{sep}" \
+                                               f"expected: {mnemonics_exp}{sep}" \
+                                               f"obtained: {mnemonics_obt}"
+
+        entropies_obt = SeedArray.from_mnemonics(mnemonics_exp).entropies()
+        assert entropies_obt == entropies, f"invalid entropies{sep}" \
+                                           f"expected: {[e.hex() for e in entropies]}{sep}" \
+                                           f"obtained: {[e.hex() for e in entropies_obt]}"
+
+        # arrays of entropy bytes must be uint8, never cast
+        array = np.frombuffer(b"".join(entropies), dtype=np.uint8).reshape(len(entropies), -1)
+        assert SeedArray.from_entropies(array).entropies() == entropies, f"invalid uint8 entropies{sep}" \
+                                                                         f"expected: {len(entropies)} entropies"
+        try:
+            SeedArray.from_entropies(array.astype(np.uint16) * 257)
+            assert False, "uint16 entropies accepted"
+        except TypeError:
+            pass
+
+        LOGGER.info(f"STOP  TEST {count}\n")
+
+    LOGGER.info("STOP  SEEDARRAY TESTS\n\n")
+
+
+def test_language():
+    with open('test_generator.json', 'r', encoding='utf-8') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    LOGGER.info("START LANGUAGE TESTS\n")
+    for count, case in enumerate(data['language']):
+        LOGGER.info(f"START TEST {count}: {case['language'].upper()}")
+
+        for subcount, seed in enumerate((
+                Seed.from_entropy(case['entropy'], case['language']),
+                Seed.from_mnemonic(case['mnemonic'])
+        )):
+            seed.passphrase = "TREZOR"
+
+            assert seed.language == case['language'], f"invalid language{sep}" \
+                                                      f"expected: {case['language']}{sep}" \
+                                                      f"obtained: {seed.language}"
+
+            mnemonic_exp = unicodedata.normalize('NFKD', " ".join(case['mnemonic'].split()))
+            mnemonic_obt = " ".join(seed.mnemonic)
+            assert mnemonic_obt == mnemonic_exp, f"invalid mnemonic{sep}" \
+                                                 f"expected: '{mnemonic_exp}'{sep}" \
+                                                 f"obtained: '{mnemonic_obt}'"
+
+            rootseed_obt = seed.rootseed.hex()
+            assert rootseed_obt == case['rootseed'], f"invalid rootseed{sep}" \
+                                                     f"expected: {case['rootseed']}{sep}" \
+                                                     f"obtained: {rootseed_obt}"
+
+        LOGGER.info(f"STOP  TEST {count}: {case['language'].upper()}\n")
+
+    LOGGER.info("STOP  LANGUAGE TESTS\n\n")
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
     test_mnemonic()
+    test_seedarray()
+    test_language()
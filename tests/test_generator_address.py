@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import logging
+
+from generator.address import Script, to_script, to_script_type, to_address, from_address
+from generator.bip32 import ExtendedKey
+from generator.seed import Seed
+
+# first receive address of the bip44, bip49, bip84 and bip86 test vectors
+ADDRESS_MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+ADDRESS_VECTORS = {
+    Script.P2PKH: "1LqBGSKuX5yYUonjxT5qGfpUsXKYYWeabA",
+    Script.P2SH_P2WPKH: "37VucYSaXLCAsxYyAPfbSi9eh4iEcbShgf",
+    Script.P2WPKH: "bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu",
+    Script.P2TR: "bc1p5cyxnuxmeuwuvkwfem96lqzszd02n6xdcjrs20cac6yqjjwudpxqkedrcr"
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_address():
+    sep = "\n\t"
+
+    master = ExtendedKey.from_seed(Seed.from_mnemonic(ADDRESS_MNEMONIC))
+    for count, (script_type, expected) in enumerate(ADDRESS_VECTORS.items()):
+        LOGGER.info(f"START TEST {count}: {script_type.to_string().upper()}")
+        script = to_script(master.derive(f"{script_type.to_path()}/0/0"), script_type)
+        obtained = to_address(script)
+        assert obtained == expected, f"invalid address{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {obtained}"
+        assert from_address(expected) == script, f"invalid script{sep}" \
+                                                 f"expected: {script.hex()}{sep}" \
+                                                 f"obtained: {from_address(expected).hex()}"
+        assert to_script_type(script) == script_type, f"invalid script type{sep}" \
+                                                      f"expected: {script_type.to_string()}{sep}" \
+                                                      f"obtained: {to_script_type(script).to_string()}"
+        LOGGER.info(f"STOP  TEST {count}: {script_type.to_string().upper()}")
+
+    LOGGER.info(f"START TEST {len(ADDRESS_VECTORS)}: INVALID ADDRESSES")
+    for address in (
+            ADDRESS_VECTORS[Script.P2WPKH][:-1] + "v",  # bad checksum
+            ADDRESS_VECTORS[Script.P2WPKH].upper()[:-1] + "u",  # mixed case
+            ADDRESS_VECTORS[Script.P2PKH][:-1] + "B",  # bad checksum
+            "tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx"  # testnet
+    ):
+        try:
+            from_address(address)
+            assert False, f"invalid address accepted{sep}{address}"
+        except ValueError:
+            pass
+    LOGGER.info(f"STOP  TEST {len(ADDRESS_VECTORS)}: INVALID ADDRESSES")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_address()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import hashlib
+import json
+import logging
+import os
+
+from generator.address import Script, to_script, to_address
+from generator.addressindex import AddressIndex, scan
+from generator.bip32 import ExtendedKey
+from generator.seed import Seed
+
+INDEX_FILE = "./output/test_generator_addressindex.idx"
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_addressindex():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    case = data['vector'][2]
+    seed = Seed.from_mnemonic(case['mnemonic'])
+    seed.passphrase = "TREZOR"
+    master = ExtendedKey.from_seed(seed)
+
+    used = {
+        "m/44'/0'/0'/0/0": Script.P2PKH,
+        "m/84'/0'/0'/0/15": Script.P2WPKH,
+        "m/84'/0'/0'/0/34": Script.P2WPKH,  # within the gap limit of the previous one
+        "m/86'/0'/0'/1/2": Script.P2TR,
+        "m/49'/0'/0'/0/20": Script.P2SH_P2WPKH  # beyond the gap limit
+    }
+    scripts = {path: to_script(master.derive(path), script) for path, script in used.items()}
+
+    # unrelated entries, as addresses and as hex scripts
+    entries = [hashlib.sha256(i.to_bytes(4, byteorder='big')).digest()[:22].hex() for i in range(5000)]
+    entries += [to_address(b"\x00\x14" + hashlib.sha256(str(i).encode()).digest()[:20]) for i in range(5000)]
+    entries += [to_address(script) for script in scripts.values()] + ["not an address"]
+
+    LOGGER.info("START TEST 1: BUILD")
+    with AddressIndex.build(entries, INDEX_FILE) as index:
+        assert len(index) == len(entries) - 1, f"invalid index size{sep}" \
+                                               f"expected: {len(entries) - 1}{sep}" \
+                                               f"obtained: {len(index)}"
+    LOGGER.info("STOP  TEST 1: BUILD")
+
+    LOGGER.info("START TEST 2: LOOKUP")
+    with AddressIndex(INDEX_FILE) as index:
+        for entry in entries[:-1:97]:
+            assert entry in index, f"entry not found{sep}{entry}"
+
+        missing = [hashlib.sha256(b"missing" + i.to_bytes(4, byteorder='big')).digest()[:22] for i in range(5000)]
+        found = int(index.contains_many(missing).sum())
+        assert found == 0, f"invalid lookup{sep}" \
+                           f"expected: 0 found{sep}" \
+                           f"obtained: {found} found"
+    LOGGER.info("STOP  TEST 2: LOOKUP")
+
+    LOGGER.info("START TEST 3: SCAN")
+    with AddressIndex(INDEX_FILE) as index:
+        expected = [(path, to_address(script)) for path, script in scripts.items() if path != "m/49'/0'/0'/0/20"]
+        obtained = list(scan(seed, index))
+        assert sorted(obtained) == sorted(expected), f"invalid scan{sep}" \
+                                                     f"expected: {expected}{sep}" \
+                                                     f"obtained: {obtained}"
+    os.remove(INDEX_FILE)
+    LOGGER.info("STOP  TEST 3: SCAN")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_addressindex()
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+
+from generator.bip32 import ExtendedKey, KeyChain, hash160, parse_path
+
+# bip32 test vectors 1 and 2: (path, xpub, xprv)
+BIP32_VECTORS = {
+    "000102030405060708090a0b0c0d0e0f": (
+        (
+            "m",
+            "xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8",
+            "xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        ),
+        (
+            "m/0H",
+            "xpub68Gmy5EdvgibQVfPdqkBBCHxA5htiqg55crXYuXoQRKfDBFA1WEjWgP6LHhwBZeNK1VTsfTFUHCdrfp1bgwQ9xv5ski8PX9rL2dZXvgGDnw",
+            "xprv9uHRZZhk6KAJC1avXpDAp4MDc3sQKNxDiPvvkX8Br5ngLNv1TxvUxt4cV1rGL5hj6KCesnDYUhd7oWgT11eZG7XnxHrnYeSvkzY7d2bhkJ7"
+        ),
+        (
+            "m/0H/1",
+            "xpub6ASuArnXKPbfEwhqN6e3mwBcDTgzisQN1wXN9BJcM47sSikHjJf3UFHKkNAWbWMiGj7Wf5uMash7SyYq527Hqck2AxYysAA7xmALppuCkwQ",
+            "xprv9wTYmMFdV23N2TdNG573QoEsfRrWKQgWeibmLntzniatZvR9BmLnvSxqu53Kw1UmYPxLgboyZQaXwTCg8MSY3H2EU4pWcQDnRnrVA1xe8fs"
+        ),
+        (
+            "m/0H/1/2H",
+            "xpub6D4BDPcP2GT577Vvch3R8wDkScZWzQzMMUm3PWbmWvVJrZwQY4VUNgqFJPMM3No2dFDFGTsxxpG5uJh7n7epu4trkrX7x7DogT5Uv6fcLW5",
+            "xprv9z4pot5VBttmtdRTWfWQmoH1taj2axGVzFqSb8C9xaxKymcFzXBDptWmT7FwuEzG3ryjH4ktypQSAewRiNMjANTtpgP4mLTj34bhnZX7UiM"
+        ),
+        (
+            "m/0H/1/2H/2",
+            "xpub6FHa3pjLCk84BayeJxFW2SP4XRrFd1JYnxeLeU8EqN3vDfZmbqBqaGJAyiLjTAwm6ZLRQUMv1ZACTj37sR62cfN7fe5JnJ7dh8zL4fiyLHV",
+            "xprvA2JDeKCSNNZky6uBCviVfJSKyQ1mDYahRjijr5idH2WwLsEd4Hsb2Tyh8RfQMuPh7f7RtyzTtdrbdqqsunu5Mm3wDvUAKRHSC34sJ7in334"
+        ),
+        (
+            "m/0H/1/2H/2/1000000000",
+            "xpub6H1LXWLaKsWFhvm6RVpEL9P4KfRZSW7abD2ttkWP3SSQvnyA8FSVqNTEcYFgJS2UaFcxupHiYkro49S8yGasTvXEYBVPamhGW6cFJodrTHy",
+            "xprvA41z7zogVVwxVSgdKUHDy1SKmdb533PjDz7J6N6mV6uS3ze1ai8FHa8kmHScGpWmj4WggLyQjgPie1rFSruoUihUZREPSL39UNdE3BBDu76"
+        )
+    ),
+    "fffcf9f6f3f0edeae7e4e1dedbd8d5d2cfccc9c6c3c0bdbab7b4b1aeaba8a5a29f9c999693908d8a8784817e7b7875726f6c696663605d5a5754514e4b484542": (
+        (
+            "m",
+            "xpub661MyMwAqRbcFW31YEwpkMuc5THy2PSt5bDMsktWQcFF8syAmRUapSCGu8ED9W6oDMSgv6Zz8idoc4a6mr8BDzTJY47LJhkJ8UB7WEGuduB",
+            "xprv9s21ZrQH143K31xYSDQpPDxsXRTUcvj2iNHm5NUtrGiGG5e2DtALGdso3pGz6ssrdK4PFmM8NSpSBHNqPqm55Qn3LqFtT2emdEXVYsCzC2U"
+        ),
+        (
+            "m/0/2147483647H/1/2147483646H/2",
+            "xpub6FnCn6nSzZAw5Tw7cgR9bi15UV96gLZhjDstkXXxvCLsUXBGXPdSnLFbdpq8p9HmGsApME5hQTZ3emM2rnY5agb9rXpVGyy3bdW6EEgAtqt",
+            "xprvA2nrNbFZABcdryreWet9Ea4LvTJcGsqrMzxHx98MMrotbir7yrKCEXw7nadnHM8Dq38EGfSh6dqA9QWTyefMLEcBYJUuekgW4BYPJcr9E7j"
+        )
+    )
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_bip32():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: TEST VECTORS")
+    for rootseed, cases in BIP32_VECTORS.items():
+        master = ExtendedKey.from_rootseed(bytes.fromhex(rootseed))
+        for path, xpub, xprv in cases:
+            key = master.derive(path)
+            assert key.xprv == xprv and key.xpub == xpub, f"invalid extended key {path}{sep}" \
+                                                          f"expected: {xprv}, {xpub}{sep}" \
+                                                          f"obtained: {key.xprv}, {key.xpub}"
+            assert ExtendedKey.from_string(xprv) == key, f"invalid extended key parsing{sep}" \
+                                                         f"expected: {xprv}{sep}" \
+                                                         f"obtained: {ExtendedKey.from_string(xprv).xprv}"
+    LOGGER.info("STOP  TEST 1: TEST VECTORS")
+
+    LOGGER.info("START TEST 2: MASTER KEYS")
+    for case in data['vector']:
+        xprv = ExtendedKey.from_rootseed(bytes.fromhex(case['rootseed'])).xprv
+        assert xprv == case['xprvkey'], f"invalid master key{sep}" \
+                                        f"expected: {case['xprvkey']}{sep}" \
+                                        f"obtained: {xprv}"
+    LOGGER.info("STOP  TEST 2: MASTER KEYS")
+
+    LOGGER.info("START TEST 3: PUBLIC DERIVATION")
+    master = ExtendedKey.from_rootseed(bytes.fromhex(data['vector'][0]['rootseed']))
+    account = master.derive("m/84'/0'/0'")
+    expected = account.derive("m/0/7").xpub
+    obtained = ExtendedKey.from_string(account.xpub).derive("m/0/7").xpub
+    assert obtained == expected, f"invalid public derivation{sep}" \
+                                 f"expected: {expected}{sep}" \
+                                 f"obtained: {obtained}"
+
+    fingerprint = hash160(account.public_key)[:4]
+    assert account.child(0).parent_fingerprint == fingerprint, f"invalid fingerprint{sep}" \
+                                                               f"expected: {fingerprint.hex()}{sep}" \
+                                                               f"obtained: {account.child(0).parent_fingerprint.hex()}"
+    try:
+        account.neuter().child(0x80000000)
+        assert False, "hardened derivation from a public key"
+    except ValueError:
+        pass
+    LOGGER.info("STOP  TEST 3: PUBLIC DERIVATION")
+
+    LOGGER.info("START TEST 4: DERIVE RANGE")
+    chain = KeyChain(master)
+    parent = master.derive("m/84'/0'/0'/0")
+    for obtained, expected in (
+            (chain.derive_range("m/84'/0'/0'/0", 20, 10), [parent.child(i) for i in range(20, 30)]),
+            (parent.neuter().children(20, 10), [parent.neuter().child(i) for i in range(20, 30)])
+    ):
+        obtained, expected = [key.xpub for key in obtained], [key.xpub for key in expected]
+        assert obtained == expected, f"invalid range{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {obtained}"
+
+    for i in range(20, 30):
+        assert chain.derive(f"m/84'/0'/0'/0/{i}") == master.derive(parse_path(f"m/84h/0h/0h/0/{i}")), \
+            f"invalid cached derivation m/84'/0'/0'/0/{i}"
+    LOGGER.info("STOP  TEST 4: DERIVE RANGE")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_bip32()
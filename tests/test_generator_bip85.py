@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import logging
+
+from generator import bip85
+from generator.bip32 import ExtendedKey, KeyChain
+
+# bip85 test vectors
+BIP85_MASTER = "xprv9s21ZrQH143K2LBWUUQRFXhucrQqBpKdRRxNVq2zBqsx8HVqFk2uYo8kmbaLLHRdqtQpUm98uKfu3vca1LqdGhUtyoFnCNkfmXRyPXLjbKb"
+BIP85_ENTROPY = {
+    "m/83696968'/0'/0'":
+        "efecfbccffea313214232d29e71563d941229afb4338c21f9517c41aaa0d16f0"
+        "0b83d2a09ef747e7a64e8e2bd5a14869e693da66ce94ac2da570ab7ee48618f7",
+    "m/83696968'/0'/1'":
+        "70c6e3e8ebee8dc4c0dbba66076819bb8c09672527c4277ca8729532ad711872"
+        "218f826919f6b67218adde99018a6df9095ab2b58d803b5b93ec9802085a690e"
+}
+BIP85_MNEMONIC = {
+    12: "girl mad pet galaxy egg matter matrix prison refuse sense ordinary nose",
+    18: "near account window bike charge season chef number sketch tomorrow excuse sniff circle vital hockey outdoor "
+        "supply token",
+    24: "puppy ocean match cereal symbol another shed magic wrap hammer bulb intact gadget divorce twin tonight reason "
+        "outdoor destroy simple truth cigar social volcano"
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_bip85():
+    sep = "\n\t"
+
+    chain = KeyChain(ExtendedKey.from_string(BIP85_MASTER))
+
+    LOGGER.info("START TEST 1: ENTROPY")
+    for path, expected in BIP85_ENTROPY.items():
+        obtained = bip85.derive_entropy(chain, path).hex()
+        assert obtained == expected, f"invalid entropy {path}{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {obtained}"
+    LOGGER.info("STOP  TEST 1: ENTROPY")
+
+    LOGGER.info("START TEST 2: BIP39")
+    for word_count, expected in BIP85_MNEMONIC.items():
+        obtained = ' '.join(bip85.derive_mnemonic(chain, 0, word_count).mnemonic)
+        assert obtained == expected, f"invalid mnemonic{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {obtained}"
+    LOGGER.info("STOP  TEST 2: BIP39")
+
+    LOGGER.info("START TEST 3: BATCH")
+    for language in ("english", "japanese"):
+        batch = list(bip85.derive_mnemonics(chain, 250, 10, 24, language))
+        for index, seed in enumerate(batch, 250):
+            expected = bip85.derive_mnemonic(chain, index, 24, language)
+            assert seed == expected, f"invalid batch mnemonic {index}{sep}" \
+                                     f"expected: {' '.join(expected.mnemonic)}{sep}" \
+                                     f"obtained: {' '.join(seed.mnemonic)}"
+            assert seed.language == language, f"invalid language{sep}" \
+                                              f"expected: {language}{sep}" \
+                                              f"obtained: {seed.language}"
+
+    # languages without a bip85 code cannot be reproduced by other implementations
+    try:
+        bip85.derive_mnemonic(chain, 0, 12, "portuguese")
+        assert False, "portuguese child mnemonic derived"
+    except ValueError:
+        pass
+
+    # invalid arguments are rejected on call, before iterating
+    for word_count, language, start in ((15, "english", 0), (12, "klingon", 0), (12, "english", -1)):
+        try:
+            bip85.derive_mnemonics(chain, start, 1, word_count, language)
+            assert False, f"invalid arguments accepted: {word_count} words, {language}, index {start}"
+        except ValueError:
+            pass
+    LOGGER.info("STOP  TEST 3: BATCH")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_bip85()
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+
+from generator.completion import last_words, last_words_batch
+from generator.seed import Seed, WORD_SIZE, ENTROPY_SIZE_DIV
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_completion():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    mnemonics = [
+        case['mnemonic'].split() if isinstance(case['mnemonic'], str) else case['mnemonic'] for case in data['vector']
+    ]
+
+    for count, (mnemonic, words) in enumerate(zip(mnemonics, last_words_batch(m[:-1] for m in mnemonics))):
+        LOGGER.info(f"START TEST {count}")
+
+        seed_size = len(mnemonic) * WORD_SIZE
+        checksum_size = seed_size - seed_size // ENTROPY_SIZE_DIV * ENTROPY_SIZE_DIV
+        assert len(words) == 2 ** (WORD_SIZE - checksum_size), f"invalid last words count{sep}" \
+                                                               f"expected: {2 ** (WORD_SIZE - checksum_size)}{sep}" \
+                                                               f"obtained: {len(words)}"
+        assert mnemonic[-1] in words, f"last word not found{sep}" \
+                                      f"expected: '{mnemonic[-1]}'{sep}" \
+                                      f"obtained: {', '.join(words)}"
+        assert words == last_words(mnemonic), f"invalid last words for a complete mnemonic{sep}" \
+                                              f"expected: {', '.join(words)}{sep}" \
+                                              f"obtained: {', '.join(last_words(mnemonic))}"
+
+        # every listed word must make a valid mnemonic
+        for word in words:
+            Seed.from_mnemonic(mnemonic[:-1] + [word])
+
+        LOGGER.info(f"STOP  TEST {count}")
+
+    LOGGER.info("START TEST LANGUAGE")
+    for case in data['language']:
+        mnemonic = case['mnemonic'].split()
+        for language in (None, case['language']):
+            words = last_words(mnemonic[:-1], language)
+            assert Seed.from_mnemonic(mnemonic).mnemonic[-1] in words, f"{case['language']} last word not found{sep}" \
+                                                                       f"expected: '{mnemonic[-1]}'{sep}" \
+                                                                       f"obtained: {', '.join(words)}"
+    LOGGER.info("STOP  TEST LANGUAGE")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_completion()
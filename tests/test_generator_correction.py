@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import unicodedata
+
+from generator import correction
+from generator.wordlist import wordlist
+
+LOGGER = logging.getLogger(__name__)
+
+
+def __mistype(mnemonic: list[str], positions: tuple[int]) -> list[str]:
+    result = list(mnemonic)
+    for position in positions:
+        word = result[position]
+        result[position] = word[:1] + word[2:] if len(word) > 3 else word + "x"
+
+    return result
+
+
+def test_correction():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: CANDIDATES")
+    for word in ("abandn", "lettr", "cge", "zzzz"):
+        for distance in range(correction.DISTANCE_MAX + 1):
+            expected = tuple(sorted(
+                (correction.levenshtein(word, w), w) for w in wordlist if correction.levenshtein(word, w) <= distance
+            ))
+            obtained = correction.candidates(word, distance)
+            assert obtained == expected, f"invalid candidates for '{word}'{sep}" \
+                                         f"expected: {expected}{sep}" \
+                                         f"obtained: {obtained}"
+    LOGGER.info("STOP  TEST 1: CANDIDATES")
+
+    LOGGER.info("START TEST 2: CORRECTION")
+    for count, case in enumerate(data['vector']):
+        mnemonic = case['mnemonic']
+        mnemonic = mnemonic.split() if isinstance(mnemonic, str) else mnemonic
+
+        mistyped = __mistype(mnemonic, (1, len(mnemonic) - 2))
+        LOGGER.info(f"mistyped mnemonic {count}: {' '.join(mistyped)}")
+
+        obtained = tuple(' '.join(seed.mnemonic) for seed in correction.correct(mistyped))
+        assert ' '.join(mnemonic) in obtained, f"mnemonic not found{sep}" \
+                                               f"expected: '{' '.join(mnemonic)}'{sep}" \
+                                               f"obtained: {obtained}"
+    LOGGER.info("STOP  TEST 2: CORRECTION")
+
+    LOGGER.info("START TEST 3: LANGUAGE")
+    for case in data['language']:
+        mnemonic = unicodedata.normalize('NFKD', case['mnemonic']).split()
+        mistyped = __mistype(mnemonic, (1,))
+        LOGGER.info(f"mistyped {case['language']} mnemonic: {' '.join(mistyped)}")
+
+        for language in (None, case['language']):
+            seeds = correction.correct(mistyped, 1, None, language)
+            obtained = tuple(unicodedata.normalize('NFKD', ' '.join(seed.mnemonic)) for seed in seeds)
+            assert ' '.join(mnemonic) in obtained, f"{case['language']} mnemonic not found{sep}" \
+                                                   f"expected: '{' '.join(mnemonic)}'{sep}" \
+                                                   f"obtained: {obtained}"
+    LOGGER.info("STOP  TEST 3: LANGUAGE")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_correction()
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+
+from generator.derivation import derive_rootseeds, BACKEND_ALL
+from generator.seed import Seed
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_derivation():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    seeds = [Seed.from_entropy(case['entropy']) for case in data['vector']]
+    rootseeds_exp = [case['rootseed'] for case in data['vector']]
+
+    for count, backend in enumerate(BACKEND_ALL):
+        LOGGER.info(f"START TEST {count}: {backend.upper()}")
+
+        rootseeds_obt = [rootseed.hex() for rootseed in derive_rootseeds(seeds, "TREZOR", 2, backend)]
+        assert rootseeds_obt == rootseeds_exp, f"invalid rootseeds{sep}" \
+                                               f"expected: {rootseeds_exp}{sep}" \
+                                               f"obtained: {rootseeds_obt}"
+
+        LOGGER.info(f"STOP  TEST {count}: {backend.upper()}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_derivation()
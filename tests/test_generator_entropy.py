@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import gc
+import logging
+import os
+import time
+import weakref
+
+from generator.entropy import BetterEntropy, EntropyPool, BLOCK_SIZE
+from generator.seed import Seed, ENTROPY_SIZE_ALL
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_entropy():
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: GENERATE")
+    for size in ENTROPY_SIZE_ALL:
+        entropies = BetterEntropy.generate_many(20, size)
+        assert all(len(entropy) == size // 8 for entropy in entropies), f"invalid entropy size{sep}" \
+                                                                        f"expected: {size // 8} bytes"
+        assert len(set(entropies)) == len(entropies), "repeated entropy"
+        Seed.from_entropy(entropies[0])
+
+    entropy = BetterEntropy.generate()
+    assert len(entropy) == BLOCK_SIZE, f"invalid entropy size{sep}" \
+                                       f"expected: {BLOCK_SIZE} bytes{sep}" \
+                                       f"obtained: {len(entropy)} bytes"
+    LOGGER.info("STOP  TEST 1: GENERATE")
+
+    LOGGER.info("START TEST 2: POOL")
+    pool = EntropyPool(workers=2, high_water=32, low_water=8)
+
+    # a stopped pool computes the blocks inline
+    blocks = pool.draw(4)
+    assert len(blocks) == 4 and pool.stats['missed'] == 4, f"invalid inline draw{sep}{pool.stats}"
+
+    pool.start()
+    deadline = time.time() + 10
+    while pool.depth < 32 and time.time() < deadline:
+        time.sleep(0.01)
+    assert pool.depth == 32, f"invalid pool depth{sep}" \
+                             f"expected: 32{sep}" \
+                             f"obtained: {pool.depth}"
+
+    blocks += pool.draw(30)
+    stats = pool.stats
+    assert stats['served'] == 30 and stats['refill_rate'] > 0, f"invalid pool stats{sep}{stats}"
+    assert len(set(blocks)) == len(blocks), "repeated block"
+    LOGGER.info("STOP  TEST 2: POOL")
+
+    LOGGER.info("START TEST 3: FORK")
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # the child never serves the blocks of its parent, its pools are emptied on fork
+        depth = pool.depth
+        os.write(write, b"".join(pool.draw(2)) + depth.to_bytes(4, byteorder='big'))
+        os._exit(0)
+
+    os.waitpid(pid, 0)
+    data = os.read(read, 2 * BLOCK_SIZE + 4)
+    os.close(read)
+    os.close(write)
+    pool.stop()
+
+    child_blocks = [data[:BLOCK_SIZE], data[BLOCK_SIZE:2 * BLOCK_SIZE]]
+    assert not set(child_blocks) & set(blocks + pool.draw(pool.depth)), "block served by parent and child"
+    assert int.from_bytes(data[-4:], byteorder='big') == 0, "child pool not empty"
+
+    # the fork hook does not keep the pools alive
+    reference = weakref.ref(pool)
+    del pool
+    gc.collect()
+    assert reference() is None, "stopped pool not collected"
+    LOGGER.info("STOP  TEST 3: FORK")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_entropy()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import logging
+import os
+
+from generator.entropy import Entropy
+from generator.randomness import TESTS, SEQUENCE_SIZE_MIN, SequenceTest, evaluate, run, sample
+
+E_SIZE = 10 ** 6  # bits
+# NIST SP 800-22 reference p-values for the first million bits of e
+E_P_VALUES = {
+    "frequency": 0.953749, "block_frequency": 0.211072, "runs": 0.561917, "longest_run": 0.718945,
+    "serial_1": 0.766182, "serial_2": 0.462921, "approximate_entropy": 0.700073,
+    "cumulative_sums_forward": 0.669887, "cumulative_sums_reverse": 0.724266
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def __e_bits(size: int) -> bytes:
+    # binary splitting of the series of 1/k!
+    def split(a: int, b: int) -> tuple[int, int]:
+        if b - a == 1:
+            return 1, b
+        p1, q1 = split(a, (a + b) // 2)
+        p2, q2 = split((a + b) // 2, b)
+        return p1 * q2 + p2, q1 * q2
+
+    p, q = split(0, size // 14)
+    return (((p + q) << (size - 2)) // q).to_bytes(size // 8, byteorder='big')
+
+
+def test_randomness():
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: NIST REFERENCE")
+    data = __e_bits(E_SIZE)
+    test = SequenceTest()
+    for i in range(0, len(data), 9999):
+        test.update(data[i:i + 9999])
+    obtained = test.p_values()
+    for name, expected in E_P_VALUES.items():
+        assert abs(obtained[name] - expected) < 2e-6, f"invalid {name} p-value{sep}" \
+                                                      f"expected: {expected}{sep}" \
+                                                      f"obtained: {obtained[name]}"
+    LOGGER.info("STOP  TEST 1: NIST REFERENCE")
+
+    LOGGER.info("START TEST 2: BIASED SEQUENCES")
+    biased = {
+        "frequency": bytes(b & 0xfe for b in os.urandom(E_SIZE // 8)),
+        "runs": bytes.fromhex("55") * (E_SIZE // 8)
+    }
+    for name, data in biased.items():
+        obtained = evaluate([data])
+        assert obtained[name] < 0.01, f"biased sequence not detected{sep}" \
+                                      f"expected: {name} p-value < 0.01{sep}" \
+                                      f"obtained: {obtained[name]}"
+    LOGGER.info("STOP  TEST 2: BIASED SEQUENCES")
+
+    LOGGER.info("START TEST 3: REPORT")
+    size = sum(len(chunk) for chunk in sample(Entropy, SEQUENCE_SIZE_MIN)) * 8
+    assert size == SEQUENCE_SIZE_MIN, f"invalid sample size{sep}" \
+                                      f"expected: {SEQUENCE_SIZE_MIN}{sep}" \
+                                      f"obtained: {size}"
+
+    report = run(Entropy, 4, SEQUENCE_SIZE_MIN, workers=2)
+    assert report.sequences == 4 and list(report.proportions) == list(TESTS), f"invalid report{sep}" \
+                                                                             f"{report.to_string()}"
+    LOGGER.info(report.to_string())
+
+    try:
+        evaluate([bytes(1000)])
+        assert False, "short sequence not rejected"
+    except ValueError:
+        pass
+    LOGGER.info("STOP  TEST 3: REPORT")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_randomness()
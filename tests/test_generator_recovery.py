@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import os
+
+from generator.address import Script, to_script, to_address
+from generator.bip32 import ExtendedKey
+from generator.recovery import recover, UNKNOWN_WORD
+from generator.seed import Seed
+
+CHECKPOINT_FILE = "./output/test_generator_recovery.json"
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_recovery():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    for count, case in enumerate(data['vector'][::8]):
+        mnemonic = case['mnemonic'].split() if isinstance(case['mnemonic'], str) else case['mnemonic']
+        seed = Seed.from_mnemonic(mnemonic)
+        rootseed = case['rootseed'][:16]
+        address = to_address(to_script(ExtendedKey.from_string(case['xprvkey']).derive("m/84'/0'/0'/0/7"), Script.P2WPKH))
+
+        illegible = mnemonic[:2] + [UNKNOWN_WORD] + mnemonic[3:]
+        missing = mnemonic[:4] + mnemonic[5:]
+        swapped = mnemonic[:5] + [mnemonic[6], mnemonic[5]] + mnemonic[7:]
+
+        for subcount, (name, kwargs) in enumerate((
+                ("illegible", {'mnemonic': illegible}),
+                ("missing", {'mnemonic': missing, 'word_count': len(mnemonic), 'rootseed': rootseed}),
+                ("swapped", {'mnemonic': swapped, 'swap': True, 'rootseed': rootseed}),
+                ("address", {'mnemonic': illegible, 'address': address})
+        )):
+            LOGGER.info(f"START TEST {count}.{subcount}: {name.upper()}")
+
+            if os.path.isfile(CHECKPOINT_FILE):
+                os.remove(CHECKPOINT_FILE)
+
+            seeds = recover(passphrase="TREZOR", workers=1, checkpoint=CHECKPOINT_FILE, **kwargs)
+            entropies = [s.entropy for s in seeds]
+            assert seed.entropy in entropies, f"mnemonic not found{sep}" \
+                                              f"expected: '{' '.join(mnemonic)}'{sep}" \
+                                              f"obtained: {len(seeds)} other mnemonics"
+
+            if 'rootseed' in kwargs or 'address' in kwargs:
+                assert len(seeds) == 1, f"invalid mnemonics count{sep}" \
+                                        f"expected: 1{sep}" \
+                                        f"obtained: {len(seeds)}"
+
+            # the checkpoint holds no mnemonic, a completed search is resumed from it
+            with open(CHECKPOINT_FILE, 'r') as file:
+                data = file.read()
+            assert not any(entropy.hex() in data for entropy in entropies), "mnemonic found in checkpoint"
+
+            resumed = [s.entropy for s in recover(passphrase="TREZOR", workers=1, checkpoint=CHECKPOINT_FILE, **kwargs)]
+            assert resumed == entropies, "invalid resumed search"
+
+            # a checkpoint can't be resumed with another passphrase: its shards would be confirmed differently
+            try:
+                recover(passphrase="OTHER", workers=1, checkpoint=CHECKPOINT_FILE, **kwargs)
+                assert False, "checkpoint resumed with another passphrase"
+            except ValueError:
+                pass
+            os.remove(CHECKPOINT_FILE)
+
+            LOGGER.info(f"STOP  TEST {count}.{subcount}: {name.upper()}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_recovery()
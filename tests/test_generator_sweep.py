@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import os
+
+from generator.bip32 import ExtendedKey
+from generator.seed import Seed
+from generator.sweep import sweep
+
+CHECKPOINT_FILE = "./output/test_generator_sweep.json"
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_sweep():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    case = data['vector'][1]
+    seed = Seed.from_mnemonic(case['mnemonic'])
+    candidates = [f"candidate {i}" for i in range(300)] + ["TREZOR"]
+
+    if os.path.isfile(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+
+    LOGGER.info("START TEST 1: ROOTSEED")
+    passphrase = sweep(seed, candidates, case['rootseed'], 2)
+    assert passphrase == "TREZOR", f"invalid passphrase{sep}" \
+                                   f"expected: 'TREZOR'{sep}" \
+                                   f"obtained: '{passphrase}'"
+    LOGGER.info("STOP  TEST 1: ROOTSEED")
+
+    LOGGER.info("START TEST 2: CHECKPOINT")
+    passphrase = sweep(seed, candidates[:-1], case['rootseed'][:16], 2, CHECKPOINT_FILE)
+    assert passphrase is None, f"invalid passphrase{sep}" \
+                               f"expected: None{sep}" \
+                               f"obtained: '{passphrase}'"
+
+    # candidates already tested are skipped on resume
+    passphrase = sweep(seed, ["skipped"] * 300 + ["TREZOR"], case['rootseed'][:16], 2, CHECKPOINT_FILE)
+    assert passphrase == "TREZOR", f"invalid passphrase{sep}" \
+                                   f"expected: 'TREZOR'{sep}" \
+                                   f"obtained: '{passphrase}'"
+    os.remove(CHECKPOINT_FILE)
+
+    # a checkpoint is bound to its mode: a fingerprint can't resume a rootseed prefix of the same bytes
+    sweep(seed, candidates[:10], case['rootseed'][:8], 2, CHECKPOINT_FILE)
+    try:
+        sweep(seed, candidates, case['rootseed'][:8], 2, CHECKPOINT_FILE, fingerprint=True)
+        assert False, "rootseed checkpoint resumed as fingerprint"
+    except ValueError:
+        pass
+    os.remove(CHECKPOINT_FILE)
+    LOGGER.info("STOP  TEST 2: CHECKPOINT")
+
+    LOGGER.info("START TEST 3: FINGERPRINT")
+    fingerprint = ExtendedKey.from_string(case['xprvkey']).fingerprint
+    passphrase = sweep(seed, candidates[-20:], fingerprint.hex(), 2, fingerprint=True)
+    assert passphrase == "TREZOR", f"invalid passphrase{sep}" \
+                                   f"expected: 'TREZOR'{sep}" \
+                                   f"obtained: '{passphrase}'"
+    LOGGER.info("STOP  TEST 3: FINGERPRINT")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_sweep()
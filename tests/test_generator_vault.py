@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import os
+import pickle
+
+from generator.seed import Seed, SeedArray
+from generator.vault import SeedVault
+
+VAULT_FILE = "./output/test_generator_vault.svlt"
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_vault():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    seeds = [Seed.from_mnemonic(case['mnemonic']) for case in data['vector']]
+    seeds = [seed for seed in seeds if len(seed.entropy) == 32]
+
+    if os.path.isfile(VAULT_FILE):
+        os.remove(VAULT_FILE)
+
+    LOGGER.info("START TEST 1: APPEND")
+    with SeedVault.create(VAULT_FILE, 256, 4) as vault:
+        vault.append(seeds[:2], (b"\x00\x01", b"\x00\x02"))
+        vault.append(SeedArray.from_entropies([seed.entropy for seed in seeds[2:]]))
+        vault.append(seeds[0], b"last")
+        try:
+            vault.append(Seed.from_entropy(bytes(16)))
+            assert False, "invalid entropy size accepted"
+        except ValueError:
+            pass
+    LOGGER.info("STOP  TEST 1: APPEND")
+
+    LOGGER.info("START TEST 2: READ")
+    with SeedVault(VAULT_FILE) as vault:
+        assert len(vault) == len(seeds) + 1, f"invalid vault size{sep}" \
+                                             f"expected: {len(seeds) + 1}{sep}" \
+                                             f"obtained: {len(vault)}"
+
+        for i, seed in enumerate(seeds + seeds[:1]):
+            assert vault[i] == seed, f"invalid seed {i}{sep}" \
+                                     f"expected: {seed.entropy.hex()}{sep}" \
+                                     f"obtained: {vault[i].entropy.hex()}"
+
+        mnemonics = vault[1:-1].mnemonics()
+        expected = [seed.mnemonic for seed in seeds[1:]]
+        assert mnemonics == expected, f"invalid mnemonics{sep}" \
+                                      f"expected: {expected}{sep}" \
+                                      f"obtained: {mnemonics}"
+
+        # slices match the ones of a list, in both directions
+        stored = [seed.entropy for seed in seeds + seeds[:1]]
+        for index in (slice(None, None, -1), slice(3, 0, -1), slice(-1, None, -2), slice(None, None, 2),
+                      slice(1, None, 3), slice(3, 1), slice(1, 3, -1)):
+            obtained = [seed.entropy for seed in vault[index]]
+            assert obtained == stored[index], f"invalid slice {index}{sep}" \
+                                              f"expected: {len(stored[index])} seeds{sep}" \
+                                              f"obtained: {len(obtained)} seeds"
+
+        metadata = [vault.metadata(i) for i in (0, 1, 2, -1)]
+        expected = [b"\x00\x01\x00\x00", b"\x00\x02\x00\x00", bytes(4), b"last"]
+        assert metadata == expected, f"invalid metadata{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {metadata}"
+    LOGGER.info("STOP  TEST 2: READ")
+
+    LOGGER.info("START TEST 3: INTERRUPTED APPEND")
+    with open(VAULT_FILE, 'ab') as file:
+        file.write(bytes(20))  # a partial record, not counted in the header
+
+    with SeedVault(VAULT_FILE, True) as vault:
+        vault.append(seeds[1])
+        assert vault[-1] == seeds[1] and len(vault) == len(seeds) + 2, "invalid append after a partial record"
+    os.remove(VAULT_FILE)
+    LOGGER.info("STOP  TEST 3: INTERRUPTED APPEND")
+
+    LOGGER.info("START TEST 4: PICKLE")
+    seed = Seed.from_mnemonic(data['vector'][0]['mnemonic'])
+    seed.passphrase = "TREZOR"
+    rootseed = seed.rootseed
+    restored = pickle.loads(pickle.dumps(seed))
+    assert restored == seed and restored.rootseed == rootseed, f"invalid pickled seed{sep}" \
+                                                               f"expected: {rootseed.hex()}{sep}" \
+                                                               f"obtained: {restored.rootseed.hex()}"
+    LOGGER.info("STOP  TEST 4: PICKLE")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_vault()
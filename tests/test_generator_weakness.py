@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import os
+
+import numpy as np
+
+from generator.seed import SeedArray
+from generator.weakness import Weakness, KnownSeedIndex, KNOWN_PATH, check, check_batch, check_stream, \
+    get_known_index
+
+INDEX_FILE = "./output/test_generator_weakness.idx"
+
+WEAK_VECTORS = {
+    "00000000000000000000000000000001": Weakness.HAMMING_WEIGHT | Weakness.REPEATED_WORDS | Weakness.BYTE_DIVERSITY,
+    "000102030405060708090a0b0c0d0e0f": Weakness.SHORT_PERIOD,
+    "55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa55aa": Weakness.SHORT_PERIOD | Weakness.BYTE_DIVERSITY,
+    "01020304010203040102030401020304":
+        Weakness.HAMMING_WEIGHT | Weakness.SHORT_PERIOD | Weakness.BYTE_DIVERSITY,
+    "3be599a1d275c9fd813c1c94522e0bf38aa479f257c43ce116222516f57f4c37": Weakness.NONE
+}
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_weakness():
+    with open('test_generator.json', 'r') as file:
+        data = json.load(file)
+
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: KNOWN SEEDS")
+    # the shipped index is up to date with its source list
+    with open(os.path.join(KNOWN_PATH, "known.txt"), 'r') as file:
+        index = KnownSeedIndex.build(file, INDEX_FILE)
+    assert len(index) == len(get_known_index()), f"invalid known seed index{sep}" \
+                                                 f"expected: {len(index)} entries{sep}" \
+                                                 f"obtained: {len(get_known_index())} entries"
+
+    for case in data['vector'] + data['language']:
+        obtained = check(case['mnemonic'])
+        assert Weakness.KNOWN in obtained, f"known seed not detected{sep}{case['mnemonic']}"
+
+    # an empty custom index is used as is, not replaced by the shipped one
+    index = KnownSeedIndex.build([], INDEX_FILE)
+    mnemonics = [case['mnemonic'] for case in data['vector']]
+    obtained = [check(mnemonic, index) for mnemonic in mnemonics] + \
+               [Weakness(int(flags)) for flags in check_batch(mnemonics, index)]
+    assert not any(Weakness.KNOWN in weakness for weakness in obtained), \
+        f"known seed detected with an empty index{sep}" \
+        f"obtained: {', '.join(weakness.to_string() for weakness in obtained)}"
+    os.remove(INDEX_FILE)
+    LOGGER.info("STOP  TEST 1: KNOWN SEEDS")
+
+    LOGGER.info("START TEST 2: HEURISTICS")
+    entropies = [bytes.fromhex(entropy) for entropy in WEAK_VECTORS]
+    batch = [Weakness(int(flags)) for flags in check_batch(entropies)]
+    stream = [weakness for _, weakness in check_stream(entropies, batch_size=2)]
+    for entropy, expected, single, batched, streamed in zip(WEAK_VECTORS, WEAK_VECTORS.values(),
+                                                            (check(e) for e in entropies), batch, stream):
+        assert single == batched == streamed == expected, f"invalid weakness {entropy}{sep}" \
+                                                          f"expected: {expected.to_string()}{sep}" \
+                                                          f"obtained: {single.to_string()}, " \
+                                                          f"{batched.to_string()}, {streamed.to_string()}"
+    LOGGER.info("STOP  TEST 2: HEURISTICS")
+
+    LOGGER.info("START TEST 3: RANDOM SEEDS")
+    for size in (16, 32):
+        seeds = SeedArray.from_entropies(np.frombuffer(os.urandom(size * 10000), dtype=np.uint8).reshape(-1, size))
+        flagged = np.count_nonzero(check_batch(seeds))
+        assert flagged == 0, f"random seeds flagged as weak{sep}" \
+                             f"expected: 0{sep}" \
+                             f"obtained: {flagged}"
+    LOGGER.info("STOP  TEST 3: RANDOM SEEDS")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_weakness()
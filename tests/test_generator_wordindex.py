@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import logging
+
+from generator.wordindex import wordindex, PREFIX_SIZE
+from generator.wordlist import wordlist
+
+LOGGER = logging.getLogger(__name__)
+
+
+def test_wordindex():
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: INDEX")
+    for wid, word in enumerate(wordlist):
+        assert wordindex.index(word) == wid, f"invalid word id{sep}" \
+                                             f"expected: {wid}{sep}" \
+                                             f"obtained: {wordindex.index(word)}"
+        assert wordindex[wid] == word, f"invalid word{sep}" \
+                                       f"expected: '{word}'{sep}" \
+                                       f"obtained: '{wordindex[wid]}'"
+    LOGGER.info("STOP  TEST 1: INDEX")
+
+    LOGGER.info("START TEST 2: PREFIX")
+    for wid, word in enumerate(wordlist):
+        prefix = word[:PREFIX_SIZE]
+        assert wordindex.resolve(prefix) == wid, f"invalid prefix resolution{sep}" \
+                                                 f"expected: '{word}'{sep}" \
+                                                 f"obtained: '{wordindex[wordindex.resolve(prefix)]}'"
+    LOGGER.info("STOP  TEST 2: PREFIX")
+
+    LOGGER.info("START TEST 3: COMPLETION")
+    for prefix in ("ab", "zo", "xyz", ""):
+        expected = tuple(word for word in wordlist if word.startswith(prefix))
+        obtained = wordindex.complete(prefix)
+        assert obtained == expected, f"invalid completion for '{prefix}'{sep}" \
+                                     f"expected: {', '.join(expected)}{sep}" \
+                                     f"obtained: {', '.join(obtained)}"
+    LOGGER.info("STOP  TEST 3: COMPLETION")
+
+    LOGGER.info("START TEST 4: ERROR")
+    for word, error in (("ab", "'ab' is ambiguous"), ("pippo", "'pippo' is not in wordlist")):
+        try:
+            wordindex.resolve(word)
+            assert False, "failed to generate error"
+        except ValueError as ve:
+            assert str(ve).split(sep)[0] == error, f"invalid error{sep}" \
+                                                   f"expected: '{error}'{sep}" \
+                                                   f"obtained: '{str(ve).split(sep)[0]}'"
+    LOGGER.info("STOP  TEST 4: ERROR")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_wordindex()
@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from utils import batch
+from utils.batch import Operation, Task
+from utils.encryption import Algorithm, Direction, Kdf
+
+INPUT_PATH = "./input/"
+FILE_NAME = "test_image.jpg"
+
+PASSWORD = "password"
+WORKERS = 2
+
+LOGGER = logging.getLogger(__name__)
+
+
+def __write_manifest(filename: str, records: list[dict]):
+    with open(filename, 'w', encoding='utf-8') as file:
+        if filename.endswith(".jsonl"):
+            file.writelines(json.dumps(record) + "\n" for record in records)
+        else:
+            fields = list(dict.fromkeys(key for record in records for key in record))
+            file.write(",".join(fields) + "\n")
+            file.writelines(",".join(str(record.get(key, "")) for key in fields) + "\n" for record in records)
+
+
+def test_batch():
+    # images, messages and manifests are written to a temporary directory, removed afterwards
+    with tempfile.TemporaryDirectory() as output_path:
+        __test_batch(output_path + "/")
+
+
+def __test_batch(output_path: str):
+    sep = "\n\t"
+    input_file = os.path.abspath(INPUT_PATH + FILE_NAME)  # manifest paths are relative to the manifest
+
+    # a grayscale and a palette image besides the rgb input image
+    pixels = np.random.default_rng(0).integers(0, 256, (120, 160), dtype=np.uint8)
+    Image.fromarray(pixels, mode="L").save(output_path + "batch_l.png")
+    Image.fromarray(pixels, mode="L").convert("P").save(output_path + "batch_p.png")
+    with open(output_path + "batch_message.bin", 'wb') as file:
+        file.write(bytes(range(256)))
+
+    records = [
+        {"input": input_file, "output": "batch_0.png", "message": "hello",
+         "algorithm": "aead", "direction": "keyed"},
+        {"input": input_file, "output": "batch_1.png", "message_file": "batch_message.bin",
+         "algorithm": "2", "direction": "vertical", "channels": "RGB", "bits": "2"},
+        {"input": "batch_l.png", "output": "batch_2.png", "message": "grey", "algorithm": "negative"},
+        {"input": "batch_p.png", "output": "batch_3.png", "message": "palette", "direction": "3"},
+    ]
+
+    LOGGER.info("START TEST 1: MANIFEST")
+    for extension in ("csv", "jsonl"):
+        manifest = output_path + "batch_manifest." + extension
+        __write_manifest(manifest, records)
+        tasks = batch.read_manifest(manifest)
+        obtained = [(t.input, t.algorithm, t.direction, t.plan) for t in tasks]
+        expected = [
+            (input_file, Algorithm.AEAD, Direction.KEYED, (None, 1)),
+            (input_file, Algorithm.REVERSAL, Direction.VERTICAL, ("RGB", 2)),
+            (output_path + "batch_l.png", Algorithm.NEGATIVE, Direction.HORIZONTAL, (None, 1)),
+            (output_path + "batch_p.png", Algorithm.NONE, Direction.REVERSE_VERTICAL, (None, 1)),
+        ]
+        assert obtained == expected, f"invalid {extension} manifest{sep}" \
+                                     f"expected: {expected}{sep}" \
+                                     f"obtained: {obtained}"
+        assert tasks[1].message == bytes(range(256)), f"invalid message file in {extension} manifest"
+        assert [t.needs_password for t in tasks] == [True, False, False, False], \
+            f"invalid password requirements in {extension} manifest"
+
+    for record in ({"output": "x.png"}, {"input": "x.png", "color": "red"}, {"input": "x.png", "algorithm": "rot13"},
+                   {"input": "x.png", "direction": "9"}, {"input": "x.png", "bits": "one"}):
+        try:
+            Task.from_record(0, record)
+            assert False, f"invalid manifest record accepted: {record}"
+        except ValueError:
+            pass
+
+    # an unquoted comma adds a column to the row
+    manifest = output_path + "batch_manifest.csv"
+    with open(manifest, 'w', encoding='utf-8') as file:
+        file.write("input,output,message\nbatch_l.png,batch_x.png,hello, world\n")
+    try:
+        batch.read_manifest(manifest)
+        assert False, "csv row longer than the header accepted"
+    except ValueError:
+        pass
+    LOGGER.info("STOP  TEST 1: MANIFEST")
+
+    LOGGER.info("START TEST 2: HIDE AND VERIFY")
+    results = sorted(batch.run(tasks, Operation.HIDE, PASSWORD, WORKERS, True, Kdf.PBKDF2), key=lambda r: r['index'])
+    obtained = [result['status'] for result in results]
+    assert obtained == ["ok"] * len(tasks), f"invalid hide results{sep}" \
+                                            f"expected: {['ok'] * len(tasks)}{sep}" \
+                                            f"obtained: {results}"
+    for task in tasks:
+        with Image.open(task.input) as source, Image.open(task.output) as target:
+            assert (source.mode, source.size) == (target.mode, target.size), \
+                f"invalid output image {task.output}{sep}" \
+                f"expected: {source.mode} {source.size}{sep}" \
+                f"obtained: {target.mode} {target.size}"
+    LOGGER.info("STOP  TEST 2: HIDE AND VERIFY")
+
+    LOGGER.info("START TEST 3: SHOW")
+    shown = [
+        Task(t.index, t.output, output_path + f"batch_{t.index}.bin", t.message, t.algorithm, t.direction)
+        for t in tasks
+    ]
+    results = sorted(batch.run(shown, Operation.SHOW, PASSWORD, WORKERS), key=lambda r: r['index'])
+    assert [result['status'] for result in results] == ["ok"] * len(tasks), f"invalid show results{sep}" \
+                                                                           f"obtained: {results}"
+    for task in shown:
+        with open(task.output, 'rb') as file:
+            obtained = file.read()
+        assert obtained == task.message, f"invalid shown message {task.output}{sep}" \
+                                         f"expected: {task.message[:16]}{sep}" \
+                                         f"obtained: {obtained[:16]}"
+
+    # a wrong expected message is a mismatch
+    task = Task(0, shown[2].input, None, b"gray", Algorithm.NEGATIVE)
+    results = list(batch.run([task], Operation.SHOW, workers=1))
+    assert results[0]['status'] == "mismatch", f"invalid show result{sep}" \
+                                               f"expected: mismatch{sep}" \
+                                               f"obtained: {results[0]}"
+    LOGGER.info("STOP  TEST 3: SHOW")
+
+    LOGGER.info("START TEST 4: FAILURES")
+    # failed images are reported, the batch goes on
+    tasks = [
+        Task(0, output_path + "batch_missing.png", output_path + "batch_x.png", b"lost"),
+        Task(1, output_path + "batch_l.png", output_path + "batch_x.png", bytes(120 * 160)),
+        Task(2, output_path + "batch_l.png", None, b"no output"),
+        Task(3, output_path + "batch_l.png", output_path + "batch_x.png", b"no password", Algorithm.PASSWORD),
+        Task(4, output_path + "batch_l.png", output_path + "batch_4.png", b"fine"),
+    ]
+    results = sorted(batch.run(tasks, workers=WORKERS), key=lambda r: r['index'])
+    obtained = [result['status'] for result in results]
+    expected = ["failed"] * 4 + ["ok"]
+    assert obtained == expected, f"invalid failure results{sep}" \
+                                 f"expected: {expected}{sep}" \
+                                 f"obtained: {results}"
+    assert all(result['error'] for result in results[:4]), f"missing errors{sep}obtained: {results}"
+
+    # unsupported modes are rejected before sharing the pixels
+    tasks = []
+    for index, mode in enumerate(("1", "I", "I;16", "F")):
+        mode_file = output_path + f"batch_mode_{index}." + ("tif" if mode == "F" else "png")
+        Image.new(mode, (16, 16)).save(mode_file)
+        tasks.append(Task(index, mode_file, output_path + "batch_x.png", b"mode"))
+    results = sorted(batch.run(tasks, workers=WORKERS), key=lambda r: r['index'])
+    for mode, result in zip(("1", "I", "I;16", "F"), results):
+        assert result['status'] == "failed" and "invalid image mode" in result['error'], \
+            f"invalid result for mode {mode}{sep}" \
+            f"expected: invalid image mode{sep}" \
+            f"obtained: {result}"
+    LOGGER.info("STOP  TEST 4: FAILURES")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_batch()
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import base64
+import hashlib
+import io
+import logging
+import os
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+
+from utils import encryption
+from utils.encryption import Algorithm, Kdf, KeyDerivation
+
+SIZES = (0, 1, 2, 31, 32, 1000, 65537)  # bytes
+CHUNK_SIZE = 4099  # bytes, not aligned to the message sizes
+
+PASSWORD = "password"
+KDF_COSTS = {Kdf.SCRYPT: 2 ** 10, Kdf.PBKDF2: 1000}  # cheap parameters, the defaults are tested by steganography
+
+LOGGER = logging.getLogger(__name__)
+
+
+def __reference(message: bytes, algorithm: Algorithm) -> bytes:
+    # the original big integer implementations
+    size = len(message) * 8
+    value = int.from_bytes(message, byteorder='big')
+    if algorithm == Algorithm.NEGATIVE:
+        return ((1 << size) - value - 1).to_bytes(size // 8, byteorder='big')
+    return int(bin(value)[2:].zfill(size)[::-1], 2).to_bytes(size // 8, byteorder='big') if size else b""
+
+
+def test_encryption():
+    sep = "\n\t"
+
+    LOGGER.info("START TEST 1: BYTE TABLES")
+    for size in SIZES:
+        message = os.urandom(size)
+        for algorithm in (Algorithm.NEGATIVE, Algorithm.REVERSAL):
+            expected = __reference(message, algorithm)
+            for buffer in (message, bytearray(message), memoryview(message)):
+                obtained = encryption.encrypt(buffer, algorithm)
+                assert obtained == expected, f"invalid {algorithm.to_string()} cipher of {size} bytes{sep}" \
+                                             f"expected: {expected[:16].hex()}{sep}" \
+                                             f"obtained: {obtained[:16].hex()}"
+                assert encryption.decrypt(obtained, algorithm) == message, \
+                    f"invalid {algorithm.to_string()} decipher of {size} bytes"
+    LOGGER.info("STOP  TEST 1: BYTE TABLES")
+
+    LOGGER.info("START TEST 2: STREAMING")
+    message = os.urandom(SIZES[-1])
+    for algorithm in (Algorithm.NONE, Algorithm.NEGATIVE, Algorithm.REVERSAL):
+        expected = encryption.encrypt(message, algorithm)
+
+        offsets = range(0, len(message), CHUNK_SIZE)
+        if algorithm == Algorithm.REVERSAL:
+            offsets = reversed(offsets)
+        chunks = (memoryview(message)[offset:offset + CHUNK_SIZE] for offset in offsets)
+        obtained = b"".join(encryption.cipher_chunks(chunks, algorithm))
+        assert obtained == expected, f"invalid {algorithm.to_string()} chunked cipher"
+
+        target = io.BytesIO()
+        written = encryption.cipher_file(io.BytesIO(message), target, algorithm, CHUNK_SIZE)
+        assert written == len(message) and target.getvalue() == expected, \
+            f"invalid {algorithm.to_string()} file cipher{sep}" \
+            f"expected: {len(message)} bytes{sep}" \
+            f"obtained: {written} bytes"
+
+        source = io.BytesIO(target.getvalue())
+        target = io.BytesIO()
+        encryption.cipher_file(source, target, algorithm, CHUNK_SIZE)
+        assert target.getvalue() == message, f"invalid {algorithm.to_string()} file decipher"
+
+    try:
+        list(encryption.cipher_chunks([message], Algorithm.PASSWORD))
+        assert False, "password algorithm streamed"
+    except ValueError:
+        pass
+    LOGGER.info("STOP  TEST 2: STREAMING")
+
+    LOGGER.info("START TEST 3: KEY DERIVATION")
+    message = b"legal winner thank year wave sausage worth useful legal winner thank yellow"
+    legacy = Fernet(base64.urlsafe_b64encode(hashlib.sha256(bytes(PASSWORD, 'utf-8')).digest())).encrypt(message)
+    assert encryption.decrypt(legacy, Algorithm.PASSWORD, PASSWORD) == message, "invalid legacy decipher"
+
+    for kdf, cost in KDF_COSTS.items():
+        derivation = KeyDerivation(kdf, cost)
+        ciphers = [encryption.encrypt(message, Algorithm.PASSWORD, PASSWORD, derivation) for _ in range(3)]
+        parsed = KeyDerivation.from_header(ciphers[0])
+        assert (parsed.kdf, parsed.cost, parsed.salt) == (kdf, cost, derivation.salt), \
+            f"invalid {kdf.to_string()} header{sep}" \
+            f"expected: {kdf.to_string()}, {cost}, {derivation.salt.hex()}{sep}" \
+            f"obtained: {parsed.kdf.to_string()}, {parsed.cost}, {parsed.salt.hex()}"
+
+        # the same derivation pays the key once for the whole batch
+        misses = encryption.KEY_CACHE.misses
+        for cipher in ciphers:
+            assert encryption.decrypt(cipher, Algorithm.PASSWORD, PASSWORD) == message, \
+                f"invalid {kdf.to_string()} decipher"
+        assert encryption.KEY_CACHE.misses == misses, f"{kdf.to_string()} key derived again"
+
+        try:
+            encryption.decrypt(ciphers[0], Algorithm.PASSWORD, PASSWORD + "!")
+            assert False, f"{kdf.to_string()} cipher deciphered with a wrong password"
+        except InvalidToken:
+            pass
+
+    for kdf, cost in ((Kdf.SHA256, 1), (Kdf.SCRYPT, 1000), (Kdf.PBKDF2, 0)):
+        try:
+            KeyDerivation(kdf, cost) if cost else KeyDerivation(kdf, salt=b"short")
+            assert False, f"invalid {kdf.to_string()} key derivation accepted"
+        except ValueError:
+            pass
+
+    # parameters read from a crafted ciphertext are bounded before deriving the key
+    salt = os.urandom(encryption.KDF_SALT_SIZE)
+    for kdf, block_size, parallelism, cost in ((Kdf.SCRYPT, 32, 16, 2 ** 20), (Kdf.SCRYPT, 8, 1, 2 ** 18),
+                                               (Kdf.SCRYPT, 16, 1, 2 ** 15), (Kdf.PBKDF2, 0, 0, 10 ** 8)):
+        crafted = {
+            Algorithm.PASSWORD: encryption.KDF_HEADER.pack(
+                encryption.KDF_MAGIC, encryption.KDF_VERSION, kdf.value, block_size, parallelism, cost, salt
+            ) + legacy,
+            Algorithm.AEAD: encryption.AEAD_HEADER.pack(
+                encryption.AEAD_VERSION, kdf.value, block_size, parallelism, cost, salt, bytes(12)
+            ) + bytes(len(message) + 16)
+        }
+        for algorithm, cipher in crafted.items():
+            try:
+                encryption.decrypt(cipher, algorithm, PASSWORD)
+                assert False, f"crafted {kdf.to_string()} {algorithm.to_string()} parameters accepted: " \
+                              f"cost {cost}, block size {block_size}, parallelism {parallelism}"
+            except ValueError:
+                pass
+    LOGGER.info("STOP  TEST 3: KEY DERIVATION")
+
+    LOGGER.info("START TEST 4: AEAD")
+    for kdf, cost in KDF_COSTS.items():
+        derivation = KeyDerivation(kdf, cost)
+        cipher = encryption.encrypt(message, Algorithm.AEAD, PASSWORD, derivation)
+        password = encryption.encrypt(message, Algorithm.PASSWORD, PASSWORD, derivation)
+        expected = len(message) + encryption.AEAD_HEADER.size + 16
+        assert len(cipher) == expected < len(password), f"invalid {kdf.to_string()} aead size{sep}" \
+                                                         f"expected: {expected} bytes{sep}" \
+                                                         f"obtained: {len(cipher)} bytes"
+        obtained = encryption.decrypt(memoryview(cipher), Algorithm.AEAD, PASSWORD)
+        assert obtained == message, f"invalid {kdf.to_string()} aead decipher{sep}" \
+                                    f"expected: {message}{sep}" \
+                                    f"obtained: {obtained}"
+
+        # the header is authenticated with the message
+        for tampered in (cipher[:-1] + bytes([cipher[-1] ^ 1]), cipher[:8] + bytes([cipher[8] ^ 1]) + cipher[9:]):
+            try:
+                encryption.decrypt(tampered, Algorithm.AEAD, PASSWORD)
+                assert False, f"tampered {kdf.to_string()} aead message deciphered"
+            except InvalidTag:
+                pass
+
+    # an unknown key derivation is an invalid header, not an enum error
+    cipher = encryption.AEAD_HEADER.pack(encryption.AEAD_VERSION, 9, 8, 1, 2 ** 10, bytes(16), bytes(12)) + bytes(32)
+    try:
+        encryption.decrypt(cipher, Algorithm.AEAD, PASSWORD)
+        assert False, "unknown aead key derivation accepted"
+    except ValueError as ve:
+        assert str(ve).startswith("invalid aead message"), f"invalid error{sep}" \
+                                                            f"expected: invalid aead message{sep}" \
+                                                            f"obtained: {ve}"
+    LOGGER.info("STOP  TEST 4: AEAD")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s')
+    test_encryption()
@@ -72,7 +72,7 @@ def test_mnemonic_masking():
 
         elif group == "dynamic" and data[group]:
             for count, transformation in enumerate(encryption.Algorithm):
-                if transformation != encryption.Algorithm.PASSWORD:
+                if transformation not in encryption.PASSWORD_ALL:
                     LOGGER.info(f"START TEST CASE {gcount + 1}.{count}: {transformation.to_string().upper()}")
                     try:
                         exp_mnemonic = Seed.from_entropy(BetterEntropy.generate()).mnemonic
@@ -18,7 +18,11 @@
 #   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 import logging
+import math
+import os
+import zlib
 
+import numpy as np
 from PIL import Image
 
 from generator.entropy import BetterEntropy
@@ -30,10 +34,35 @@ INPUT_PATH = "./input/"
 OUTPUT_PATH = "./output/"
 
 PASSWORD = "password"
+LEGACY_SIZES = ((37, 23, "RGB"), (20, 31, "RGBA"))  # width, height, mode
+PLANS = (("L", "L", 1), ("L", "L", 4), ("LA", "LA", 2), ("P", "P", 3), ("RGB", "GB", 2), ("RGBA", "RGBA", 4),
+         ("RGBA", "A", 1))  # mode, channels, depth
 
 LOGGER = logging.getLogger(__name__)
 
 
+def __legacy_encode(message: bytes, image: Image, direction: encryption.Direction) -> Image:
+    # the original per pixel implementation, 3 pixels per byte and a terminator bit in the last one
+    width, height = image.size
+    size = width * height
+    omage = image.copy()
+    for ordinal in range(len(message) * 3):
+        index = \
+            ordinal if direction == encryption.Direction.HORIZONTAL else \
+                ((ordinal * width) + (ordinal // height)) % size if direction == encryption.Direction.VERTICAL else \
+                    (size - ordinal - 1) % size if direction == encryption.Direction.REVERSE_HORIZONTAL else \
+                        (((size - ordinal - 1) * width) + (size - ordinal - 1) // height) % size
+        coordinates = (index % width, index // width)
+        pixel = image.getpixel(coordinates)
+        bits = [(ordinal % 3) * 3 + k for k in range(3)]
+        omage.putpixel(coordinates, tuple(
+            pixel[k] & 0xfe | (message[ordinal // 3] >> (7 - bit)) & 1 if bit < 8 else
+            pixel[k] & 0xfe | int(ordinal // 3 < len(message) - 1)
+            for k, bit in enumerate(bits)
+        ))
+    return omage
+
+
 def test_steganography():
     input_file = INPUT_PATH + FILE_NAME
     input_file_name = FILE_NAME.split(".")[0]
@@ -77,6 +106,145 @@ def test_steganography():
         LOGGER.info(f"TESTS KO: {len(failed):2}/{num_tests:2}")
         if len(failed):
             LOGGER.info(f"TESTS FAILED: {','.join(failed)}")
+        assert not failed, f"failed algorithm and direction tests: {', '.join(failed)}"
+
+    sep = "\n\t"
+    count = len(encryption.Algorithm) + 1
+    LOGGER.info(f"START TEST {count}: LEGACY FORMAT")
+    for width, height, mode in LEGACY_SIZES:
+        image = Image.fromarray(np.frombuffer(os.urandom(width * height * len(mode)), dtype=np.uint8)
+                                .reshape(height, width, -1), mode=mode)
+        for size in (1, width * height // 3):
+            message = os.urandom(size)
+            for direction in [d for d in encryption.Direction if d != encryption.Direction.KEYED]:
+                expected = np.array(__legacy_encode(message, image, direction))
+                obtained = steganography.encode(message, image, direction=direction,
+                                                layout=steganography.Layout.LEGACY)
+                assert np.array_equal(np.array(obtained), expected), \
+                    f"invalid {mode} {direction.to_string()} pixels for {size} bytes"
+                assert steganography.decode(obtained, direction=direction) == message, \
+                    f"invalid {mode} {direction.to_string()} message for {size} bytes"
+
+    # traversal orders are cached up to a number of pixels, the horizontal identity never
+    cache_pixels = steganography.TRAVERSAL_CACHE_PIXELS
+    steganography.TRAVERSAL_CACHE_PIXELS = 3 * 100 * 100
+    try:
+        assert steganography.get_traversal(100, 100, encryption.Direction.HORIZONTAL) is not \
+               steganography.get_traversal(100, 100, encryption.Direction.HORIZONTAL), "horizontal traversal cached"
+        traversal = steganography.get_traversal(100, 100, encryption.Direction.VERTICAL)
+        assert steganography.get_traversal(100, 100, encryption.Direction.VERTICAL) is traversal, \
+            "vertical traversal not cached"
+        for width in (101, 102, 103):
+            steganography.get_traversal(width, 100, encryption.Direction.VERTICAL)
+        assert steganography.get_traversal(100, 100, encryption.Direction.VERTICAL) is not traversal, \
+            "traversal cache not bounded"
+    finally:
+        steganography.TRAVERSAL_CACHE_PIXELS = cache_pixels
+    LOGGER.info(f"STOP  TEST {count}: LEGACY FORMAT")
+
+    LOGGER.info(f"START TEST {count + 1}: FRAMED FORMAT")
+    width, height, mode = LEGACY_SIZES[0]
+    image = Image.fromarray(np.frombuffer(os.urandom(width * height * 3), dtype=np.uint8).reshape(height, width, -1))
+    message = os.urandom(width * height * 3 // 8 - steganography.FRAME_HEADER.size)
+    for direction in encryption.Direction:
+        encoded = steganography.encode(message, image, direction=direction, password=PASSWORD)
+        obtained = steganography.decode(encoded, direction=direction, password=PASSWORD,
+                                        layout=steganography.Layout.FRAMED)
+        assert obtained == message, f"invalid {direction.to_string()} framed message{sep}" \
+                                    f"expected: {message.hex()}{sep}" \
+                                    f"obtained: {obtained.hex()}"
+
+    # a legacy image can't hold a message this long
+    try:
+        steganography.encode(message, image, layout=steganography.Layout.LEGACY)
+        assert False, "message too long for the legacy layout"
+    except ValueError:
+        pass
+
+    encoded = steganography.encode(message, image, encryption.Algorithm.NEGATIVE)
+    corrupted = np.array(encoded)
+    corrupted[-1, -1, 0] ^= 1
+    for case, args in (
+            ("direction", (encoded, encryption.Algorithm.NEGATIVE, encryption.Direction.VERTICAL)),
+            ("algorithm", (encoded, encryption.Algorithm.REVERSAL)),
+            ("crc", (Image.fromarray(corrupted), encryption.Algorithm.NEGATIVE))
+    ):
+        try:
+            steganography.decode(*args, layout=steganography.Layout.FRAMED)
+            assert False, f"invalid {case} not detected"
+        except ValueError:
+            pass
+    LOGGER.info(f"STOP  TEST {count + 1}: FRAMED FORMAT")
+
+    LOGGER.info(f"START TEST {count + 2}: KEYED DIRECTION")
+    for size in (1, 2, 3, 1000, width * height):
+        traversal = steganography.get_keyed_traversal(size, PASSWORD.encode(), np.arange(size))
+        assert len(np.unique(traversal)) == size and traversal.max() < size, f"invalid keyed traversal of {size}"
+        prefix = steganography.get_keyed_traversal(size, PASSWORD.encode(), np.arange(size // 2))
+        assert np.array_equal(prefix, traversal[:size // 2]), f"invalid keyed traversal prefix of {size}"
+
+    message = os.urandom(16)
+    encoded = steganography.encode(message, image, direction=encryption.Direction.KEYED, password=PASSWORD)
+    for password in (PASSWORD + "!", None):
+        try:
+            obtained = steganography.decode(encoded, direction=encryption.Direction.KEYED, password=password,
+                                            layout=steganography.Layout.FRAMED)
+            assert False, f"keyed image decoded with password {password}: {obtained}"
+        except ValueError:
+            pass
+    LOGGER.info(f"STOP  TEST {count + 2}: KEYED DIRECTION")
+
+    LOGGER.info(f"START TEST {count + 3}: CHANNEL PLAN")
+    message = os.urandom(60)
+    for mode, channels, depth in PLANS:
+        plan = steganography.ChannelPlan(channels, depth)
+        image = Image.fromarray(np.frombuffer(os.urandom(width * height * len(mode)), dtype=np.uint8)
+                                .reshape(height, width, -1).squeeze(), mode=mode)
+        if mode == "P":
+            image.putpalette(list(os.urandom(768)))
+        for direction in encryption.Direction:
+            encoded = steganography.encode(message, image, direction=direction, password=PASSWORD, plan=plan)
+            obtained = steganography.decode(encoded, direction=direction, password=PASSWORD)
+            assert obtained == message, f"invalid {mode} {plan.to_string()} {direction.to_string()} message"
+
+        base = steganography.ChannelPlan.for_mode(mode).bits_per_pixel
+        expected = math.ceil(steganography.FRAME_HEADER.size * 8 / base) + math.ceil(len(message) * 8 /
+                                                                                        plan.bits_per_pixel)
+        modified = np.any(np.array(encoded).reshape(width * height, -1) !=
+                          np.array(image).reshape(width * height, -1), axis=1).sum()
+        assert modified <= expected, f"invalid {mode} {plan.to_string()} modified pixels{sep}" \
+                                     f"expected: {expected} or less{sep}" \
+                                     f"obtained: {modified}"
+
+    image = Image.fromarray(np.frombuffer(os.urandom(width * height * 3), dtype=np.uint8).reshape(height, width, -1))
+    for plan, layout in (
+            (steganography.ChannelPlan("A"), steganography.Layout.FRAMED),
+            (steganography.ChannelPlan("RGB", 2), steganography.Layout.LEGACY)
+    ):
+        try:
+            steganography.encode(message, image, plan=plan, layout=layout)
+            assert False, f"invalid {plan.to_string()} plan accepted in {layout.to_string()} layout"
+        except ValueError:
+            pass
+    for channels, depth in (("RGB", 0), ("RGB", 5), ("RR", 1), ("X", 1)):
+        try:
+            steganography.ChannelPlan(channels, depth)
+            assert False, f"invalid channel plan {channels}, {depth} accepted"
+        except ValueError:
+            pass
+
+    # version 1 frames: no channel plan, the payload follows the header in the rgb lsb
+    frame = steganography.FRAME_HEADER_V1.pack(steganography.FRAME_MAGIC, 1, 0, len(message), zlib.crc32(message))
+    bits = np.unpackbits(np.frombuffer(frame + message, dtype=np.uint8))
+    bits = np.append(bits, np.zeros(-len(bits) % 3, dtype=np.uint8)).reshape(-1, 3)
+    pixels = np.array(image).reshape(-1, 3)
+    pixels[:len(bits)] = pixels[:len(bits)] & 0xfe | bits
+    obtained = steganography.decode(Image.fromarray(pixels.reshape(height, width, 3)),
+                                    layout=steganography.Layout.FRAMED)
+    assert obtained == message, f"invalid version 1 frame message{sep}" \
+                                f"expected: {message.hex()}{sep}" \
+                                f"obtained: {obtained.hex()}"
+    LOGGER.info(f"STOP  TEST {count + 3}: CHANNEL PLAN")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,300 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2022 Tullio Loffredo, @tulliolo
+#
+#   It is subject to the license terms in the LICENSE file found in the top-level
+#   directory of this distribution.
+#
+#   No part of this software, including this file, may be copied, modified,
+#   propagated, or distributed except according to the terms contained in the
+#   LICENSE file.
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import concurrent.futures
+import csv
+import enum
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable, Iterator
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+from utils import encryption, steganography
+
+FIELD_ALL = ("input", "output", "message", "message_file", "algorithm", "direction", "channels", "bits")
+PENDING_PER_WORKER = 2  # images loaded in shared memory per worker, bounds the memory in use
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Operation(enum.Enum):
+    HIDE = 0
+    SHOW = 1
+
+    def to_string(self) -> str:
+        return "hide" if self == Operation.HIDE else "show"
+
+
+class Task(object):
+    __slots__ = ('__index', '__input', '__output', '__message', '__algorithm', '__direction', '__plan')
+
+    def __init__(
+            self,
+            index: int,
+            input_file: str,
+            output_file: str | None,
+            message: bytes | None,
+            algorithm: encryption.Algorithm = encryption.Algorithm.NONE,
+            direction: encryption.Direction = encryption.Direction.DEFAULT,
+            plan: tuple[str | None, int] = (None, 1)
+    ):
+        self.__index = index
+        self.__input = input_file
+        self.__output = output_file
+        self.__message = message
+        self.__algorithm = algorithm
+        self.__direction = direction
+        self.__plan = plan
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def input(self) -> str:
+        return self.__input
+
+    @property
+    def output(self) -> str | None:
+        return self.__output
+
+    @property
+    def message(self) -> bytes | None:
+        return self.__message
+
+    @property
+    def algorithm(self) -> encryption.Algorithm:
+        return self.__algorithm
+
+    @property
+    def direction(self) -> encryption.Direction:
+        return self.__direction
+
+    @property
+    def plan(self) -> tuple[str | None, int]:
+        # channels (None for the color channels of the image) and bits per channel
+        return self.__plan
+
+    @property
+    def needs_password(self) -> bool:
+        return self.__algorithm in encryption.PASSWORD_ALL or self.__direction == encryption.Direction.KEYED
+
+    @classmethod
+    def from_record(cls, index: int, record: dict, path: str = ".") -> 'Task':
+        # paths are relative to the manifest, algorithm and direction are names or numbers
+        # csv rows longer than the header, e.g. an unquoted comma, keep the extra columns under None
+        if record.get(None):
+            raise ValueError(f"invalid manifest record {index}\n\t"
+                             "expected: as many columns as the header, quoting the values with commas\n\t"
+                             f"obtained: {len(record[None])} extra columns")
+
+        unknown = set(k for k, v in record.items() if v not in (None, "")) - set(FIELD_ALL)
+        if unknown or not record.get("input"):
+            raise ValueError(f"invalid manifest record {index}\n\t"
+                             f"expected: an input and fields among {', '.join(FIELD_ALL)}\n\t"
+                             f"obtained: {', '.join(sorted(str(k) for k in record))}")
+
+        def resolve(name: str) -> str | None:
+            return os.path.join(path, record[name]) if record.get(name) else None
+
+        message = record.get("message") or None
+        if message is not None:
+            message = bytes(message, 'utf-8')
+        elif record.get("message_file"):
+            with open(resolve("message_file"), 'rb') as file:
+                message = file.read()
+
+        bits = str(record.get("bits") or 1)
+        if not bits.isnumeric():
+            raise ValueError(f"invalid manifest record {index}\n\t"
+                             f"expected: bits 1-{steganography.DEPTH_MAX}\n\t"
+                             f"obtained: {bits}")
+
+        return Task(
+            index, resolve("input"), resolve("output"), message,
+            Task.__parse(encryption.Algorithm, record.get("algorithm") or 0, index),
+            Task.__parse(encryption.Direction, record.get("direction") or 0, index),
+            (record.get("channels") or None, int(bits))
+        )
+
+    @staticmethod
+    def __parse(kind: type[enum.Enum], value: str | int, index: int) -> enum.Enum:
+        value = str(value)
+        try:
+            return kind(int(value)) if value.isnumeric() else kind[value.upper()]
+        except (KeyError, ValueError):
+            raise ValueError(f"invalid manifest record {index}\n\t"
+                             f"expected: {kind.__name__.lower()} among "
+                             f"{', '.join(m.to_string() for m in kind)}\n\t"
+                             f"obtained: {value}") from None
+
+
+def read_manifest(filename: str) -> list[Task]:
+    # a csv file with a header row, or a jsonl file with an object per line
+    path = os.path.dirname(filename)
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        if filename.lower().endswith(".jsonl"):
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            records = list(csv.DictReader(file))
+
+    return [Task.from_record(index, record, path) for index, record in enumerate(records)]
+
+
+def run(
+        tasks: Iterable[Task],
+        operation: Operation = Operation.HIDE,
+        password: str | None = None,
+        workers: int | None = None,
+        verify: bool = False,
+        kdf: encryption.Kdf = encryption.Kdf.DEFAULT
+) -> Iterator[dict]:
+    # images are decoded here and shared with the workers through shared memory, results come in completion order
+    workers = workers or os.cpu_count() or 1
+    salt = encryption.KeyDerivation(kdf).salt  # a single salt: each worker derives the password key once
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = {}
+        try:
+            for task in tasks:
+                if len(pending) >= workers * PENDING_PER_WORKER:
+                    yield from __collect(pending, operation, concurrent.futures.FIRST_COMPLETED)
+
+                try:
+                    buffer, spec = __share(task.input)
+                except Exception as e:
+                    yield __result(task, operation, error=e)
+                    continue
+
+                future = executor.submit(__process, task, operation, spec, password, verify, kdf, salt)
+                pending[future] = (task, buffer)
+
+            yield from __collect(pending, operation, concurrent.futures.ALL_COMPLETED)
+        finally:
+            # buffers of an interrupted batch are released as well
+            for future, (_, buffer) in pending.items():
+                future.cancel()
+                buffer.close()
+                buffer.unlink()
+
+
+def __share(filename: str) -> tuple[shared_memory.SharedMemory, dict]:
+    with Image.open(filename, mode='r') as image:
+        # pixels are shared as bytes: other modes would be cast before failing in the worker
+        if image.mode not in steganography.MODE_ALL:
+            raise ValueError("invalid image mode\n\t"
+                             f"expected: {', '.join(steganography.MODE_ALL)}\n\t"
+                             f"obtained: {image.mode}")
+        pixels = np.asarray(image)
+        spec = {
+            'name': None, 'mode': image.mode, 'shape': pixels.shape,
+            'palette': image.getpalette() if image.mode == "P" else None, 'info': image.info
+        }
+
+    buffer = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+    np.ndarray(pixels.shape, dtype=np.uint8, buffer=buffer.buf)[...] = pixels
+    spec['name'] = buffer.name
+    return buffer, spec
+
+
+def __collect(pending: dict, operation: Operation, return_when: str) -> Iterator[dict]:
+    done, _ = concurrent.futures.wait(pending, return_when=return_when)
+    for future in done:
+        task, buffer = pending.pop(future)
+        buffer.close()
+        buffer.unlink()
+        try:
+            yield future.result()
+        except Exception as e:
+            yield __result(task, operation, error=e)
+
+
+def __result(task: Task, operation: Operation, error: Exception | None = None, **values) -> dict:
+    result = {
+        'index': task.index, 'operation': operation.to_string(), 'input': task.input, 'output': task.output,
+        'status': "failed" if error else "ok", 'error': " | ".join(str(error).split("\n\t")) if error else None
+    }
+    result.update(values)
+    return result
+
+
+def __process(
+        task: Task,
+        operation: Operation,
+        spec: dict,
+        password: str | None,
+        verify: bool,
+        kdf: encryption.Kdf,
+        salt: bytes
+) -> dict:
+    start = time.perf_counter()
+    buffer = shared_memory.SharedMemory(name=spec['name'])
+    try:
+        # pixels are copied out of the shared buffer: fromarray would map it, and it is unmapped on close
+        view = np.ndarray(spec['shape'], dtype=np.uint8, buffer=buffer.buf)
+        image = Image.fromarray(view.copy(), mode=spec['mode'])
+        del view
+        if spec['palette']:
+            image.putpalette(spec['palette'])
+        image.info = spec['info']
+    finally:
+        buffer.close()
+
+    try:
+        pixels = image.size[0] * image.size[1]
+        channels, bits = task.plan
+        if operation == Operation.HIDE:
+            if task.message is None or not task.output:
+                raise ValueError("invalid task\n\t"
+                                 "expected: a message and an output file to hide it")
+
+            plan = steganography.ChannelPlan(channels or steganography.ChannelPlan.for_mode(image.mode).channels, bits)
+            omage = steganography.encode(
+                task.message, image, task.algorithm, task.direction, password,
+                encryption.KeyDerivation(kdf, salt=salt), steganography.Layout.FRAMED, plan
+            )
+            omage.save(task.output)
+
+            status = "ok"
+            if verify:
+                with Image.open(task.output, mode='r') as saved:
+                    message = steganography.decode(
+                        saved, task.algorithm, task.direction, password, steganography.Layout.FRAMED
+                    )
+                status = "ok" if message == task.message else "mismatch"
+            size = len(task.message)
+        else:
+            message = steganography.decode(image, task.algorithm, task.direction, password, steganography.Layout.FRAMED)
+            if not isinstance(message, bytes):
+                raise ValueError("cannot find an hidden message")
+
+            if task.output:
+                with open(task.output, 'wb') as file:
+                    file.write(message)
+            status = "ok" if task.message is None or message == task.message else "mismatch"
+            size = len(message)
+    except Exception as e:
+        return __result(task, operation, error=e, pixels=pixels, seconds=time.perf_counter() - start)
+
+    return __result(task, operation, status=status, pixels=pixels, bytes=size, seconds=time.perf_counter() - start)
@@ -18,12 +18,49 @@
 #   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 import base64
+import collections
 import enum
 import hashlib
 import logging
-from collections.abc import Iterator
+import os
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
 
+import numpy as np
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+
+CHUNK_SIZE = 2 ** 20  # bytes, streaming cipher
+
+# byte lookup tables: a whole message is ciphered one byte at a time
+NEGATIVE_TABLE = np.arange(256, dtype=np.uint8) ^ 0xff
+REVERSAL_TABLE = np.array([int(f"{i:08b}"[::-1], 2) for i in range(256)], dtype=np.uint8)
+
+KDF_MAGIC = b"KDF\x00"  # legacy ciphertexts are fernet tokens, starting with b"gAAAAA"
+KDF_VERSION = 1
+# magic, version, kdf, block size, parallelism, cost, salt
+KDF_HEADER = struct.Struct("<4sBBBBI16s")
+KDF_SALT_SIZE = 16  # bytes
+
+# parameters are read from the ciphertext: maximums near the defaults bound the memory and time a decryption takes
+SCRYPT_COST = 2 ** 15  # ~32MB of memory
+SCRYPT_COST_MAX = 2 ** 17
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_BLOCK_SIZE_MAX = 8
+SCRYPT_PARALLELISM = 1
+SCRYPT_PARALLELISM_MAX = 4
+SCRYPT_MAXMEM = 2 ** 28  # bytes, above the ~128MB of the maximum parameters
+PBKDF2_COST = 600000  # sha256 iterations
+PBKDF2_COST_MAX = 2 * 10 ** 6
+
+AEAD_VERSION = 1
+# version, kdf, block size, parallelism, cost, salt, nonce: authenticated together with the message
+AEAD_HEADER = struct.Struct("<BBBBI16s12s")
+AEAD_NONCE_SIZE = 12  # bytes
+
+KEY_CACHE_SIZE = 64  # derived keys kept in memory
 
 LOGGER = logging.getLogger(__name__)
 
@@ -33,13 +70,18 @@ class Algorithm(enum.Enum):
     NEGATIVE = 1
     REVERSAL = 2
     PASSWORD = 3
+    AEAD = 4
 
     def to_string(self) -> str:
         return \
             "none" if self == Algorithm.NONE else \
                 "negative" if self == Algorithm.NEGATIVE else \
                     "reversal" if self == Algorithm.REVERSAL else \
-                        "password"
+                        "password" if self == Algorithm.PASSWORD else \
+                            "aead"
+
+
+PASSWORD_ALL = (Algorithm.PASSWORD, Algorithm.AEAD)
 
 
 class Direction(enum.Enum):
@@ -47,16 +89,180 @@ class Direction(enum.Enum):
     VERTICAL = 1
     REVERSE_HORIZONTAL = 2
     REVERSE_VERTICAL = 3
+    KEYED = 4  # pseudo-random, from the password
 
     def to_string(self) -> str:
         return \
             "horizontal" if self == Direction.HORIZONTAL else \
                 "vertical" if self == Direction.VERTICAL else \
                     "reverse_horizontal" if self == Direction.REVERSE_HORIZONTAL else \
-                        "reverse_vertical"
+                        "reverse_vertical" if self == Direction.REVERSE_VERTICAL else \
+                            "keyed"
+
+
+class Kdf(enum.Enum):
+    SHA256 = 0  # legacy, unsalted: decryption only
+    SCRYPT = DEFAULT = 1
+    PBKDF2 = 2
+
+    def to_string(self) -> str:
+        return \
+            "sha256" if self == Kdf.SHA256 else \
+                "scrypt" if self == Kdf.SCRYPT else \
+                    "pbkdf2"
+
+
+class KeyDerivation(object):
+    __slots__ = ('__kdf', '__cost', '__block_size', '__parallelism', '__salt')
+
+    def __init__(
+            self,
+            kdf: Kdf = Kdf.DEFAULT,
+            cost: int | None = None,
+            block_size: int = SCRYPT_BLOCK_SIZE,
+            parallelism: int = SCRYPT_PARALLELISM,
+            salt: bytes | None = None
+    ):
+        # a new random salt by default: reuse the same instance to derive a key once for many messages
+        cost = cost or (SCRYPT_COST if kdf == Kdf.SCRYPT else PBKDF2_COST)
+        salt = os.urandom(KDF_SALT_SIZE) if salt is None else salt
+
+        if kdf == Kdf.SCRYPT:
+            valid = 1 < cost <= SCRYPT_COST_MAX and not cost & (cost - 1) and \
+                    0 < block_size <= SCRYPT_BLOCK_SIZE_MAX and 0 < parallelism <= SCRYPT_PARALLELISM_MAX
+        else:
+            valid = kdf == Kdf.PBKDF2 and 0 < cost <= PBKDF2_COST_MAX
+        if not valid or len(salt) != KDF_SALT_SIZE:
+            raise ValueError("invalid key derivation\n\t"
+                             f"expected: scrypt (cost power of 2 up to {SCRYPT_COST_MAX}, "
+                             f"block size up to {SCRYPT_BLOCK_SIZE_MAX}, parallelism up to {SCRYPT_PARALLELISM_MAX}) "
+                             f"or pbkdf2 (cost up to {PBKDF2_COST_MAX}), {KDF_SALT_SIZE} bytes salt\n\t"
+                             f"obtained: {kdf.to_string()} (cost {cost}, block size {block_size}, "
+                             f"parallelism {parallelism}), {len(salt)} bytes salt")
+
+        self.__kdf = kdf
+        self.__cost = cost
+        self.__block_size = block_size if kdf == Kdf.SCRYPT else 0
+        self.__parallelism = parallelism if kdf == Kdf.SCRYPT else 0
+        self.__salt = salt
+
+    @property
+    def kdf(self) -> Kdf:
+        return self.__kdf
+
+    @property
+    def cost(self) -> int:
+        return self.__cost
+
+    @property
+    def block_size(self) -> int:
+        return self.__block_size
+
+    @property
+    def parallelism(self) -> int:
+        return self.__parallelism
+
+    @property
+    def salt(self) -> bytes:
+        return self.__salt
+
+    @property
+    def header(self) -> bytes:
+        return KDF_HEADER.pack(
+            KDF_MAGIC, KDF_VERSION, self.__kdf.value, self.__block_size, self.__parallelism, self.__cost, self.__salt
+        )
+
+    @classmethod
+    def from_header(cls, message: bytes) -> 'KeyDerivation':
+        try:
+            magic, version, kdf, block_size, parallelism, cost, salt = KDF_HEADER.unpack_from(message)
+            if magic != KDF_MAGIC or version != KDF_VERSION or kdf == Kdf.SHA256.value:
+                raise ValueError
+            return KeyDerivation(Kdf(kdf), cost, block_size, parallelism, salt)
+        except (struct.error, ValueError):
+            raise ValueError("invalid key derivation header\n\t"
+                             f"expected: a version {KDF_VERSION} header") from None
+
+    def derive(self, password: str) -> bytes:
+        return derive_key(password, self.__kdf, self.__cost, self.__block_size, self.__parallelism, self.__salt)
+
+
+class KeyCache(object):
+    # derived keys by a keyed digest of the password and the parameters: passwords are never kept
+    __slots__ = ('__size', '__keys', '__secret', '__lock', '__hits', '__misses')
+
+    def __init__(self, size: int = KEY_CACHE_SIZE):
+        self.__size = size
+        self.__keys = collections.OrderedDict()
+        self.__secret = os.urandom(32)
+        self.__lock = threading.Lock()
+        self.__hits = self.__misses = 0
 
+    @property
+    def hits(self) -> int:
+        return self.__hits
 
-def encrypt(message: str | bytes, algorithm: Algorithm, password: str | None = None) -> bytes:
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def digest(self, password: str, *parameters) -> tuple:
+        return (hashlib.blake2b(bytes(password, 'utf-8'), key=self.__secret).digest(),) + parameters
+
+    def get(self, digest: tuple) -> bytes | None:
+        with self.__lock:
+            key = self.__keys.get(digest)
+            if key is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+                self.__keys.move_to_end(digest)
+            return key
+
+    def put(self, digest: tuple, key: bytes):
+        with self.__lock:
+            self.__keys[digest] = key
+            while len(self.__keys) > self.__size:
+                self.__keys.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__keys.clear()
+
+
+KEY_CACHE = KeyCache()
+
+
+def derive_key(password: str, kdf: Kdf, cost: int, block_size: int, parallelism: int, salt: bytes) -> bytes:
+    # the deliberately expensive derivation runs once per (password, parameters, salt)
+    digest = KEY_CACHE.digest(password, kdf, cost, block_size, parallelism, salt)
+    key = KEY_CACHE.get(digest)
+    if key is None:
+        key = __derive_key(password, kdf, cost, block_size, parallelism, salt)
+        KEY_CACHE.put(digest, key)
+    return key
+
+
+def __derive_key(password: str, kdf: Kdf, cost: int, block_size: int, parallelism: int, salt: bytes) -> bytes:
+    if kdf == Kdf.SHA256:
+        key = hashlib.sha256(bytes(password, 'utf-8')).digest()
+    elif kdf == Kdf.SCRYPT:
+        key = hashlib.scrypt(
+            bytes(password, 'utf-8'), salt=salt, n=cost, r=block_size, p=parallelism,
+            maxmem=SCRYPT_MAXMEM, dklen=32
+        )
+    else:
+        key = hashlib.pbkdf2_hmac('sha256', bytes(password, 'utf-8'), salt, cost)
+
+    return base64.urlsafe_b64encode(key)
+
+
+def encrypt(
+        message: str | bytes | bytearray | memoryview,
+        algorithm: Algorithm,
+        password: str | None = None,
+        kdf: KeyDerivation | None = None
+) -> bytes:
     if isinstance(message, str):
         message = bytes(message, 'utf-8')
 
@@ -64,23 +270,37 @@ def encrypt(message: str | bytes, algorithm: Algorithm, password: str | None = N
     LOGGER.debug(f"original message: {str(message)}")
     if algorithm == Algorithm.NONE:
         LOGGER.warning("nothing to do")
+        message = bytes(message)
     elif algorithm == Algorithm.NEGATIVE:
         message = __do_negative(message)
     elif algorithm == Algorithm.REVERSAL:
         message = __do_reversal(message)
+    elif algorithm == Algorithm.AEAD:
+        if not password:
+            raise ValueError("password cannot be empty")
+
+        # raw bytes, no padding nor encoding: only the header and the tag are added to the message
+        kdf = kdf or KeyDerivation()
+        header = AEAD_HEADER.pack(
+            AEAD_VERSION, kdf.kdf.value, kdf.block_size, kdf.parallelism, kdf.cost, kdf.salt,
+            os.urandom(AEAD_NONCE_SIZE)
+        )
+        cipher = ChaCha20Poly1305(base64.urlsafe_b64decode(kdf.derive(password)))
+        message = header + cipher.encrypt(header[-AEAD_NONCE_SIZE:], bytes(message), header)
     else:
         if not password:
             raise ValueError("password cannot be empty")
 
-        key = base64.urlsafe_b64encode(hashlib.sha256(bytes(password, 'utf-8')).digest())
-        f = Fernet(key)
-        message = f.encrypt(message)
+        # the key derivation parameters are stored in clear before the token
+        kdf = kdf or KeyDerivation()
+        f = Fernet(kdf.derive(password))
+        message = kdf.header + f.encrypt(bytes(message))
 
     LOGGER.debug(f"cipher message:   {str(message)}")
     return message
 
 
-def decrypt(message: str | bytes, algorithm: Algorithm, password: str | None = None) -> bytes:
+def decrypt(message: str | bytes | bytearray | memoryview, algorithm: Algorithm, password: str | None = None) -> bytes:
     if isinstance(message, str):
         message = bytes(message, 'utf-8')
 
@@ -88,36 +308,88 @@ def decrypt(message: str | bytes, algorithm: Algorithm, password: str | None = N
     LOGGER.debug(f"cipher message: {str(message)}")
     if algorithm == Algorithm.NONE:
         LOGGER.warning("nothing to do")
+        message = bytes(message)
     elif algorithm == Algorithm.NEGATIVE:
         message = __do_negative(message)
     elif algorithm == Algorithm.REVERSAL:
         message = __do_reversal(message)
+    elif algorithm == Algorithm.AEAD:
+        if not password:
+            raise ValueError("password cannot be empty")
+
+        message = bytes(message)
+        try:
+            version, kdf, block_size, parallelism, cost, salt, nonce = AEAD_HEADER.unpack_from(message)
+        except struct.error:
+            version = None
+        if version != AEAD_VERSION or kdf not in set(k.value for k in Kdf) - {Kdf.SHA256.value}:
+            raise ValueError("invalid aead message\n\t"
+                             f"expected: a version {AEAD_VERSION} header")
+
+        kdf = KeyDerivation(Kdf(kdf), cost, block_size or SCRYPT_BLOCK_SIZE, parallelism or SCRYPT_PARALLELISM, salt)
+        cipher = ChaCha20Poly1305(base64.urlsafe_b64decode(kdf.derive(password)))
+        message = cipher.decrypt(nonce, message[AEAD_HEADER.size:], message[:AEAD_HEADER.size])
     else:
         if not password:
             raise ValueError("password cannot be empty")
 
-        key = base64.urlsafe_b64encode(hashlib.sha256(bytes(password, 'utf-8')).digest())
-        f = Fernet(key)
-        message = f.decrypt(message)
+        message = bytes(message)
+        if message.startswith(KDF_MAGIC):
+            kdf = KeyDerivation.from_header(message)
+            f = Fernet(kdf.derive(password))
+            message = f.decrypt(message[KDF_HEADER.size:])
+        else:
+            f = Fernet(derive_key(password, Kdf.SHA256, 0, 0, 0, b""))
+            message = f.decrypt(message)
 
     LOGGER.debug(f"original message: {str(message)}")
     return message
 
 
-def __do_negative(message: bytes) -> bytes:
-    message_size = len(message) * 8
-    message = int.from_bytes(message, byteorder='big')
-    return ((1 << message_size) - message - 1).to_bytes(message_size // 8, byteorder='big')
+def cipher_chunks(chunks: Iterable[bytes | bytearray | memoryview], algorithm: Algorithm) -> Iterator[bytes]:
+    # the reversal of a whole stream is the concatenation of its reversed chunks, from the last to the first:
+    # with REVERSAL, chunks must be supplied from the end of the stream
+    if algorithm in PASSWORD_ALL:
+        raise ValueError("invalid streaming algorithm\n\t"
+                         f"expected: {', '.join(a.to_string() for a in Algorithm if a not in PASSWORD_ALL)}\n\t"
+                         f"obtained: {algorithm.to_string()}")
+
+    for chunk in chunks:
+        yield \
+            __do_negative(chunk) if algorithm == Algorithm.NEGATIVE else \
+                __do_reversal(chunk) if algorithm == Algorithm.REVERSAL else \
+                    bytes(chunk)
+
+
+def cipher_file(source: BinaryIO, target: BinaryIO, algorithm: Algorithm, chunk_size: int = CHUNK_SIZE) -> int:
+    # NEGATIVE and REVERSAL are involutions: the same call encrypts and decrypts a seekable source
+    return sum(target.write(chunk) for chunk in cipher_chunks(__read_chunks(source, algorithm, chunk_size), algorithm))
+
+
+def __read_chunks(source: BinaryIO, algorithm: Algorithm, chunk_size: int) -> Iterator[memoryview]:
+    buffer = bytearray(chunk_size)
+    if algorithm != Algorithm.REVERSAL:
+        while size := source.readinto(buffer):
+            yield memoryview(buffer)[:size]
+        return
+
+    start = source.tell()
+    position = source.seek(0, 2)
+    while position > start:
+        size = min(chunk_size, position - start)
+        position = source.seek(position - size)
+        source.readinto(memoryview(buffer)[:size])
+        yield memoryview(buffer)[:size]
+
+
+def __do_negative(message: bytes | bytearray | memoryview) -> bytes:
+    # numpy wraps bytearray and memoryview messages without copying them
+    return NEGATIVE_TABLE[np.frombuffer(message, dtype=np.uint8)].tobytes()
 
 
-def __do_reversal(message: bytes) -> bytes:
-    message_size = len(message) * 8
-    return int(
-        bin(
-            int.from_bytes(message, byteorder='big')
-        )[2:].zfill(message_size)[::-1],
-        2
-    ).to_bytes(message_size // 8, byteorder='big')
+def __do_reversal(message: bytes | bytearray | memoryview) -> bytes:
+    # reversing the bits of a message is reversing the byte order and the bits of every byte
+    return REVERSAL_TABLE[np.frombuffer(message, dtype=np.uint8)[::-1]].tobytes()
 
 
 if __name__ == '__main__':
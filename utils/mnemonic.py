@@ -41,10 +41,10 @@ def split(
                          f"expected: {WORD_COUNT_JOIN}"
                          f"obtained: {word_count}")
 
-    if algorithm == encryption.Algorithm.PASSWORD:
+    if algorithm in encryption.PASSWORD_ALL:
         raise ValueError("invalid algorithm\n\t"
-                         f"expected: {', '.join([a.to_string() for a in encryption.Algorithm if a != encryption.Algorithm.PASSWORD])}\n\t "
-                         f"obtained: {encryption.Algorithm.PASSWORD.to_string()}")
+                         f"expected: {', '.join([a.to_string() for a in encryption.Algorithm if a not in encryption.PASSWORD_ALL])}\n\t "
+                         f"obtained: {algorithm.to_string()}")
 
     entropy = encryption.encrypt(Seed.from_mnemonic(mnemonic).entropy, algorithm)
     entropy_size = len(entropy) * 8
@@ -68,10 +68,10 @@ def join(
         mnemonic_2: Iterable[str] | str,
         algorithm: encryption.Algorithm = encryption.Algorithm.NONE
 ) -> Iterable[str]:
-    if algorithm == encryption.Algorithm.PASSWORD:
+    if algorithm in encryption.PASSWORD_ALL:
         raise ValueError("invalid algorithm\n\t"
-                         f"expected: {', '.join([a.to_string() for a in encryption.Algorithm if a != encryption.Algorithm.PASSWORD])}\n\t "
-                         f"obtained: {encryption.Algorithm.PASSWORD.to_string()}")
+                         f"expected: {', '.join([a.to_string() for a in encryption.Algorithm if a not in encryption.PASSWORD_ALL])}\n\t "
+                         f"obtained: {algorithm.to_string()}")
 
     entropy_joint = 0
     entropy_joint_size = 0
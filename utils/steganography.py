@@ -17,54 +17,228 @@
 #   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 #   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 #   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+import base64
+import collections
+import enum
+import hashlib
 import logging
 import math
 import operator
+import struct
+import threading
+import zlib
 
+import numpy as np
 from PIL import Image
 
 from utils import encryption
 
+MODE_ALL = ("L", "LA", "P", "RGB", "RGBA")
+LEGACY_MODE_ALL = ("RGB", "RGBA")
+CHANNEL_ALL = "RGBALP"
+DEPTH_MAX = 4  # bits per channel
+PIXELS_PER_BYTE = 3  # legacy layout: 8 message bits and 1 terminator bit in the rgb lsb
+SEARCH_SIZE = 4096  # terminator bits read at once while decoding, doubled at every step
+
+FRAME_MAGIC = b"STGF"
+FRAME_VERSION = 2
+# magic, version, flags (encryption algorithm), payload bytes, payload crc32, channel plan
+FRAME_HEADER = struct.Struct(">4sBBIIB")
+FRAME_HEADER_V1 = struct.Struct(">4sBBII")  # no channel plan, the payload follows the header in the rgb lsb
+
+TRAVERSAL_CACHE_PIXELS = 2 ** 25  # traversal orders kept in memory, 4 bytes per pixel: 128MB at most
+
+KEYED_SALT = b"steganography/v1"  # the keyed traversal can't depend on data stored in the image
+KEYED_ROUNDS = 4  # feistel rounds
+
 LOGGER = logging.getLogger(__name__)
 
 
-def __get_modified_pixels(image: Image, message: bytes, direction: encryption.Direction):
-    image_size = operator.mul(*image.size)  # pixels
-    message_size = len(message) * 3  # pixels
+class Layout(enum.Enum):
+    LEGACY = 0  # a terminator bit every 3 pixels
+    FRAMED = DEFAULT = 1  # a fixed size header and a dense payload
+
+    def to_string(self) -> str:
+        return "legacy" if self == Layout.LEGACY else "framed"
+
+
+class ChannelPlan(object):
+    __slots__ = ('__channels', '__depth')
+
+    def __init__(self, channels: str = "RGB", depth: int = 1):
+        channels = channels.upper()
+        if not channels or len(set(channels)) != len(channels) or set(channels) - set(CHANNEL_ALL) or \
+                not 0 < depth <= DEPTH_MAX:
+            raise ValueError("invalid channel plan\n\t"
+                             f"expected: distinct channels among {CHANNEL_ALL}, 1-{DEPTH_MAX} bits per channel\n\t"
+                             f"obtained: channels {channels}, {depth} bits per channel")
+
+        self.__channels = channels
+        self.__depth = depth
+
+    @property
+    def channels(self) -> str:
+        return self.__channels
+
+    @property
+    def depth(self) -> int:
+        return self.__depth
+
+    @property
+    def bits_per_pixel(self) -> int:
+        return len(self.__channels) * self.__depth
+
+    @classmethod
+    def for_mode(cls, mode: str) -> 'ChannelPlan':
+        # the color channels of the mode, 1 bit each: the frame header is always written with this plan
+        return ChannelPlan("RGB" if mode.startswith("RGB") else mode[0])
+
+    @classmethod
+    def from_byte(cls, value: int, mode: str) -> 'ChannelPlan':
+        # the lower nibble is a mask of the mode bands, the upper one is the depth - 1
+        channels = "".join(band for i, band in enumerate(mode) if value & (1 << i))
+        if value & ~((1 << len(mode)) - 1) & 0x0f:
+            channels = ""
+        return ChannelPlan(channels, (value >> 4) + 1)
+
+    def to_byte(self, mode: str) -> int:
+        return sum(1 << i for i in self.indexes(mode)) | (self.__depth - 1) << 4
+
+    def indexes(self, mode: str) -> tuple[int, ...]:
+        # bands of the mode carrying the message, in mode order
+        if set(self.__channels) - set(mode):
+            raise ValueError("invalid channel plan\n\t"
+                             f"expected: channels among {mode}\n\t"
+                             f"obtained: channels {self.__channels}")
+        return tuple(i for i, band in enumerate(mode) if band in self.__channels)
+
+    def to_string(self) -> str:
+        return f"{self.__channels}, {self.__depth} bits per channel"
+
+
+def __get_pixels(image: Image, modes: tuple[str, ...] = MODE_ALL) -> np.ndarray:
+    if image.mode not in modes:
+        raise ValueError("invalid image mode\n\t"
+                         f"expected: {', '.join(modes)}\n\t"
+                         f"obtained: {image.mode}")
+
+    return np.array(image).reshape(-1, len(image.mode))
+
+
+__traversals = collections.OrderedDict()  # (width, height, direction): traversal, least recently used first
+__traversals_lock = threading.Lock()
+
+
+def get_traversal(width: int, height: int, direction: encryption.Direction) -> np.ndarray:
+    # flat pixel indexes, traversing the image in direction: computed once per image size, the identity is not cached
+    if direction == encryption.Direction.KEYED:
+        raise ValueError("invalid direction\n\t"
+                         f"expected: {', '.join(d.to_string() for d in encryption.Direction if d != direction)}\n\t"
+                         f"obtained: {direction.to_string()}")
+
+    if direction == encryption.Direction.HORIZONTAL:
+        return np.arange(width * height, dtype=np.uint32)
+
+    key = (width, height, direction)
+    with __traversals_lock:
+        if key in __traversals:
+            __traversals.move_to_end(key)
+            return __traversals[key]
+
+    image_size = width * height  # pixels
+    ordinals = np.arange(image_size, dtype=np.int64)
+    if direction in (encryption.Direction.REVERSE_HORIZONTAL, encryption.Direction.REVERSE_VERTICAL):
+        ordinals = image_size - ordinals - 1
+    if direction in (encryption.Direction.VERTICAL, encryption.Direction.REVERSE_VERTICAL):
+        ordinals = ordinals * width + ordinals // height
+
+    traversal = (ordinals % image_size).astype(np.uint32)
+    traversal.setflags(write=False)
+
+    # the cache is bounded by its total pixels, evicting the least recently used orders
+    with __traversals_lock:
+        __traversals[key] = traversal
+        while sum(t.size for t in __traversals.values()) > TRAVERSAL_CACHE_PIXELS:
+            __traversals.popitem(last=False)
+    return traversal
+
+
+def get_keyed_traversal(image_size: int, key: bytes, ordinals: np.ndarray) -> np.ndarray:
+    # a keyed feistel permutation of the smallest even power of 2 covering the image,
+    # cycle walking until the indexes fall in the image: only the requested ordinals are computed
+    half = max(1, (int(image_size - 1).bit_length() + 1) // 2)
+    mask = np.uint64((1 << half) - 1)
+    keys = np.frombuffer(hashlib.sha256(key).digest(), dtype='<u8')[:KEYED_ROUNDS]
+
+    indexes = ordinals.astype(np.uint64)
+    pending = np.arange(len(indexes))
+    while len(pending):
+        left, right = indexes[pending] >> np.uint64(half), indexes[pending] & mask
+        for round_key in keys:
+            left, right = right, left ^ (__mix(right ^ round_key) & mask)
+        indexes[pending] = left << np.uint64(half) | right
+        pending = pending[indexes[pending] >= image_size]
+
+    return indexes
 
-    if image_size < message_size:
-        raise ValueError("invalid size\n\t"
-                         "message is too long for this image")
 
-    # encode message
-    for i, value in enumerate(message):
-        for j in range(3):
-            ordinal = 3 * i + j
-            coordinates, pixel = __get_pixel(image, direction, ordinal)
-            yield coordinates, pixel, \
-                tuple(
-                    (pixel[k] & (2 ** 8 - 2)) | ((value >> (7 - ((ordinal % 3) * 3 + k))) & 1)
-                    if (ordinal % 3) * 3 + k < 8 else
-                    (pixel[k] & (2 ** 8 - 2)) | 1 if i < (len(message) - 1) else
-                    pixel[k] & (2 ** 8 - 2)
-                    for k in range(3)
-                )
-
-
-def __get_pixel(image: Image, direction: encryption.Direction, ordinal: int):
-    image_size = operator.mul(*image.size)  # pixels
-    image_width = image.size[0]  # pixels
-    image_height = image.size[1]  # pixels
-
-    index = \
-        ordinal if direction == encryption.Direction.HORIZONTAL else \
-            ((ordinal * image_width) + (ordinal // image_height)) % image_size if direction == encryption.Direction.VERTICAL else \
-                (image_size - ordinal - 1) % image_size if direction == encryption.Direction.REVERSE_HORIZONTAL else \
-                    (((image_size - ordinal - 1) * image_width) +
-                     (image_size - ordinal - 1) // image_height) % image_size
-
-    coordinates = (index % image_width, index // image_width)
-    return coordinates, image.getpixel(coordinates)
+def __mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer
+    values = values + np.uint64(0x9e3779b97f4a7c15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return values ^ (values >> np.uint64(31))
+
+
+def __get_key(direction: encryption.Direction, password: str | None) -> bytes | None:
+    if direction != encryption.Direction.KEYED:
+        return None
+
+    if not password:
+        raise ValueError("password cannot be empty")
+    return base64.urlsafe_b64decode(encryption.KeyDerivation(salt=KEYED_SALT).derive(password))
+
+
+def __get_indexes(
+        image: Image, direction: encryption.Direction, ordinals: np.ndarray | int, key: bytes | None = None
+) -> np.ndarray:
+    # flat pixel indexes of the ordinals, or of the first ordinals pixels, traversing the image in direction
+    if direction == encryption.Direction.KEYED:
+        ordinals = np.arange(ordinals) if isinstance(ordinals, int) else ordinals
+        return get_keyed_traversal(operator.mul(*image.size), key, ordinals)
+
+    if direction == encryption.Direction.HORIZONTAL:
+        # the identity: ordinals are the indexes
+        return np.arange(ordinals) if isinstance(ordinals, int) else np.asarray(ordinals)
+
+    traversal = get_traversal(*image.size, direction)
+    return traversal[:ordinals] if isinstance(ordinals, int) else traversal[ordinals]
+
+
+def __read_bits(
+        image: Image,
+        pixels: np.ndarray,
+        direction: encryption.Direction,
+        ordinals: range,
+        key: bytes | None,
+        plan: ChannelPlan
+) -> np.ndarray:
+    # the plan bits of the pixels at ordinals, channel by channel, msb first
+    indexes = __get_indexes(image, direction, ordinals.stop, key)[ordinals.start:]
+    values = pixels[np.ix_(indexes, plan.indexes(image.mode))]
+    shifts = np.arange(plan.depth - 1, -1, -1, dtype=np.uint8)
+    return ((values[..., np.newaxis] >> shifts) & 1).ravel()
+
+
+def __write_bits(pixels: np.ndarray, indexes: np.ndarray, bits: np.ndarray, mode: str, plan: ChannelPlan):
+    channels = plan.indexes(mode)
+    bits = np.append(bits, np.zeros(len(indexes) * plan.bits_per_pixel - len(bits), dtype=np.uint8))
+    weights = 1 << np.arange(plan.depth - 1, -1, -1, dtype=np.uint8)
+    values = (bits.reshape(len(indexes), len(channels), plan.depth) * weights).sum(axis=2, dtype=np.uint8)
+
+    mask = np.uint8(0xff ^ ((1 << plan.depth) - 1))
+    selection = np.ix_(indexes, channels)
+    pixels[selection] = pixels[selection] & mask | values
 
 
 def encode(
@@ -72,23 +246,65 @@ def encode(
         image: Image,
         algorithm: encryption.Algorithm = encryption.Algorithm.NONE,
         direction: encryption.Direction = encryption.Direction.DEFAULT,
-        password: str = None
+        password: str = None,
+        kdf: encryption.KeyDerivation | None = None,
+        layout: Layout = Layout.DEFAULT,
+        plan: ChannelPlan | None = None
 ) -> Image:
-    if algorithm == encryption.Algorithm.PASSWORD and not password:
+    if algorithm in encryption.PASSWORD_ALL and not password:
         raise ValueError("password cannot be empty")
 
+    # image mode and channel plan are validated before encrypting
+    pixels = __get_pixels(image, LEGACY_MODE_ALL if layout == Layout.LEGACY else MODE_ALL)
+    base = ChannelPlan.for_mode(image.mode)
+    plan = plan or base
+    plan.indexes(image.mode)
+    if layout == Layout.LEGACY and (plan.channels, plan.depth) != (base.channels, base.depth):
+        raise ValueError("invalid channel plan\n\t"
+                         f"expected: {base.to_string()}, in the legacy layout\n\t"
+                         f"obtained: {plan.to_string()}")
+
     if isinstance(message, str):
         message = bytes(message, 'utf-8')
 
-    message = encryption.encrypt(message, algorithm, password)
-    omage = image.copy()
+    message = encryption.encrypt(message, algorithm, password, kdf)
+    key = __get_key(direction, password)
 
-    LOGGER.debug(f"modifying pixels in {direction.to_string()} order")
-    LOGGER.debug("coordinates, original pixel -> modified pixel")
-    for coordinates, opixel, mpixel in __get_modified_pixels(image, message, direction):
-        LOGGER.debug(f"{coordinates}, {opixel} -> {mpixel}")
-        omage.putpixel(coordinates, mpixel)
+    if layout == Layout.LEGACY:
+        # every byte spans 3 pixels: 8 message bits, msb first, and a terminator bit, 0 after the last byte
+        bits = np.ones((len(message), 9), dtype=np.uint8)
+        bits[:, :8] = np.unpackbits(np.frombuffer(message, dtype=np.uint8)).reshape(-1, 8)
+        if len(message):
+            bits[-1, 8] = 0
+        bits = bits.ravel()
+        header_count, count = 0, len(message) * PIXELS_PER_BYTE
+    else:
+        # the header is written with the base plan, the payload starts at the next pixel with the plan
+        header = FRAME_HEADER.pack(
+            FRAME_MAGIC, FRAME_VERSION, algorithm.value, len(message), zlib.crc32(message), plan.to_byte(image.mode)
+        )
+        bits = np.unpackbits(np.frombuffer(header + message, dtype=np.uint8))
+        header_count = math.ceil(FRAME_HEADER.size * 8 / base.bits_per_pixel)
+        count = header_count + math.ceil(len(message) * 8 / plan.bits_per_pixel)
 
+    if len(pixels) < count:
+        raise ValueError("invalid size\n\t"
+                         "message is too long for this image")
+
+    indexes = __get_indexes(image, direction, count, key)
+    header_bits = FRAME_HEADER.size * 8 if header_count else 0
+    __write_bits(pixels, indexes[:header_count], bits[:header_bits], image.mode, base)
+    __write_bits(pixels, indexes[header_count:], bits[header_bits:], image.mode, plan)
+    if layout == Layout.LEGACY and image.mode == "RGBA":
+        pixels[indexes, 3] = 0xff  # modified pixels are opaque, as written by putpixel in the legacy layout
+
+    LOGGER.debug(f"modified {len(indexes)} pixels in {direction.to_string()} order, {layout.to_string()} layout, "
+                 f"{plan.to_string()}")
+    shape = (image.size[1], image.size[0]) + ((len(image.mode),) if len(image.mode) > 1 else ())
+    omage = Image.fromarray(pixels.reshape(shape), mode=image.mode)
+    if image.mode == "P":
+        omage.putpalette(image.getpalette())
+    omage.info = image.info.copy()
     return omage
 
 
@@ -96,35 +312,111 @@ def decode(
         image: Image,
         algorithm: encryption.Algorithm = encryption.Algorithm.NONE,
         direction: encryption.Direction = encryption.Direction.HORIZONTAL,
-        password: str = None
+        password: str = None,
+        layout: Layout | None = None
 ) -> bytes:
-    if algorithm == encryption.Algorithm.PASSWORD and not password:
+    # with no layout, framed images are detected by their header, anything else is read as legacy
+    if algorithm in encryption.PASSWORD_ALL and not password:
         raise ValueError("password cannot be empty")
 
-    image_size = operator.mul(*image.size)  # pixels
-    i = 0
-    goon = True
-    message = 0
-    message_size = 0
-    LOGGER.debug("coordinates -> pixel")
-    while goon and i < image_size - 1:
-        coordinates, pixel = __get_pixel(image, direction, i)
-        LOGGER.debug(f"{coordinates} -> {pixel}")
+    pixels = __get_pixels(image, LEGACY_MODE_ALL if layout == Layout.LEGACY else MODE_ALL)
+    key = __get_key(direction, password)
 
-        for j in range(3):
-            message, message_size, goon = ((message << 1) | (pixel[j] & 1), message_size + 1, True) \
-                if (i % 3) * 3 + j < 8 else (message, message_size, True) \
-                    if (pixel[j] & 1) else (message, message_size, False)
+    message = None
+    if layout != Layout.LEGACY:
+        message = __decode_framed(image, pixels, direction, algorithm, key)
+        if message is None and layout == Layout.FRAMED:
+            raise ValueError("invalid image\n\t"
+                             f"no frame found in {direction.to_string()} direction")
 
-        i += 1
+    if message is None and image.mode in LEGACY_MODE_ALL:
+        message = __decode_legacy(image, pixels, direction, key)
 
-    if goon:
+    if message is None:
         LOGGER.warning("cannot find an hidden message")
         message = 0
     else:
-        LOGGER.debug(f"found an encrypted {message_size} bytes length message")
-        message = message.to_bytes(math.ceil(message_size / 8), byteorder='big')
+        LOGGER.debug(f"found an encrypted {len(message)} bytes length message")
         message = encryption.decrypt(message, algorithm, password)
         LOGGER.debug(f"decrypted message: {message}")
 
     return message
+
+
+def __decode_framed(
+        image: Image,
+        pixels: np.ndarray,
+        direction: encryption.Direction,
+        algorithm: encryption.Algorithm,
+        key: bytes | None
+) -> bytes | None:
+    # the fixed size header rejects a non-matching image after a few dozen pixels
+    base = ChannelPlan.for_mode(image.mode)
+    header_count = math.ceil(FRAME_HEADER.size * 8 / base.bits_per_pixel)
+    if len(pixels) < header_count:
+        return None
+
+    header = np.packbits(__read_bits(image, pixels, direction, range(header_count), key, base)).tobytes()
+    magic, version = header[:4], header[4]
+    if magic != FRAME_MAGIC or version not in (1, FRAME_VERSION) or (version == 1 and base.channels != "RGB"):
+        return None
+
+    if version == 1:
+        plan = base
+        magic, version, flags, size, crc = FRAME_HEADER_V1.unpack_from(header)
+        header_bits = FRAME_HEADER_V1.size * 8
+    else:
+        magic, version, flags, size, crc, value = FRAME_HEADER.unpack_from(header)
+        plan = ChannelPlan.from_byte(value, image.mode)
+        header_bits = header_count * base.bits_per_pixel
+
+    if flags != algorithm.value:
+        stored = encryption.Algorithm(flags).to_string() if flags < len(encryption.Algorithm) else str(flags)
+        raise ValueError("invalid algorithm\n\t"
+                         f"expected: {stored}\n\t"
+                         f"obtained: {algorithm.to_string()}")
+
+    # version 1 payloads follow the header bits, version 2 payloads start at the pixel after the header
+    capacity = (len(pixels) - header_bits // base.bits_per_pixel) * plan.bits_per_pixel // 8
+    if size > capacity:
+        raise ValueError("invalid frame size\n\t"
+                         f"expected: {capacity} bytes or less\n\t"
+                         f"obtained: {size} bytes")
+
+    start = header_bits // base.bits_per_pixel
+    offset = header_bits % base.bits_per_pixel
+    count = math.ceil((offset + size * 8) / plan.bits_per_pixel)
+    bits = __read_bits(image, pixels, direction, range(start, start + count), key, plan)
+    message = np.packbits(bits[offset:offset + size * 8]).tobytes()
+    if zlib.crc32(message) != crc:
+        raise ValueError("invalid frame crc\n\t"
+                         f"expected: {crc:08x}\n\t"
+                         f"obtained: {zlib.crc32(message):08x}")
+
+    return message
+
+
+def __decode_legacy(
+        image: Image, pixels: np.ndarray, direction: encryption.Direction, key: bytes | None
+) -> bytes | None:
+    # look for the first 0 terminator bit, the last pixel of the image is never read
+    count = (len(pixels) - 1) // PIXELS_PER_BYTE  # bytes
+    message_size = 0  # bytes
+    start = 0
+    search_size = SEARCH_SIZE
+    while start < count and not message_size:
+        candidates = np.arange(start, min(count, start + search_size))
+        terminators = pixels[__get_indexes(image, direction, candidates * PIXELS_PER_BYTE + 2, key), 2] & 1
+        found = np.flatnonzero(terminators == 0)
+        if len(found):
+            message_size = int(candidates[found[0]]) + 1
+        start += search_size
+        search_size *= 2
+
+    if not message_size:
+        return None
+
+    bits = __read_bits(
+        image, pixels, direction, range(message_size * PIXELS_PER_BYTE), key, ChannelPlan.for_mode(image.mode)
+    )
+    return np.packbits(bits.reshape(-1, 9)[:, :8], axis=1).tobytes()